@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+import mss
+from PIL import Image
+
+
+class Frame:
+    """
+    mss로 캡처한 BGRA 버퍼에 대한 뷰.
+    crop()은 픽셀을 복사하지 않고 같은 버퍼를 공유하며 오프셋만 바꾼다.
+    OCR 엔진에 넘길 때(to_bgra_bytes)에만 해당 영역을 한 번 연속 버퍼로 모은다.
+    """
+    __slots__ = ("buf", "left", "top", "width", "height", "stride", "_off_x", "_off_y")
+
+    def __init__(self, buf, left: int, top: int, width: int, height: int,
+                 stride: int, off_x: int = 0, off_y: int = 0):
+        self.buf = memoryview(buf)
+        self.left = int(left)      # 글로벌 좌표
+        self.top = int(top)
+        self.width = int(width)
+        self.height = int(height)
+        self.stride = int(stride)  # 원본 버퍼 한 줄의 바이트 수
+        self._off_x = int(off_x)   # 원본 버퍼 안에서의 위치
+        self._off_y = int(off_y)
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.width, self.height
+
+    def crop(self, rect_global) -> "Frame":
+        """글로벌 좌표 사각형(QRect 호환)으로 잘라낸 뷰. 프레임 밖은 잘린다."""
+        x1 = max(rect_global.x(), self.left)
+        y1 = max(rect_global.y(), self.top)
+        x2 = min(rect_global.x() + rect_global.width(), self.left + self.width)
+        y2 = min(rect_global.y() + rect_global.height(), self.top + self.height)
+        if x2 <= x1 or y2 <= y1:
+            raise ValueError("캡처 영역이 프레임 밖에 있습니다.")
+        return Frame(self.buf, x1, y1, x2 - x1, y2 - y1, self.stride,
+                     self._off_x + (x1 - self.left), self._off_y + (y1 - self.top))
+
+    def crop_local(self, x: int, y: int, w: int, h: int) -> "Frame":
+        """이 프레임 기준 좌표 사각형으로 잘라낸 뷰 (호출하는 쪽에서 범위를 맞춘다)."""
+        return Frame(self.buf, self.left + x, self.top + y, w, h, self.stride,
+                     self._off_x + x, self._off_y + y)
+
+    @property
+    def byte_offset(self) -> int:
+        """buf 안에서 이 뷰의 (0, 0) 픽셀이 시작하는 위치 (한 줄은 stride 바이트 간격)."""
+        return self._off_y * self.stride + self._off_x * 4
+
+    def to_bgra_bytes(self) -> bytes:
+        row_bytes = self.width * 4
+        start = self._off_y * self.stride + self._off_x * 4
+        if row_bytes == self.stride:
+            return self.buf[start:start + row_bytes * self.height].tobytes()
+        return b"".join(
+            self.buf[start + y * self.stride: start + y * self.stride + row_bytes]
+            for y in range(self.height)
+        )
+
+    def copy_bgra_into(self, dst) -> None:
+        """to_bgra_bytes() 와 같은 내용을 dst(쓰기 가능한 버퍼, 예: 공유 메모리)에 중간 bytes 없이 쓴다."""
+        row_bytes = self.width * 4
+        start = self._off_y * self.stride + self._off_x * 4
+        if row_bytes == self.stride:
+            dst[:row_bytes * self.height] = self.buf[start:start + row_bytes * self.height]
+            return
+        for y in range(self.height):
+            src = start + y * self.stride
+            dst[y * row_bytes:(y + 1) * row_bytes] = self.buf[src:src + row_bytes]
+
+    def to_pil(self) -> Image.Image:
+        return Image.frombuffer("RGB", self.size, self.to_bgra_bytes(), "raw", "BGRX", 0, 1)
+
+
+def grab_frame(rect_global) -> Frame:
+    """글로벌 좌표 사각형을 한 번 캡처해 Frame으로 반환."""
+    with mss.mss() as sct:
+        raw = sct.grab({"left": rect_global.x(), "top": rect_global.y(),
+                        "width": rect_global.width(), "height": rect_global.height()})
+        return Frame(raw.raw, raw.left, raw.top, raw.width, raw.height, raw.width * 4)
+
+
+def grab_regions(rects: Iterable) -> list[Frame]:
+    """여러 사각형의 경계 영역을 한 번만 캡처하고, 각 영역은 뷰로 잘라낸다."""
+    rects = list(rects)
+    if not rects:
+        return []
+    bound = rects[0]
+    for r in rects[1:]:
+        bound = bound.united(r)
+    frame = grab_frame(bound)
+    return [frame.crop(r) for r in rects]
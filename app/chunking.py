@@ -0,0 +1,94 @@
+"""
+긴 OCR 텍스트를 번역 단위(청크)로 나누기.
+- 문단(빈 줄) → 문장 → 줄바꿈/공백 순으로 경계를 찾아 max_chars 이하로 묶는다.
+- 경계의 원래 구분자(빈 줄, 줄바꿈, 공백)를 기억해 두었다가 번역을 이어 붙일 때 그대로 쓴다.
+- 각 청크에는 앞/뒤 청크의 일부를 문맥으로 붙여 용어가 흔들리지 않게 한다(번역하지 않음).
+"""
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+_RE_PARAGRAPH = re.compile(r"\n\s*\n")
+_RE_SENTENCE = re.compile(r"(?<=[.!?…])\s+|(?<=[。！？])\s*")
+
+
+class Chunk(NamedTuple):
+    text: str
+    before: str   # 앞 청크의 끝부분 (문맥)
+    after: str    # 뒤 청크의 앞부분 (문맥)
+    sep: str      # 원문에서 앞 청크와의 구분자 (공백, 줄바꿈, 빈 줄 그대로) — 번역을 이어 붙일 때 사용
+
+
+def _split_keep(pattern: re.Pattern, text: str) -> list[tuple[str, str]]:
+    """pattern 으로 나눈 (조각, 앞 구분자) 목록. 구분자는 원문 그대로 둔다 (줄바꿈 유지)."""
+    out, pos, sep = [], 0, ""
+    for m in pattern.finditer(text):
+        if m.end() == 0 or m.start() == len(text):
+            continue
+        out.append((text[pos:m.start()], sep))
+        pos, sep = m.end(), m.group()
+    out.append((text[pos:], sep))
+    return out
+
+
+def _hard_split(text: str, max_chars: int) -> list[tuple[str, str]]:
+    """
+    경계가 없을 때: 줄바꿈, 없으면 공백에서 자르고, 공백도 없으면 글자 수로 자른다.
+    (조각, 앞 구분자) — 자른 곳의 공백/줄바꿈을 구분자로 남긴다.
+    """
+    out = []
+    sep = ""
+    while len(text) > max_chars:
+        cut = text.rfind("\n", 0, max_chars + 1)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, max_chars + 1)
+        if cut <= 0:
+            out.append((text[:max_chars], sep))
+            text, sep = text[max_chars:], ""
+            continue
+        head, rest = text[:cut].rstrip(), text[cut:].lstrip()
+        out.append((head, sep))
+        text, sep = rest, text[len(head):len(text) - len(rest)]
+    if text:
+        out.append((text, sep))
+    return out
+
+
+def _pieces(text: str, max_chars: int) -> list[tuple[str, str]]:
+    """(조각, 앞 조각과의 구분자) 목록. 문단 → 문장 순으로 나누고, 구분자는 원문의 공백/줄바꿈 그대로."""
+    out: list[tuple[str, str]] = []
+    for para, para_sep in _split_keep(_RE_PARAGRAPH, text):
+        for sent, sent_sep in _split_keep(_RE_SENTENCE, para):
+            for part, sep in _hard_split(sent, max_chars):
+                if part.strip():
+                    out.append((part.strip(), (sep or sent_sep or para_sep) if out else ""))
+                    sent_sep = para_sep = ""
+    return out
+
+
+def split_chunks(text: str, max_chars: int, context_chars: int = 120) -> list[Chunk]:
+    """max_chars 이하의 청크로 나눈다. max_chars <= 0 이거나 짧으면 한 덩어리."""
+    text = (text or "").strip()
+    if not text:
+        return []
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [Chunk(text, "", "", "")]
+
+    bodies: list[tuple[str, str]] = []   # (본문, 앞 구분자)
+    cur, cur_sep = "", ""
+    for part, sep in _pieces(text, max_chars):
+        if cur and len(cur) + len(sep) + len(part) > max_chars:
+            bodies.append((cur, cur_sep))
+            cur, cur_sep = part, sep
+        else:
+            cur = cur + sep + part if cur else part
+    if cur:
+        bodies.append((cur, cur_sep))
+
+    chunks = []
+    for i, (body, sep) in enumerate(bodies):
+        before = bodies[i - 1][0][-context_chars:] if i > 0 and context_chars > 0 else ""
+        after = bodies[i + 1][0][:context_chars] if i + 1 < len(bodies) and context_chars > 0 else ""
+        chunks.append(Chunk(body, before, after, sep))
+    return chunks
@@ -0,0 +1,307 @@
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Callable, Iterator, Optional
+
+from PyQt5 import QtCore, sip
+
+from ui_app import MainWindow
+from settings import SettingsManager
+from overlay import OverlayWindow
+from llm_api import LLMError, LLMSupersededError
+from deadline import Deadline, DeadlineExceeded
+from pipeline import TranslationPipeline
+from line_diff import LineRun, align_lines, diff_lines, worth_diffing
+from capture import grab_frame, grab_regions
+from metrics import metrics
+
+
+class CaptureController(QtCore.QObject):
+    """
+    MainWindow 의 캡처 신호를 받아 캡처 → OCR → 번역 → 표시를 수행.
+    capture / grab 은 주입할 수 있다(soak 테스트 등에서 가짜 화면 사용).
+    history(history.HistoryStore)가 있으면 번역이 끝날 때마다 기록한다 (설정의 '번역 기록 저장').
+    trace(session_trace.SessionRecorder)가 있으면 run_pipeline 마다 이미지/OCR 결과/소요 시간을 남긴다.
+    같은 영역을 다시 실행하면 직전 실행(line_diff.LineRun)과 줄 단위로 비교해 바뀐 줄만 번역한다 ('바뀐 줄만 번역').
+    """
+    MAX_RECT_LANGS = 64
+
+    def __init__(self, w: MainWindow, mgr: SettingsManager, pipeline: TranslationPipeline, *,
+                 capture: Callable = grab_frame, grab: Callable = grab_regions, history=None):
+        super().__init__(w)
+        self.w = w
+        self.mgr = mgr
+        self.pipeline = pipeline
+        self._capture = capture
+        self._grab = grab
+        self._history = history
+        self.trace = None   # session_trace.SessionRecorder (설정의 '캡처 세션 기록', main 에서 교체)
+        self._rect_langs: "OrderedDict[tuple, str]" = OrderedDict()  # 자동 언어 모드: 영역별로 마지막에 선택된 언어
+        self._last_run: Optional[LineRun] = None   # 직전 단일 영역 실행의 원문/번역 줄 대응
+
+        w.current_overlay = None
+        w.rectSelected.connect(self.on_rect_selected)
+        w.captureStarted.connect(self.on_capture_started)
+        w.captureCancelled.connect(self.pipeline.cancel_speculation)   # 추측 OCR 과 단어 인덱스를 놓아 줌
+        w.regionsRequested.connect(self.run_regions)
+        w.retranslateRequested.connect(lambda r: self.run_pipeline(r, bypass_cache=True))
+
+    # -------------------- 단일 영역 --------------------
+
+    def _remember_lang(self, key: tuple, lang: str):
+        self._rect_langs[key] = lang
+        self._rect_langs.move_to_end(key)
+        while len(self._rect_langs) > self.MAX_RECT_LANGS:
+            self._rect_langs.popitem(last=False)
+
+    def _record(self, entries: list[tuple[str, str, str, str]]):
+        """(원문, 번역, 언어, 영역 이름) 들을 번역 기록에 추가. 기록 실패는 번역 표시를 막지 않는다."""
+        if self._history is None or not self.mgr.use_history:
+            return
+        try:
+            added = [self._history.add(*e) for e in entries]
+        except sqlite3.Error:
+            metrics.incr("history.error")
+            return
+        if any(added):
+            self.w.on_history_added()
+
+    def _deadline_note(self, dl: Deadline) -> str:
+        """목표 시간을 넘긴 경우 상태 표시줄에 붙일 단계별 소요 시간."""
+        over = ", ".join(f"{r.name} {r.elapsed:.2f}s/{r.budget:.2f}s" for r in dl.overruns())
+        return f"목표 {dl.seconds:.1f}s 초과 — {over or dl.summary()}"
+
+    def run_pipeline(self, rect_global: QtCore.QRect, frame=None, bypass_cache: bool = False):
+        trace = self.trace
+        started = time.monotonic()
+        dl = Deadline(self.mgr.deadline_seconds)   # 선택을 마친 순간부터 번역이 처음 보일 때까지
+        ev = {} if trace is not None else None
+        try:
+            self._run_pipeline(rect_global, frame, bypass_cache, dl, ev)
+        finally:
+            if ev is not None:
+                ev["stages"] = {r.name: round(r.elapsed, 4) for r in dl.records}
+                ev["total_s"] = round(time.monotonic() - started, 4)
+                trace.add_capture(ev, started, ev.pop("image", None))
+
+    def _run_pipeline(self, rect_global: QtCore.QRect, frame, bypass_cache: bool, dl: Deadline,
+                      ev: Optional[dict]):
+        """ev 가 있으면(세션 기록 중) 재현에 필요한 값을 채운다."""
+        w, mgr, pipeline = self.w, self.mgr, self.pipeline
+        overlay: Optional[OverlayWindow] = getattr(w, "current_overlay", None)
+        if overlay is not None and (sip.isdeleted(overlay) or not overlay.held or overlay.base_rect != rect_global
+                                    or not mgr.use_overlay_layout):
+            try: overlay.close()
+            except Exception: pass
+            overlay = w.current_overlay = None
+
+        # 오버레이 생성 (직전 영역 재실행이면 hold 해 둔 오버레이를 그대로 고친다)
+        if overlay is None and mgr.use_overlay_layout:
+            overlay = OverlayWindow(rect_global, "", font_family=mgr.font_family, font_size=mgr.font_size)
+            w.current_overlay = overlay
+
+        # 캡처/OCR/번역
+        key = (rect_global.x(), rect_global.y(), rect_global.width(), rect_global.height())
+        try:
+            lang = w.get_lang_tag()
+            # 추측 OCR 결과가 준비돼 있으면 그대로 사용, 아니면 잘라낸 영역만 OCR
+            if ev is not None:
+                ev.update(rect=list(key), lang=lang, bypass_cache=bypass_cache, image=frame)
+            ocr_text = pipeline.speculative_text(rect_global, lang) if frame is not None else None
+            if ocr_text is None:
+                img = frame
+                if img is None:
+                    with dl.stage("capture"):
+                        img = self._capture(rect_global)
+                    if ev is not None:
+                        ev["image"] = img
+                with dl.stage("ocr"):
+                    ocr_text, lang = pipeline.ocr_detect_cached(img, key, lang, self._rect_langs.get(key),
+                                                                key="capture", deadline=dl, bypass_cache=bypass_cache)
+            elif ev is not None:
+                ev["speculative"] = True
+            if ev is not None:
+                ev.update(ocr_text=ocr_text, ocr_lang=lang)
+            self._remember_lang(key, lang)
+            norm = pipeline.clean(ocr_text, lang)
+            ocr_text = norm.payload
+            if not ocr_text:
+                return
+        except Exception as e:
+            if ev is not None:
+                ev["error"] = f"ocr: {e}"
+            w.show_text(f"OCR 실패: {e}")
+            return
+        finally:
+            if overlay is not None and not sip.isdeleted(overlay) and overlay.held:
+                overlay.release()
+
+        ocr_text = pipeline.merge_scroll(ocr_text)
+        source_note = f"{lang}, 정리 -{norm.stripped}자" if norm.stripped else lang
+
+        # 직전 실행과 같은 영역이면 줄 단위로 비교해 바뀐 줄만 번역
+        lines = ocr_text.split("\n")
+        reuse, changed = None, []
+        prev = self._last_run
+        if mgr.use_line_diff and not bypass_cache and prev is not None and prev.key == key and prev.lang == lang:
+            reuse, changed = diff_lines(prev, lines)
+            if not worth_diffing(lines, changed):
+                metrics.incr("line_diff.full")
+                reuse = None
+        if reuse is not None and ev is not None:
+            ev["diff_lines"] = len(changed)
+
+        try:
+            translated = ""
+            met, first = True, True
+            t_llm = time.monotonic()
+            stage = dl.stage("translate").start()
+            try:
+                if reuse is not None:
+                    for translated in self._translate_changed(lines, reuse, changed, overlay, dl):
+                        if first:   # 재사용한 줄이 보인 시점 = 마감 판정
+                            first = False
+                            stage.end()
+                            met = dl.finish()
+                else:
+                    # 긴 글은 나눠서 동시에 번역되며, 앞부분부터 완성되는 대로 바로 표시
+                    for piece in pipeline.translate_chunked(ocr_text, key="capture", bypass_cache=bypass_cache,
+                                                            deadline=dl):
+                        translated += piece
+                        self._show_partial(overlay, translated)
+                        if first:   # 첫 조각이 보인 시점 = 마감 판정
+                            first = False
+                            stage.end()
+                            met = dl.finish()
+            finally:
+                stage.end()
+                if ev is not None:
+                    sent = sum(len(lines[i]) for i in changed) if reuse is not None else len(ocr_text)
+                    ev.update(llm_s=round(time.monotonic() - t_llm, 4), sent_chars=sent,
+                              translated_chars=len(translated),
+                              from_cache=reuse is None and pipeline.last_from_cache)
+            if reuse is not None:
+                pipeline.remember(ocr_text, translated)
+                self._last_run = LineRun(key, lang, lines, translated.split("\n"))
+            else:
+                aligned = align_lines(ocr_text, translated)
+                if aligned is None:
+                    metrics.incr("line_diff.unaligned")
+                self._last_run = LineRun(key, lang, lines, aligned) if aligned is not None else None
+            w.show_text(translated + f"\n\n\n### 캡처한 원문 ({source_note}):\n{ocr_text}")
+            self._record([(ocr_text, translated, lang, "")])
+            if reuse is not None:
+                w.statusBar().showMessage(f"완료 (바뀐 줄 {len(changed)}/{sum(bool(l.strip()) for l in lines)}줄만 번역)",
+                                          4000)
+            elif pipeline.last_from_cache:
+                w.statusBar().showMessage("완료 (번역 캐시 사용 — F5: 캐시 무시 재번역)", 4000)
+            elif not met or dl.overruns():
+                w.statusBar().showMessage(f"완료 ({self._deadline_note(dl)})", 6000)
+        except LLMSupersededError:   # 더 최근 캡처가 대신 번역됨
+            if ev is not None:
+                ev["error"] = "superseded"
+        except DeadlineExceeded as e:
+            if ev is not None:
+                ev["error"] = f"deadline: {e}"
+            w.show_text(f"번역 시간 초과: {e}\n({dl.summary()})")
+        except LLMError as e:
+            if ev is not None:
+                ev["error"] = f"llm: {e}"
+            w.show_text(f"번역 실패: {e}")
+
+    def _show_partial(self, overlay: Optional[OverlayWindow], translated: str):
+        if overlay is not None and not sip.isdeleted(overlay):  # 포커스를 잃으면 닫히며 삭제됨
+            overlay.set_text(translated)
+            overlay.repaint()
+        self.w.out.setPlainText(translated)
+        self.w.out.repaint()
+
+    def _translate_changed(self, lines: list[str], reuse: list[Optional[str]], changed: list[int],
+                           overlay: Optional[OverlayWindow], dl: Deadline) -> Iterator[str]:
+        """
+        바뀐 줄(changed)만 번역하며, 줄이 도착할 때마다 고친 전체 번역을 표시하고 내보낸다.
+        처음에는 재사용한 줄만 보이고 아직 번역 중인 줄은 "…".
+        """
+        out = [t if t is not None else "…" for t in reuse]
+        metrics.incr("line_diff.reused", sum(1 for t in reuse if t))
+        metrics.incr("line_diff.translated", len(changed))
+        if not changed:
+            metrics.incr("line_diff.unchanged")
+        text = "\n".join(out)
+        self._show_partial(overlay, text)
+        yield text
+        for i, t in self.pipeline.translate_lines(lines, changed, key="capture", deadline=dl):
+            out[i] = t
+            text = "\n".join(out)
+            self._show_partial(overlay, text)
+            yield text
+
+    def on_rect_selected(self, rect_global: QtCore.QRect):
+        self.w.last_selection_rect = QtCore.QRect(rect_global)
+        self.run_pipeline(rect_global, self.w.take_frozen_crop(rect_global))
+
+    def on_capture_started(self, frame):
+        self.pipeline.warm_up()   # 드래그하는 동안 LLM 연결을 미리 맺어 둠
+        if self.mgr.use_speculative_ocr:
+            self.pipeline.speculate(frame, self.w.get_lang_tag())
+
+    # -------------------- 저장된 영역 --------------------
+
+    def run_regions(self):
+        """경계 영역을 한 번 캡처 → 영역별 병렬 OCR → 한 번의 번역 요청."""
+        w, mgr, pipeline = self.w, self.mgr, self.pipeline
+        regions = w.saved_region_rects()
+        if not regions:
+            return
+        names = [n for n, _, _ in regions]
+        rects = [r for _, r, _ in regions]
+        dl = Deadline(mgr.deadline_seconds)
+        try:
+            with dl.stage("capture"):
+                frames = self._grab(rects)
+            with dl.stage("ocr"):
+                results = pipeline.ocr_many_detect(frames, w.get_lang_tag(), [l for _, _, l in regions],
+                                                   key="regions", deadline=dl)
+        except Exception as e:
+            w.show_text(f"OCR 실패: {e}")
+            return
+        texts = [pipeline.clean(t, lang).payload for t, lang in results]
+
+        # 자동 언어 모드에서 이긴 언어를 영역별로 기억 (다음 캡처는 경합 생략)
+        changed = False
+        for (name, _, old_lang), (text, lang) in zip(regions, results):
+            if text and lang != old_lang and w.get_lang_tag() == "auto":
+                mgr.set_saved_region_lang(w.selected_screen_idx, name, lang)
+                changed = True
+        if changed:
+            mgr.save()
+        if not any(texts):
+            return
+
+        try:
+            with dl.stage("translate"):
+                translations = pipeline.translate_regions(texts, key="regions", deadline=dl)
+        except LLMSupersededError:
+            return
+        except DeadlineExceeded as e:
+            w.show_text(f"번역 시간 초과: {e}\n({dl.summary()})")
+            return
+        except LLMError as e:
+            w.show_text(f"번역 실패: {e}")
+            return
+        if not dl.finish() or dl.overruns():
+            w.statusBar().showMessage(f"완료 ({self._deadline_note(dl)})", 6000)
+
+        if mgr.use_overlay_layout:
+            for rect, translated in zip(rects, translations):
+                if not translated:
+                    continue
+                ov = OverlayWindow(rect, translated, font_family=mgr.font_family,
+                                   font_size=mgr.font_size, popup=False)
+                w.region_overlays.append(ov)
+        w.show_text("\n\n".join(
+            f"### {name}\n{translated}\n\n(원문) {text}"
+            for name, text, translated in zip(names, texts, translations) if text
+        ))
+        self._record([(text, translated, lang, name)
+                      for name, text, translated, (_, lang) in zip(names, texts, translations, results) if text])
@@ -0,0 +1,161 @@
+"""
+캡처 한 번(캡처 → OCR → 첫 번역 표시)의 마감 시간과 단계별 예산.
+
+    dl = Deadline(2.5)
+    with dl.stage("ocr"):
+        text = windows_ocr(img, lang, timeout=dl.timeout(cap=3.0))
+    with dl.stage("translate"):
+        out = llm.translate(text, deadline=dl)
+    dl.finish()
+
+- 단계 예산: 단계를 시작할 때 남은 시간을 (이 단계 + 뒤 단계들의) 가중치 비율로 나눈 값.
+  예산을 넘긴 단계는 metrics 의 deadline.overrun.<단계> 로 센다 (어느 단계가 목표를 깨는지 확인용).
+- timeout(): 지금 단계에서 기다려도 되는 최대 시간 = 남은 시간 - 뒤 단계들의 최소 몫(reserve).
+  예산보다 넉넉하게 잡아, 앞 단계가 조금 늦어도 전체 마감 안이면 실패시키지 않는다.
+  남은 시간이 없으면 DeadlineExceeded.
+- Deadline(0) 은 마감 없음 (timeout() 은 cap 을 그대로 반환, 단계 시간만 기록).
+프로세스 사이에서 그대로 넘길 수 있다(monotonic 시각만 가짐, 작업 프로세스의 LLM 재시도에서 사용).
+"""
+from __future__ import annotations
+
+import math
+import time
+from typing import NamedTuple, Optional
+
+from metrics import metrics
+
+
+class DeadlineExceeded(TimeoutError):
+    """마감 시간 안에 끝낼 수 없어 중단함."""
+    pass
+
+
+# (단계, 가중치, 뒤에 이 단계가 있을 때 앞 단계가 남겨 둘 최소 시간(s))
+STAGES = (
+    ("capture", 1.0, 0.05),
+    ("ocr", 3.0, 0.3),
+    ("translate", 6.0, 0.8),
+)
+
+
+class StageRecord(NamedTuple):
+    name: str
+    elapsed: float
+    budget: float
+
+    @property
+    def over(self) -> bool:
+        return self.elapsed > self.budget
+
+
+class _Stage:
+    """with 문으로 쓰거나, 끝나는 시점이 블록과 다르면 start() / end() 를 직접 호출 (end 는 한 번만 기록)."""
+    def __init__(self, deadline: "Deadline", name: str):
+        self._deadline = deadline
+        self.name = name
+        self.budget = math.inf
+        self._t0: Optional[float] = None
+
+    def start(self) -> "_Stage":
+        self._deadline._enter(self)
+        self._t0 = time.monotonic()
+        return self
+
+    def end(self):
+        if self._t0 is not None:
+            self._deadline._exit(self, time.monotonic() - self._t0)
+            self._t0 = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end()
+        return False
+
+
+class Deadline:
+    def __init__(self, seconds: float, stages: tuple = STAGES):
+        self.seconds = float(seconds) if seconds and seconds > 0 else math.inf
+        self._start = time.monotonic()
+        self._end = self._start + self.seconds
+        self._stages = stages
+        self._current: Optional[str] = None
+        self.records: list[StageRecord] = []
+
+    @property
+    def limited(self) -> bool:
+        return self.seconds != math.inf
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self._start
+
+    def remaining(self) -> float:
+        return self._end - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def _reserve_after(self, name: Optional[str]) -> float:
+        names = [s[0] for s in self._stages]
+        if name not in names:
+            return 0.0
+        return sum(s[2] for s in self._stages[names.index(name) + 1:])
+
+    def _budget_for(self, name: str) -> float:
+        names = [s[0] for s in self._stages]
+        if not self.limited or name not in names:
+            return math.inf
+        rest = self._stages[names.index(name):]
+        return max(0.0, self.remaining()) * rest[0][1] / sum(s[1] for s in rest)
+
+    def timeout(self, cap: Optional[float] = None) -> Optional[float]:
+        """
+        지금 단계에서 기다려도 되는 시간(초). cap 이 있으면 그보다 길지 않게.
+        마감 없음이면 cap 그대로, 남은 시간이 없으면 DeadlineExceeded.
+        """
+        if not self.limited:
+            return cap
+        left = self.remaining()
+        if left <= 0:
+            metrics.incr("deadline.expired")
+            raise DeadlineExceeded(f"마감 시간 {self.seconds:.1f}s 초과 ({self._current or '시작 전'} 단계)")
+        usable = left - self._reserve_after(self._current)
+        if usable <= 0:
+            usable = left   # 뒤 단계 몫까지 끌어 쓴다 (지금 포기하면 어차피 결과가 없음)
+        return usable if cap is None else min(cap, usable)
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def _enter(self, st: _Stage):
+        st.budget = self._budget_for(st.name)
+        self._current = st.name
+
+    def _exit(self, st: _Stage, elapsed: float):
+        self._current = None
+        rec = StageRecord(st.name, elapsed, st.budget)
+        self.records.append(rec)
+        metrics.observe(f"deadline.stage.{st.name}", elapsed)
+        if rec.over:
+            metrics.incr(f"deadline.overrun.{st.name}")
+
+    def finish(self) -> bool:
+        """결과가 보이는 시점에 호출. 전체 소요 시간을 기록하고 마감을 지켰으면 True."""
+        elapsed = self.elapsed()
+        metrics.observe("deadline.total", elapsed)
+        met = elapsed <= self.seconds
+        if not met:
+            metrics.incr("deadline.missed")
+        return met
+
+    def summary(self) -> str:
+        """'ocr 1.20s/0.90s 초과, translate 0.80s/1.60s' 형태 (단계 소요/예산)."""
+        parts = []
+        for r in self.records:
+            budget = f"/{r.budget:.2f}s" if r.budget != math.inf else ""
+            parts.append(f"{r.name} {r.elapsed:.2f}s{budget}{' 초과' if r.over else ''}")
+        return ", ".join(parts)
+
+    def overruns(self) -> list[StageRecord]:
+        return [r for r in self.records if r.over]
@@ -0,0 +1,125 @@
+"""
+장시간 실행 시 메모리 누수 추적용 계측 도구.
+- rss_bytes(): 프로세스 RSS
+- live_qobject_counts(): 살아 있는 QObject / 최상위 위젯 수
+- MemoryProbe: 주기적 샘플링 + 증가량(기울기) 계산
+- dump_top_allocators(): tracemalloc 상위 할당 위치
+"""
+from __future__ import annotations
+
+import ctypes
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import Optional
+
+from PyQt5 import QtCore, QtWidgets, sip
+
+
+def rss_bytes() -> int:
+    """현재 프로세스의 RSS(Working Set). 알 수 없으면 0."""
+    if sys.platform == "win32":
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", ctypes.c_ulong), ("PageFaultCount", ctypes.c_ulong),
+                ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        try:
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return int(counters.WorkingSetSize)
+        except Exception:
+            pass
+        return 0
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
+
+
+def live_qobject_counts() -> dict[str, int]:
+    """
+    qobjects: 파이썬에서 참조 중인(아직 삭제되지 않은) QObject 래퍼 수
+    widgets : Qt 가 들고 있는 전체 위젯 수 (deleteLater 누락 확인용)
+    """
+    qobjects = 0
+    for o in gc.get_objects():
+        try:
+            if isinstance(o, QtCore.QObject) and not sip.isdeleted(o):
+                qobjects += 1
+        except Exception:
+            pass
+    app = QtWidgets.QApplication.instance()
+    widgets = len(app.allWidgets()) if app is not None else 0
+    return {"qobjects": qobjects, "widgets": widgets}
+
+
+def flush_deferred_deletes():
+    """deleteLater 로 예약된 객체를 지금 삭제."""
+    QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+    QtCore.QCoreApplication.processEvents()
+    gc.collect()
+
+
+class MemoryProbe:
+    """
+    샘플 = {"n": 반복 횟수, "t": 경과 시간, "rss": bytes, "traced": bytes, "qobjects": int, "widgets": int}
+    slope(key) 는 마지막 절반 구간의 반복당 증가량(최소제곱 기울기).
+    """
+    def __init__(self, trace_frames: int = 1):
+        self.samples: list[dict] = []
+        self._t0 = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(trace_frames)
+
+    def sample(self, n: int) -> dict:
+        flush_deferred_deletes()
+        traced, _ = tracemalloc.get_traced_memory()
+        s = {"n": n, "t": time.perf_counter() - self._t0, "rss": rss_bytes(), "traced": traced,
+             **live_qobject_counts()}
+        self.samples.append(s)
+        return s
+
+    def slope(self, key: str) -> float:
+        pts = self.samples[len(self.samples) // 2:]
+        if len(pts) < 2:
+            return 0.0
+        xs = [p["n"] for p in pts]
+        ys = [p[key] for p in pts]
+        mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+        den = sum((x - mx) ** 2 for x in xs)
+        return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / den if den else 0.0
+
+
+def dump_top_allocators(limit: int = 20, path: Optional[str] = None) -> str:
+    """tracemalloc 상위 할당 위치를 문자열로 반환(path 를 주면 파일에도 기록)."""
+    if not tracemalloc.is_tracing():
+        return "tracemalloc 이 실행 중이 아닙니다."
+    gc.collect()
+    snap = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    stats = snap.statistics("lineno")
+    current, peak = tracemalloc.get_traced_memory()
+    lines = [
+        f"RSS: {rss_bytes() / 2**20:.1f} MiB, traced: {current / 2**20:.1f} MiB (peak {peak / 2**20:.1f} MiB)",
+        f"QObject: {live_qobject_counts()}",
+        "",
+    ]
+    for i, st in enumerate(stats[:limit], 1):
+        fr = st.traceback[0]
+        lines.append(f"{i:>2}. {st.size / 1024:9.1f} KiB  {st.count:>7} blocks  {fr.filename}:{fr.lineno}")
+    text = "\n".join(lines)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return text
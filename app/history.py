@@ -0,0 +1,184 @@
+"""
+번역 기록 (SQLite + FTS5).
+
+- 캡처마다 (시각, 언어, 영역, 원문, 번역) 한 줄을 AppData 의 history.db 에 추가한다.
+- entries_fts: 원문/번역에 대한 FTS5 trigram 색인 (entries 를 외부 콘텐츠로 쓰고 트리거로 동기화).
+  trigram 은 띄어 쓰지 않는 ja/zh 에서도 부분 문자열로 찾을 수 있다. 3글자 미만 검색어만 LIKE 로 거른다.
+  검색어가 모두 3글자 미만이면 색인을 쓸 수 없으므로 최근 SHORT_SCAN_ROWS 개 안에서만 찾는다 (입력 중 지연 방지).
+- 메모리에는 최근 memory_rows 개만 둔다 (검색어가 없을 때 기록 창에 보이는 목록).
+  검색 결과는 최신순으로 limit 개까지만 읽는다.
+- 저장 개수가 max_rows 를 넘으면 오래된 것부터 지운다.
+FTS5 가 없는 SQLite 면 LIKE 로만 찾는다 (느리지만 동작).
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+
+from metrics import metrics
+from settings import appdata_dir
+
+DEFAULT_PATH = os.path.join(appdata_dir(), "history.db")
+MIN_FTS_TERM = 3       # trigram 색인으로 찾을 수 있는 최소 글자 수
+SHORT_SCAN_ROWS = 20_000   # 짧은 검색어만 있을 때 LIKE 로 훑을 최근 기록 수
+PRUNE_EVERY = 500      # 추가 몇 번마다 max_rows 초과분을 지울지
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    lang TEXT NOT NULL DEFAULT '',
+    region TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL,
+    translation TEXT NOT NULL
+);
+"""
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE entries_fts USING fts5(
+    source, translation, content='entries', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, source, translation) VALUES (new.id, new.source, new.translation);
+END;
+CREATE TRIGGER entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, source, translation)
+    VALUES ('delete', old.id, old.source, old.translation);
+END;
+"""
+_COLUMNS = "e.id, e.ts, e.lang, e.region, e.source, e.translation"
+
+
+class HistoryEntry(NamedTuple):
+    id: int
+    ts: float
+    lang: str
+    region: str
+    source: str
+    translation: str
+
+    @property
+    def title(self) -> str:
+        """목록에 보일 한 줄 (번역 첫 줄)."""
+        line = (self.translation.strip() or self.source.strip()).split("\n", 1)[0]
+        return line if len(line) <= 80 else line[:79] + "…"
+
+
+def _like_pattern(term: str) -> str:
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+class HistoryStore:
+    def __init__(self, path: str = DEFAULT_PATH, memory_rows: int = 200, max_rows: int = 200_000):
+        self.path = path
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self.fts = self._ensure_fts()
+        self._db.commit()
+        self._recent: deque[HistoryEntry] = deque(maxlen=memory_rows)
+        rows = self._db.execute(f"SELECT {_COLUMNS} FROM entries e ORDER BY id DESC LIMIT ?", (memory_rows,))
+        self._recent.extend(HistoryEntry(*r) for r in reversed(rows.fetchall()))
+        self._since_prune = 0
+
+    def _ensure_fts(self) -> bool:
+        if self._db.execute("SELECT 1 FROM sqlite_master WHERE name = 'entries_fts'").fetchone():
+            return True
+        try:
+            self._db.executescript(_FTS_SCHEMA)
+        except sqlite3.OperationalError:   # FTS5 또는 trigram 토크나이저가 없는 SQLite
+            return False
+        self._db.execute("INSERT INTO entries_fts(entries_fts) VALUES ('rebuild')")   # 기존 기록 색인
+        return True
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # ---------- 쓰기 ----------
+
+    def add(self, source: str, translation: str, lang: str = "", region: str = "") -> Optional[HistoryEntry]:
+        """기록 한 줄 추가. 바로 앞 기록과 원문/번역이 같으면(같은 툴팁을 다시 캡처) 추가하지 않고 None."""
+        source, translation = (source or "").strip(), (translation or "").strip()
+        if not source and not translation:
+            return None
+        last = self._recent[-1] if self._recent else None
+        if last is not None and last.source == source and last.translation == translation:
+            return None
+        ts = time.time()
+        t0 = time.perf_counter()
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT INTO entries (ts, lang, region, source, translation) VALUES (?, ?, ?, ?, ?)",
+                (ts, lang, region, source, translation))
+            self._since_prune += 1
+            if self._since_prune >= PRUNE_EVERY:
+                self._since_prune = 0
+                self._db.execute("DELETE FROM entries WHERE id <= ?", (cur.lastrowid - self.max_rows,))
+            self._db.commit()
+        metrics.observe("history.add", time.perf_counter() - t0)
+        entry = HistoryEntry(cur.lastrowid, ts, lang, region, source, translation)
+        self._recent.append(entry)
+        return entry
+
+    def clear(self):
+        """모든 기록 삭제 (테이블을 새로 만든다 — 트리거로 한 줄씩 지우는 것보다 빠름)."""
+        with self._lock:
+            self._db.executescript("DROP TABLE IF EXISTS entries_fts; DROP TABLE IF EXISTS entries;")
+            self._db.executescript(_SCHEMA)
+            self.fts = self._ensure_fts()
+            self._db.commit()
+            self._db.execute("VACUUM")
+        self._recent.clear()
+
+    # ---------- 읽기 ----------
+
+    def recent(self, limit: Optional[int] = None) -> list[HistoryEntry]:
+        """메모리에 있는 최근 기록 (최신순)."""
+        out = list(reversed(self._recent))
+        return out if limit is None else out[:limit]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM entries").fetchone()[0]
+
+    def search(self, query: str, limit: int = 200) -> list[HistoryEntry]:
+        """
+        띄어 쓴 검색어를 모두 포함하는(AND) 기록을 최신순으로 limit 개까지.
+        원문/번역 어느 쪽에 있어도 되고, 영문은 대소문자를 구분하지 않는다.
+        검색어가 모두 MIN_FTS_TERM 글자 미만이면 최근 SHORT_SCAN_ROWS 개에서만 찾는다.
+        """
+        terms = query.split()
+        if not terms:
+            return self.recent(limit)
+        fts_terms = [t for t in terms if self.fts and len(t) >= MIN_FTS_TERM]
+        like_terms = [t for t in terms if t not in fts_terms]
+        where, params = [], []
+        for t in like_terms:
+            where.append("(e.source LIKE ? ESCAPE '\\' OR e.translation LIKE ? ESCAPE '\\')")
+            params += [_like_pattern(t)] * 2
+        if fts_terms:
+            match = " ".join('"' + t.replace('"', '""') + '"' for t in fts_terms)
+            sql = (f"SELECT {_COLUMNS} FROM entries_fts f JOIN entries e ON e.id = f.rowid "
+                   f"WHERE entries_fts MATCH ?{''.join(' AND ' + w for w in where)} "
+                   f"ORDER BY f.rowid DESC LIMIT ?")
+            params = [match, *params, limit]
+        else:
+            if self.fts:
+                where.append("e.id > (SELECT max(id) FROM entries) - ?")
+                params.append(SHORT_SCAN_ROWS)
+            sql = f"SELECT {_COLUMNS} FROM entries e WHERE {' AND '.join(where)} ORDER BY e.id DESC LIMIT ?"
+            params.append(limit)
+        t0 = time.perf_counter()
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        metrics.observe("history.search", time.perf_counter() - t0)
+        return [HistoryEntry(*r) for r in rows]
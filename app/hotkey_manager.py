@@ -1,13 +1,17 @@
 # hotkey_manager.py
-import ctypes, threading, time
+import ctypes, queue, threading
+from concurrent.futures import Future
 from ctypes import wintypes
-
-user32 = ctypes.WinDLL('user32', use_last_error=True)
+from typing import Callable, Optional
 
 WM_HOTKEY     = 0x0312
+PM_NOREMOVE   = 0x0000
 PM_REMOVE     = 0x0001
 QS_ALLINPUT   = 0x04FF
 WAIT_OBJECT_0 = 0x00000000
+WAIT_FAILED   = 0xFFFFFFFF
+INFINITE      = 0xFFFFFFFF
+MWMO_INPUTAVAILABLE = 0x0004
 
 MOD_ALT      = 0x0001
 MOD_CONTROL  = 0x0002
@@ -108,65 +112,284 @@ def _parse_combo(combo: str):
 
     return mods, vk
 
-class WinHotkeyManager:
+class MessageSource:
+    """
+    핫키 서비스가 사용하는 플랫폼 추상화. 모든 메서드는 서비스 스레드에서 호출된다(wake 제외).
+    테스트에서는 큐 기반 가짜 구현으로 바꿔 끼울 수 있다.
+    """
+    def open(self): ...
+    def close(self): ...
+
+    def register(self, hotkey_id: int, mods: int, vk: int) -> Optional[str]:
+        """성공 시 None, 실패 시 사용자에게 보여줄 오류 메시지."""
+        raise NotImplementedError
+
+    def unregister(self, hotkey_id: int): ...
+
+    def wait(self) -> list[int]:
+        """메시지 또는 wake() 가 올 때까지 (타임아웃 없이) 대기. 눌린 핫키 id 목록 반환."""
+        raise NotImplementedError
+
+    def wake(self):
+        """다른 스레드에서 wait() 를 깨운다."""
+        raise NotImplementedError
+
+
+class Win32MessageSource(MessageSource):
+    """
+    RegisterHotKey + 스레드 메시지 큐.
+    wake 용 이벤트 핸들과 메시지 큐를 MsgWaitForMultipleObjectsEx(INFINITE) 로 함께 기다린다.
+    """
+    def __init__(self):
+        self._user32 = ctypes.WinDLL('user32', use_last_error=True)
+        self._kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        self._kernel32.CreateEventW.restype = wintypes.HANDLE
+        self._kernel32.CreateEventW.argtypes = [ctypes.c_void_p, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR]
+        self._kernel32.SetEvent.argtypes = [wintypes.HANDLE]
+        self._kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        self._user32.MsgWaitForMultipleObjectsEx.restype = wintypes.DWORD
+        self._user32.MsgWaitForMultipleObjectsEx.argtypes = [
+            wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE), wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+        # 자동 리셋 이벤트: 다른 스레드의 wake() → SetEvent
+        self._wake_evt = self._kernel32.CreateEventW(None, False, False, None)
+        self._handles = (wintypes.HANDLE * 1)(self._wake_evt)
+        self._ids: set[int] = set()
+
+    def open(self):
+        # 이 스레드의 메시지 큐를 만들어 둔다
+        msg = MSG()
+        self._user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, PM_NOREMOVE)
+
+    def close(self):
+        for hid in list(self._ids):
+            self.unregister(hid)
+        if self._wake_evt:
+            self._kernel32.CloseHandle(self._wake_evt)
+            self._wake_evt = None
+
+    def register(self, hotkey_id: int, mods: int, vk: int) -> Optional[str]:
+        if not self._user32.RegisterHotKey(None, hotkey_id, mods, vk):
+            err = ctypes.get_last_error()
+            if err == ERROR_HOTKEY_ALREADY_REGISTERED:
+                return "이미 다른 프로그램에서 사용 중인 핫키 조합입니다."
+            return f"RegisterHotKey 실패 (WinError {err})"
+        self._ids.add(hotkey_id)
+        return None
+
+    def unregister(self, hotkey_id: int):
+        if hotkey_id in self._ids:
+            self._user32.UnregisterHotKey(None, hotkey_id)
+            self._ids.discard(hotkey_id)
+
+    def wait(self) -> list[int]:
+        ret = self._user32.MsgWaitForMultipleObjectsEx(
+            1, self._handles, INFINITE, QS_ALLINPUT, MWMO_INPUTAVAILABLE)
+        if ret == WAIT_FAILED:
+            raise OSError(f"MsgWaitForMultipleObjectsEx 실패 (WinError {ctypes.get_last_error()})")
+        fired = []
+        if ret == WAIT_OBJECT_0 + 1:
+            msg = MSG()
+            while self._user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, PM_REMOVE):
+                if msg.message == WM_HOTKEY:
+                    fired.append(int(msg.wParam))
+                self._user32.TranslateMessage(ctypes.byref(msg))
+                self._user32.DispatchMessageW(ctypes.byref(msg))
+        return fired
+
+    def wake(self):
+        if self._wake_evt:
+            self._kernel32.SetEvent(self._wake_evt)
+
+
+class QueueMessageSource(MessageSource):
+    """
+    테스트용 가짜 구현. Win32 API 없이 큐로 핫키 입력을 흉내 낸다.
+    - press(id) 로 핫키 눌림을 넣으면 서비스 스레드의 wait() 가 그 id 를 반환
+    - taken 에 (mods, vk) 를 넣어 두면 register 가 "이미 사용 중" 오류를 돌려준다
+    - calls 에 open/register/unregister/close 호출 기록이 남는다
     """
-    Win32 RegisterHotKey 기반 전역 핫키.
+    def __init__(self, taken: Optional[set] = None):
+        self._events: "queue.Queue[Optional[int]]" = queue.Queue()
+        self.taken: set = set(taken or ())
+        self.registered: dict[int, tuple[int, int]] = {}
+        self.calls: list[tuple] = []
+        self.opened = self.closed = False
+
+    def open(self):
+        self.opened = True
+        self.calls.append(("open",))
+
+    def close(self):
+        self.registered.clear()
+        self.closed = True
+        self.calls.append(("close",))
+
+    def register(self, hotkey_id: int, mods: int, vk: int) -> Optional[str]:
+        self.calls.append(("register", hotkey_id, mods, vk))
+        if (mods & ~MOD_NOREPEAT, vk) in self.taken:
+            return "이미 다른 프로그램에서 사용 중인 핫키 조합입니다."
+        self.registered[hotkey_id] = (mods, vk)
+        return None
+
+    def unregister(self, hotkey_id: int):
+        if hotkey_id in self.registered:
+            del self.registered[hotkey_id]
+            self.calls.append(("unregister", hotkey_id))
+
+    def press(self, hotkey_id: int):
+        """다른 스레드에서 핫키 눌림을 넣는다 (등록된 id 만 전달, 실제 OS 와 같음)."""
+        self._events.put(hotkey_id)
+
+    def wait(self) -> list[int]:
+        fired = []
+        item = self._events.get()
+        while True:
+            if item is not None and item in self.registered:
+                fired.append(item)
+            try:
+                item = self._events.get_nowait()
+            except queue.Empty:
+                return fired
+
+    def wake(self):
+        self._events.put(None)
+
+
+class HotkeyService:
     """
-    def __init__(self, on_hotkey, combo: str = "ctrl+shift+f1", norepeat=True, hotkey_id: int = 1):
-        self.on_hotkey = on_hotkey
-        self.combo = combo
-        self.norepeat = norepeat
-        self.hotkey_id = hotkey_id
+    모든 전역 핫키를 하나의 스레드에서 처리.
+    - 등록/해제는 서비스 스레드에서 실행되고, 호출한 쪽은 결과를 Future 로 받는다(핸드셰이크)
+    - 조합이 바뀌어도 스레드를 다시 만들지 않고 해당 id 만 다시 등록
+    - 대기는 메시지 + wake 이벤트만 기다리며 폴링 타임아웃이 없다
+    """
+    COMMAND_TIMEOUT = 2.0
+
+    def __init__(self, source_factory: Callable[[], MessageSource] = Win32MessageSource):
+        self._source_factory = source_factory
+        self._source: Optional[MessageSource] = None
+        self._commands: "queue.Queue[tuple[Callable, Future]]" = queue.Queue()
+        self._callbacks: dict[int, Callable[[], None]] = {}
+        self._combos: dict[int, str] = {}
         self._stop_evt = threading.Event()
-        self._thread = None
-        self._registered = False
+        self._thread: Optional[threading.Thread] = None
         self.last_error: str | None = None
 
-    def start(self) -> bool:
-        # 스레드 띄우기 전에 combo 형식 사전 검증
-        try:
-            _ = _parse_combo(self.combo)
-        except ValueError as e:
-            self.last_error = f"형식 오류: {e}"
-            return False
+    # -------------------- lifecycle --------------------
 
+    def start(self) -> bool:
         if self._thread:
             return True
-        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._stop_evt.clear()
+        started: Future = Future()
+        self._thread = threading.Thread(target=self._worker, args=(started,),
+                                        name="ocr-translator-HOTKEY", daemon=True)
         self._thread.start()
-        time.sleep(0.05)
-        return self._registered
+        try:
+            started.result(timeout=self.COMMAND_TIMEOUT)
+            return True
+        except Exception as e:
+            self.last_error = f"핫키 서비스 시작 실패: {e}"
+            self._thread = None
+            return False
 
     def stop(self):
+        if not self._thread:
+            return
         self._stop_evt.set()
+        if self._source:
+            self._source.wake()
+        self._thread.join(timeout=self.COMMAND_TIMEOUT)
+        self._thread = None
+
+    # -------------------- public API --------------------
 
-    def _worker(self):
+    def set_hotkey(self, hotkey_id: int, combo: str, on_hotkey: Callable[[], None],
+                   norepeat: bool = True) -> bool:
+        """
+        hotkey_id 에 combo 를 (재)등록. 같은 조합이면 콜백만 바꾼다.
+        실패 시 False 를 반환하고 last_error 에 이유를 남긴다. 실패하면 이전 등록은 해제된 상태가 된다.
+        """
         try:
-            mods, vk = _parse_combo(self.combo)
-            if self.norepeat:
-                mods |= MOD_NOREPEAT
-
-            if not user32.RegisterHotKey(None, self.hotkey_id, mods, vk):
-                err = ctypes.get_last_error()
-                if err == ERROR_HOTKEY_ALREADY_REGISTERED:
-                    self.last_error = "이미 다른 프로그램에서 사용 중인 핫키 조합입니다."
-                else:
-                    self.last_error = f"RegisterHotKey 실패 (WinError {err})"
-                self._registered = False
+            mods, vk = _parse_combo(combo)
+        except ValueError as e:
+            self.last_error = f"형식 오류: {e}"
+            return False
+        if norepeat:
+            mods |= MOD_NOREPEAT
+
+        def _cmd():
+            self._callbacks[hotkey_id] = on_hotkey
+            if self._combos.get(hotkey_id) == combo:
+                return None
+            self._source.unregister(hotkey_id)
+            self._combos.pop(hotkey_id, None)
+            err = self._source.register(hotkey_id, mods, vk)
+            if err is None:
+                self._combos[hotkey_id] = combo
+            return err
+
+        err = self._call(_cmd)
+        if err:
+            self.last_error = err
+            return False
+        return True
+
+    def remove_hotkey(self, hotkey_id: int):
+        def _cmd():
+            self._source.unregister(hotkey_id)
+            self._combos.pop(hotkey_id, None)
+            self._callbacks.pop(hotkey_id, None)
+        self._call(_cmd)
+
+    def registered(self) -> dict[int, str]:
+        return dict(self._combos)
+
+    # -------------------- service thread --------------------
+
+    def _call(self, fn):
+        if not self._thread:
+            return self.last_error or "핫키 서비스가 실행 중이 아닙니다."
+        fut: Future = Future()
+        self._commands.put((fn, fut))
+        self._source.wake()
+        try:
+            return fut.result(timeout=self.COMMAND_TIMEOUT)
+        except Exception as e:
+            return f"핫키 서비스 응답 없음: {e}"
+
+    def _drain_commands(self):
+        while True:
+            try:
+                fn, fut = self._commands.get_nowait()
+            except queue.Empty:
                 return
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                fut.set_result(fn())
+            except Exception as e:
+                fut.set_exception(e)
 
-            self._registered = True
-            msg = MSG()
+    def _worker(self, started: Future):
+        try:
+            self._source = self._source_factory()
+            self._source.open()
+        except Exception as e:
+            started.set_exception(e)
+            return
+        started.set_result(True)
+        try:
             while not self._stop_evt.is_set():
-                ret = user32.MsgWaitForMultipleObjects(0, None, False, 100, QS_ALLINPUT)
-                if ret == WAIT_OBJECT_0:
-                    while user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, PM_REMOVE):
-                        if msg.message == WM_HOTKEY and msg.wParam == self.hotkey_id:
-                            try:
-                                self.on_hotkey()
-                            except Exception:
-                                pass
-                        user32.TranslateMessage(ctypes.byref(msg))
-                        user32.DispatchMessageW(ctypes.byref(msg))
+                self._drain_commands()
+                for hid in self._source.wait():
+                    cb = self._callbacks.get(hid)
+                    if cb is None:
+                        continue
+                    try:
+                        cb()
+                    except Exception:
+                        pass
+            self._drain_commands()
         finally:
-            user32.UnregisterHotKey(None, self.hotkey_id)
+            self._source.close()
+            self._combos.clear()
@@ -0,0 +1,124 @@
+"""
+OCR 결과가 해당 언어로 "그럴듯한지" 점수(0~1)를 매긴다.
+자동 언어 모드에서 여러 OCR 엔진의 결과 중 하나를 고르는 데 사용한다.
+
+  점수 = 0.6 * 문자 체계 비율(script histogram)
+       + 0.2 * 단어 형태 타당성(word-count plausibility)
+       + 0.2 * 자주 쓰이는 단어/글자 비율(dictionary plausibility)
+"""
+from __future__ import annotations
+
+import re
+
+W_SCRIPT, W_WORDS, W_DICT = 0.6, 0.2, 0.2
+
+_COMMON_EN = frozenset("""
+a an the and or but of to in on at by for from with without into over under up down out off
+is are was were be been being am do does did done have has had not no yes all any some more most
+it its this that these those there here you your we our they their he she his her i me my
+can will would should could must may might get got go going make take use find need
+new old one two three first last next back level item items quest mission map point points
+damage armor ammo weapon health time speed weight price sell buy open close start exit
+""".split())
+
+_COMMON_JA = ("の", "は", "が", "を", "に", "で", "と", "て", "た", "する", "ます", "です",
+              "ない", "から", "まで", "この", "その", "れる", "られ", "って")
+
+_COMMON_ZH = frozenset("的一是不了在人有我他这个们中来上大为和国地到以说时要就出会可也你对生能而子那得于着下自之年过发后作里用道行所然家种事成方多经么去法学如都同现当没动面起看定天分还进好小部其些主样理心她本前开但因只从想实")
+
+_RE_EN_WORD = re.compile(r"[A-Za-z][A-Za-z']*")
+_RE_VOWEL = re.compile(r"[aeiouyAEIOUY]")
+
+
+def script_histogram(text: str) -> dict[str, int]:
+    """공백을 제외한 글자를 문자 체계별로 센다."""
+    h = {"latin": 0, "kana": 0, "han": 0, "hangul": 0, "digit": 0, "other": 0}
+    for ch in text:
+        if ch.isspace():
+            continue
+        o = ord(ch)
+        if ch.isascii() and ch.isalpha():
+            h["latin"] += 1
+        elif ch.isdigit():
+            h["digit"] += 1
+        elif 0x3040 <= o <= 0x30FF or 0x31F0 <= o <= 0x31FF or 0xFF66 <= o <= 0xFF9D:
+            h["kana"] += 1
+        elif 0x4E00 <= o <= 0x9FFF or 0x3400 <= o <= 0x4DBF or 0xF900 <= o <= 0xFAFF:
+            h["han"] += 1
+        elif 0xAC00 <= o <= 0xD7A3 or 0x1100 <= o <= 0x11FF or 0x3130 <= o <= 0x318F:
+            h["hangul"] += 1
+        elif 0x00C0 <= o <= 0x024F:
+            h["latin"] += 1
+        else:
+            h["other"] += 1
+    return h
+
+
+def _score_en(text: str, h: dict[str, int], total: int) -> float:
+    script = h["latin"] / total
+    words = _RE_EN_WORD.findall(text)
+    if not words:
+        return script * W_SCRIPT
+    # 한 글자 단어(a, I 제외)나 모음 없는 긴 단어는 잘못 인식한 결과인 경우가 많다
+    plausible = sum(1 for w in words
+                    if w in ("a", "A", "I") or (1 < len(w) <= 15 and (len(w) <= 3 or _RE_VOWEL.search(w))))
+    known = sum(1 for w in words if len(w) > 1 and w.lower() in _COMMON_EN)
+    return (W_SCRIPT * script
+            + W_WORDS * plausible / len(words)
+            + W_DICT * min(1.0, 3.0 * known / len(words)))
+
+
+def _score_ja(text: str, h: dict[str, int], total: int) -> float:
+    cjk = h["kana"] + h["han"]
+    if not cjk:
+        return 0.0
+    # 가나가 전혀 없는 일본어 문장은 드물다 → 가나 비율로 보정
+    kana_ratio = h["kana"] / cjk
+    script = (cjk / total) * (0.5 + 0.5 * min(1.0, kana_ratio * 4))
+    compact = text.replace(" ", "")
+    hits = sum(compact.count(w) for w in _COMMON_JA)
+    return (W_SCRIPT * script
+            + W_WORDS * min(1.0, kana_ratio * 3)
+            + W_DICT * min(1.0, 8.0 * hits / max(1, len(compact))))
+
+
+def _score_zh(text: str, h: dict[str, int], total: int) -> float:
+    if not h["han"]:
+        return 0.0
+    # 중국어에는 가나가 없다 → 가나가 섞여 있으면 감점
+    script = max(0.0, (h["han"] - 2 * h["kana"]) / total)
+    hans = [ch for ch in text if 0x4E00 <= ord(ch) <= 0x9FFF]
+    known = sum(1 for ch in hans if ch in _COMMON_ZH)
+    return (W_SCRIPT * script
+            + W_WORDS * (h["han"] / (h["han"] + h["kana"]))
+            + W_DICT * min(1.0, 3.0 * known / len(hans)))
+
+
+_SCORERS = {
+    "en": _score_en,
+    "ja": _score_ja,
+    "zh": _score_zh,
+}
+
+
+def score(text: str, lang_tag: str) -> float:
+    """lang_tag(en-US, ja-JP, zh-CN ...) 기준으로 OCR 결과의 타당성 점수(0~1)."""
+    h = script_histogram(text or "")
+    total = sum(h.values())
+    if total == 0:
+        return 0.0
+    fn = _SCORERS.get(lang_tag.split("-")[0].lower())
+    if fn is None:
+        return 0.0
+    # 같은 점수라면 더 많이 인식한 쪽을 고르도록 아주 작은 길이 보너스
+    return fn(text, h, total) + 1e-4 * min(total, 100)
+
+
+def pick_best(results: dict[str, str]) -> tuple[str, str, float]:
+    """{lang_tag: text} 중 점수가 가장 높은 (lang_tag, text, score) 반환."""
+    best = ("", "", -1.0)
+    for lang, text in results.items():
+        s = score(text, lang)
+        if s > best[2]:
+            best = (lang, text, s)
+    return best
@@ -0,0 +1,58 @@
+"""
+직전 영역 재실행의 줄 단위 차이 (바뀐 줄만 다시 번역).
+
+같은 영역을 다시 캡처하면 대개 몇 줄(수치, 남은 시간, 대사 한 줄)만 바뀐다.
+직전 실행의 원문 줄 ↔ 번역 줄 대응을 기억해 두고, 새 원문 줄과 비교(difflib)해서
+같은 줄은 기억해 둔 번역을 그대로 쓰고 바뀐/새 줄만 번역한다.
+
+- 대응은 줄 단위: 원문과 번역의 빈 줄이 아닌 줄 수가 같을 때만 순서대로 짝짓는다
+  (LLM 이 줄을 합치거나 나누면 대응을 만들 수 없으므로 None → 다음 재실행은 전체 번역).
+- 빈 줄은 번역하지 않고 빈 줄로 둔다 (문단 구분 유지).
+"""
+from __future__ import annotations
+
+import difflib
+from dataclasses import dataclass
+from typing import Optional
+
+MAX_CHANGED_RATIO = 0.5   # 바뀐 줄이 빈 줄이 아닌 줄의 이 비율을 넘으면 전체 번역이 낫다 (문맥, 요청 수)
+
+
+@dataclass
+class LineRun:
+    """한 영역의 직전 실행: 원문 줄과 같은 위치의 번역 줄."""
+    key: tuple
+    lang: str
+    source: list[str]
+    translated: list[str]
+
+
+def align_lines(source: str, translated: str) -> Optional[list[str]]:
+    """source 의 줄마다 대응하는 번역 줄 (빈 줄은 ""). 빈 줄이 아닌 줄 수가 다르면 None."""
+    src = source.split("\n")
+    dst = [t.strip() for t in translated.split("\n") if t.strip()]
+    if sum(bool(s.strip()) for s in src) != len(dst):
+        return None
+    it = iter(dst)
+    return [next(it) if s.strip() else "" for s in src]
+
+
+def diff_lines(prev: LineRun, source: list[str]) -> tuple[list[Optional[str]], list[int]]:
+    """
+    (줄마다 재사용할 번역 — 새로 번역할 줄은 None, 새로 번역할 줄 번호들).
+    바뀐 줄은 이전 번역 그대로 두지 않는다 (원문이 다르면 의미가 다를 수 있음).
+    """
+    out: list[Optional[str]] = [None] * len(source)
+    sm = difflib.SequenceMatcher(None, prev.source, source, autojunk=False)
+    for tag, i1, i2, j1, j2 in sm.get_opcodes():
+        if tag == "equal":
+            out[j1:j2] = prev.translated[i1:i2]
+    for j, s in enumerate(source):
+        if out[j] is None and not s.strip():
+            out[j] = ""
+    return out, [j for j, t in enumerate(out) if t is None]
+
+
+def worth_diffing(source: list[str], changed: list[int]) -> bool:
+    lines = sum(bool(s.strip()) for s in source)
+    return lines > 0 and len(changed) <= MAX_CHANGED_RATIO * lines
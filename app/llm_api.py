@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import datetime
+import json
+import re
+import threading
 import time
-from typing import Iterable, List, Optional
+from typing import Iterable, Iterator, List, Optional
 
 import google.generativeai as genai
+from google.generativeai import caching
 from settings import SettingsManager
+from metrics import metrics
+from usage import usage, region_of
+from scheduler import (scheduler as default_scheduler, RequestScheduler, SupersededError,
+                       PRIORITY_INTERACTIVE, estimate_tokens)
+from deadline import Deadline, DeadlineExceeded
 
 
 class LLMError(RuntimeError):
@@ -12,11 +22,114 @@ class LLMError(RuntimeError):
     pass
 
 
+class LLMSupersededError(LLMError):
+    """보내기 전에 같은 key 의 새 요청으로 대체됨 (사용자에게 표시할 필요 없음)."""
+    pass
+
+
+CONTEXT_CACHE_TTL = 600     # 컨텍스트 캐시 유지 시간(초). 쓰는 동안 절반이 지나면 연장, 안 쓰면 만료 (저장 비용)
+CONTEXT_CACHE_RETRY = 60    # 만들기가 일시적으로 실패한 뒤 다시 시도할 때까지(초)
+
+_JSON_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+MANY_INSTRUCTION = (
+    "아래 JSON의 segments 배열에 있는 각 text를 서로 독립된 문장으로 보고 번역하라.\n"
+    "출력은 반드시 {\"translations\": [{\"id\": ..., \"text\": ...}]} 형식의 JSON 하나여야 하며, "
+    "id는 입력과 똑같이 유지하고 모든 segment를 빠짐없이 포함하라."
+)
+
+MANY_CONTEXT_INSTRUCTION = (
+    "Context는 segments 주변의 원문으로, 용어와 말투를 맞추는 데만 참고하고 번역 결과에는 포함하지 마라."
+)
+
+CONTEXT_INSTRUCTION = (
+    "Text to Translate는 긴 글의 일부다. Context는 바로 앞뒤 내용으로, 용어와 말투를 맞추는 데만 참고하고 "
+    "번역 결과에는 포함하지 마라."
+)
+
+
+_RETRY_DELAY_RE = re.compile(r"retry(?:_delay)?\s*(?:\{\s*seconds:\s*|in\s+)([\d.]+)", re.IGNORECASE)
+
+
+def _rate_limit_delay(e: Exception) -> Optional[float]:
+    """429(ResourceExhausted) 이면 서버가 알려준 대기 시간(모르면 0), 아니면 None."""
+    if type(e).__name__ != "ResourceExhausted" and getattr(e, "code", None) != 429:
+        return None
+    m = _RETRY_DELAY_RE.search(str(e))
+    return float(m.group(1)) if m else 0.0
+
+
+_genai_lock = threading.Lock()
+_genai_config: Optional[tuple] = None
+
+
+def _cache_rejected(e: Exception) -> bool:
+    """컨텍스트 캐시를 만들 수 없는 요청(400: 최소 토큰 수 미달, 지원하지 않는 모델 등)인지."""
+    return getattr(e, "code", None) == 400 or type(e).__name__ == "InvalidArgument"
+
+
+def _cache_lost(e: Exception) -> bool:
+    """참조한 컨텍스트 캐시가 서버에 없음 (만료/삭제, 403 또는 404)."""
+    return getattr(e, "code", None) in (403, 404) and "cache" in str(e).lower()
+
+
+class _ContextCache:
+    """서버에 등록한 시스템 프롬프트(CachedContent)와 그것을 참조하는 모델."""
+    __slots__ = ("signature", "content", "model", "expires", "tokens")
+
+    def __init__(self, signature: tuple, content, model):
+        self.signature = signature
+        self.content = content
+        self.model = model
+        self.tokens = int(getattr(content.usage_metadata, "total_token_count", 0) or 0)
+        self.expires = 0.0
+        self.set_expiry()
+
+    def set_expiry(self):
+        """서버의 expire_time 을 time.monotonic() 기준으로."""
+        left = (self.content.expire_time - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+        self.expires = time.monotonic() + min(left, CONTEXT_CACHE_TTL)
+
+
+def _configure_genai(api_key: str, transport: Optional[str] = None,
+                     api_endpoint: Optional[str] = None) -> bool:
+    """
+    genai 전역 설정. 값이 바뀌었을 때만 genai.configure 를 다시 호출한다.
+    (configure 는 SDK 의 기본 클라이언트를 버리므로, 호출할 때마다 연결 풀/gRPC 채널과 TLS 세션이 새로 만들어진다)
+    실제로 다시 설정했으면 True.
+    """
+    global _genai_config
+    key = (api_key, transport, api_endpoint)
+    with _genai_lock:
+        if _genai_config == key:
+            return False
+        kwargs = {"api_key": api_key}
+        if transport:
+            kwargs["transport"] = transport
+        if api_endpoint:
+            kwargs["client_options"] = {"api_endpoint": api_endpoint}
+        genai.configure(**kwargs)
+        _genai_config = key
+        return True
+
+
+def reset_connections():
+    """다음 LLMClient 생성/reload 때 genai 를 다시 설정하게 한다 (새 연결로 측정할 때 사용)."""
+    global _genai_config
+    with _genai_lock:
+        _genai_config = None
+
+
 class LLMClient:
     """
     Gemini 호출 래퍼.
     - settings.system_prompt  → Commands (system_instruction)
     - 입력 텍스트             → "Text to Translate:\n{ocr_text}"
+    - settings.use_context_cache 가 켜져 있으면 시스템 프롬프트를 서버에 한 번 등록(CachedContent)하고
+      요청에서는 참조만 한다. 등록/연장은 백그라운드에서 하며, 준비되기 전이나 등록할 수 없으면
+      (최소 토큰 수 미달 등) 지금처럼 system_instruction 으로 보낸다.
+    한 인스턴스를 오래 두고 쓴다: SDK 기본 클라이언트(keep-alive 연결 풀/gRPC HTTP/2 채널)가
+    캡처마다 재사용되도록, 설정이 바뀐 경우에만 reload() 로 다시 구성한다.
     """
     def __init__(
         self,
@@ -25,69 +138,375 @@ class LLMClient:
         temperature: float = 0.2,
         max_retries: int = 3,
         retry_base_delay: float = 0.8,
-        request_timeout: Optional[float] = None,  # SDK 전역 타임아웃은 없으나, 내부적으로 사용 가능
+        request_timeout: Optional[float] = 30.0,  # 시도 한 번의 최대 시간 (deadline 이 있으면 남은 시간과 작은 쪽)
+        transport: Optional[str] = None,          # "grpc"(기본, HTTP/2) / "rest"
+        api_endpoint: Optional[str] = None,       # 예) "127.0.0.1:8443" (테스트용 스텁 서버)
+        scheduler: Optional[RequestScheduler] = None,
     ):
         self._settings = settings
         self._temperature = float(temperature)
         self._max_retries = int(max_retries)
         self._retry_base_delay = float(retry_base_delay)
         self._timeout = request_timeout
+        self._transport = transport
+        self._api_endpoint = api_endpoint
+        self._scheduler = scheduler or default_scheduler
 
         self._model = None
+        self._signature: Optional[tuple] = None
+        self._system_tokens = 0        # 시스템 프롬프트 토큰 (추정, warm_up 의 count_tokens 로 보정. 사용량 기록용)
+        self._last_used = 0.0          # 마지막으로 서버와 통신이 성공한 시각 (monotonic)
+        self._warming: Optional[threading.Thread] = None
+        self._ctx: Optional[_ContextCache] = None
+        self._ctx_lock = threading.Lock()
+        self._ctx_busy = False                # 등록/연장 중
+        self._ctx_retry_at = 0.0              # 일시적 실패 후 다시 시도할 시각
+        self._ctx_rejected: Optional[tuple] = None   # 등록할 수 없는 signature (바뀌면 다시 시도)
         self._configure()
 
     # -------------------- public API --------------------
 
-    def translate(self, ocr_text: str) -> str:
+    def reload(self) -> bool:
+        """설정을 다시 읽어 바뀐 부분만 재구성. 무언가 바뀌었으면 True."""
+        changed = self._configure()
+        if not self._use_context_cache():
+            self._drop_context_cache()   # 껐으면 만료를 기다리지 않고 지운다
+        return changed
+
+    def warm_up(self, max_idle: float = 30.0, wait: bool = False) -> Optional[threading.Thread]:
+        """
+        연결을 미리 맺어 둔다(DNS/TCP/TLS). 최근 max_idle 초 안에 통신했다면 아무것도 하지 않는다.
+        가벼운 count_tokens 요청을 백그라운드 스레드에서 보낸다. 실패는 무시한다.
+        """
+        if time.monotonic() - self._last_used < max_idle:
+            return None
+        th = self._warming
+        if th is None or not th.is_alive():
+            th = threading.Thread(target=self._warm, name="ocr-translator-LLMWARM", daemon=True)
+            self._warming = th
+            th.start()
+        if wait:
+            th.join()
+        return th
+
+    def translate(self, ocr_text: str, *, priority: int = PRIORITY_INTERACTIVE,
+                  key: Optional[str] = None, before: str = "", after: str = "",
+                  deadline: Optional[Deadline] = None, group: Optional[tuple] = None) -> str:
         """
         OCR 텍스트를 받아 번역 결과 문자열을 반환.
+        priority / key 는 스케줄러에 그대로 전달 (같은 key 의 새 요청이 오면 LLMSupersededError).
+        before / after: 긴 글을 나눠 번역할 때 앞뒤 청크의 일부 (문맥으로만 전달).
+        group: (id, 순번) — 한 글의 청크들을 스케줄러에서 순번대로 보낸다.
+        deadline: 대기와 재시도를 남은 시간 안에서만 (넘기면 DeadlineExceeded). 첫 시도는 끝까지 기다린다.
         실패 시 LLMError 발생.
         """
         if not isinstance(ocr_text, str):
             raise TypeError("ocr_text는 문자열이어야 합니다.")
-        payload = self._build_user_payload(ocr_text)
-        resp = self._call_with_retries(payload)
+        payload = self._build_user_payload(ocr_text, before, after)
+        resp, _ = self._call_with_retries(payload, priority=priority, key=key, deadline=deadline, group=group)
         return self._extract_text(resp)
 
+    def translate_many(self, segments: dict[str, str], *, max_rounds: int = 2,
+                       priority: int = PRIORITY_INTERACTIVE, key: Optional[str] = None,
+                       deadline: Optional[Deadline] = None, context: str = "") -> dict[str, str]:
+        """
+        여러 독립 문장(id → 텍스트)을 한 번의 요청으로 번역.
+        - JSON 구조화 출력으로 요청하고 id별로 나눠서 검증
+        - 누락/형식 오류 id만 모아 최대 max_rounds 회 다시 요청
+        - 그래도 남은 id는 개별 translate()로 처리
+        context: 주변 원문 (문맥으로만 전달, 요청마다 한 번).
+        실패 시 LLMError 발생.
+        """
+        pending = {str(k): v for k, v in segments.items() if isinstance(v, str) and v.strip()}
+        out = {str(k): "" for k in segments}
+        for _ in range(max(1, int(max_rounds))):
+            if len(pending) <= 1:
+                break
+            resp, _ = self._call_with_retries(
+                self._build_many_payload(pending, context),
+                generation_config={"response_mime_type": "application/json"},
+                priority=priority, key=key, deadline=deadline,
+            )
+            got = self._split_many(self._extract_text(resp), pending.keys())
+            out.update(got)
+            pending = {k: v for k, v in pending.items() if k not in got}
+        for k, v in pending.items():
+            out[k] = self.translate(v, priority=priority, deadline=deadline, before=context)
+        return out
+
+    def translate_stream(self, ocr_text: str, *, priority: int = PRIORITY_INTERACTIVE,
+                         key: Optional[str] = None, deadline: Optional[Deadline] = None) -> Iterator[str]:
+        """
+        번역 결과를 조각 단위로 내보내는 스트리밍 버전.
+        첫 조각을 받기 전까지만 재시도하며, 실패 시 LLMError 발생.
+        deadline 은 첫 조각까지의 대기/재시도에 적용된다.
+        """
+        if not isinstance(ocr_text, str):
+            raise TypeError("ocr_text는 문자열이어야 합니다.")
+        payload = self._build_user_payload(ocr_text)
+        resp, retries = self._call_with_retries(payload, stream=True, priority=priority, key=key,
+                                                deadline=deadline)
+        meta = None   # 사용량은 마지막 조각에 들어 있다
+        try:
+            for chunk in resp:
+                meta = getattr(chunk, "usage_metadata", None) or meta
+                t = getattr(chunk, "text", None)
+                if t:
+                    yield t
+        except Exception as e:
+            self._record_usage(key, None, retries, failed=True)
+            raise LLMError(f"Gemini 스트리밍 실패: {e}")
+        self._record_usage(key, meta, retries)
+
     # -------------------- internal helpers --------------------
 
-    def _configure(self):
+    def _configure(self) -> bool:
         api_key = (self._settings.gemini_api_key or "").strip()
         model_name = (self._settings.gemini_model or "").strip()
         sys_prompt = (self._settings.system_prompt or "").strip()
 
-        genai.configure(api_key=api_key)
+        # 한도(0 = 무제한)는 값이 그대로면 버킷 상태가 유지된다
+        self._scheduler.set_limits(model_name, int(getattr(self._settings, "gemini_rpm", 0)),
+                                   int(getattr(self._settings, "gemini_tpm", 0)))
+        reconnected = _configure_genai(api_key, self._transport, self._api_endpoint)
+        signature = (model_name, sys_prompt)
+        if not reconnected and self._model is not None and signature == self._signature:
+            return False
         # system_instruction 에 Commands 내용을 그대로 넣음
+        # (GenerativeModel 은 처음 호출할 때 SDK 기본 클라이언트를 잡으므로, 재설정 후에는 새로 만든다)
         self._model = genai.GenerativeModel(
             model_name,
             system_instruction=sys_prompt if sys_prompt else None
         )
+        self._signature = signature
+        self._system_tokens = estimate_tokens(sys_prompt) if sys_prompt else 0
+        if reconnected:
+            self._last_used = 0.0
+        self._drop_context_cache()
+        return True
+
+    def _use_context_cache(self) -> bool:
+        return bool(getattr(self._settings, "use_context_cache", False)) and bool(self._signature[1])
+
+    def _cached_model(self):
+        """
+        컨텍스트 캐시를 참조하는 모델. 없거나 곧 만료되면 백그라운드에서 등록/연장하고,
+        쓸 수 있는 캐시가 없으면 None (이번 요청은 system_instruction 으로).
+        """
+        if not self._use_context_cache():
+            return None
+        now = time.monotonic()
+        with self._ctx_lock:
+            ctx = self._ctx
+            if ctx is not None and (ctx.signature != self._signature or now >= ctx.expires - 5):
+                ctx = self._ctx = None
+            refresh = ctx is None or ctx.expires - now < CONTEXT_CACHE_TTL / 2
+            if (refresh and not self._ctx_busy and self._ctx_rejected != self._signature
+                    and now >= self._ctx_retry_at):
+                self._ctx_busy = True
+                threading.Thread(target=self._refresh_context_cache, args=(ctx,),
+                                 name="ocr-translator-LLMCACHE", daemon=True).start()
+        return ctx.model if ctx is not None else None
+
+    def _refresh_context_cache(self, ctx: Optional[_ContextCache]):
+        """ctx 가 있으면 유지 시간을 연장, 없으면 현재 시스템 프롬프트를 새로 등록."""
+        signature = self._signature
+        model_name, sys_prompt = signature
+        ttl = datetime.timedelta(seconds=CONTEXT_CACHE_TTL)
+        t0 = time.monotonic()
+        try:
+            if ctx is not None:
+                ctx.content.update(ttl=ttl)
+                ctx.set_expiry()
+                metrics.incr("llm.context_cache.extend")
+                return
+            content = caching.CachedContent.create(model=model_name, system_instruction=sys_prompt, ttl=ttl,
+                                                   display_name="ocr-translate-system-prompt")
+            ctx = _ContextCache(signature, content, genai.GenerativeModel.from_cached_content(content))
+            metrics.incr("llm.context_cache.create")
+            metrics.observe("llm.context_cache.create_time", time.monotonic() - t0)
+            with self._ctx_lock:
+                if self._signature == signature:
+                    self._ctx, ctx = ctx, None
+            if ctx is not None:   # 만드는 동안 프롬프트/모델이 바뀜
+                self._delete_context_cache(ctx)
+        except Exception as e:
+            if _cache_rejected(e):
+                metrics.incr("llm.context_cache.rejected")
+                self._ctx_rejected = signature
+            else:
+                metrics.incr("llm.context_cache.error")
+                self._ctx_retry_at = time.monotonic() + CONTEXT_CACHE_RETRY
+                if ctx is not None and _cache_lost(e):
+                    self._invalidate_context_cache(ctx)
+        finally:
+            self._ctx_busy = False
+
+    def _invalidate_context_cache(self, ctx: _ContextCache):
+        with self._ctx_lock:
+            if self._ctx is ctx:
+                self._ctx = None
+
+    def _drop_context_cache(self):
+        """프롬프트/모델/연결이 바뀌었을 때: 이전 캐시는 서버에서 지운다 (실패해도 곧 만료)."""
+        with self._ctx_lock:
+            ctx, self._ctx = self._ctx, None
+        if ctx is not None:
+            threading.Thread(target=self._delete_context_cache, args=(ctx,), daemon=True).start()
+
+    @staticmethod
+    def _delete_context_cache(ctx: _ContextCache):
+        try:
+            ctx.content.delete()
+        except Exception:
+            pass
+
+    def _warm(self):
+        model = self._model
+        try:
+            n = int(model.count_tokens("ping").total_tokens)
+            self._last_used = time.monotonic()
+        except Exception:
+            return
+        if model is self._model and self._signature and self._signature[1]:
+            self._system_tokens = max(0, n - 1)   # count_tokens 는 system_instruction 을 포함한다 ("ping" 1토큰 제외)
+        self._cached_model()   # 컨텍스트 캐시를 쓰면 캡처 전에 미리 등록
+
+    def _build_user_payload(self, ocr_text: str, before: str = "", after: str = ""):
+        if not (before or after):
+            return f"Text to Translate:\n{ocr_text}"
+        ctx = [CONTEXT_INSTRUCTION]
+        if before:
+            ctx.append(f"Context (before):\n{before}")
+        if after:
+            ctx.append(f"Context (after):\n{after}")
+        return "\n\n".join(ctx) + f"\n\nText to Translate:\n{ocr_text}"
+
+    @staticmethod
+    def _build_many_payload(segments: dict[str, str], context: str = "") -> str:
+        body = json.dumps(
+            {"segments": [{"id": k, "text": v} for k, v in segments.items()]},
+            ensure_ascii=False,
+        )
+        if context:
+            return f"{MANY_INSTRUCTION}\n{MANY_CONTEXT_INSTRUCTION}\n\nContext:\n{context}\n\nText to Translate:\n{body}"
+        return f"{MANY_INSTRUCTION}\n\nText to Translate:\n{body}"
 
-    def _build_user_payload(self, ocr_text: str):
-        return f"Text to Translate:\n{ocr_text}"
+    @staticmethod
+    def _split_many(raw: str, ids: Iterable[str]) -> dict[str, str]:
+        """응답 JSON을 id별로 나눈다. 요청하지 않은 id, 빈 문자열, 형식이 틀린 항목은 버린다."""
+        wanted = set(ids)
+        try:
+            data = json.loads(_JSON_FENCE_RE.sub("", raw))
+        except (ValueError, TypeError):
+            return {}
 
-    def _call_with_retries(self, user_payload: str):
+        items = []
+        if isinstance(data, dict) and isinstance(data.get("translations"), list):
+            items = data["translations"]
+        elif isinstance(data, list):
+            items = data
+        elif isinstance(data, dict):
+            items = [{"id": k, "text": v} for k, v in data.items()]
+
+        got = {}
+        for it in items:
+            if not isinstance(it, dict):
+                continue
+            k, t = str(it.get("id")), it.get("text")
+            if k in wanted and isinstance(t, str) and t.strip():
+                got[k] = t.strip()
+        return got
+
+    def _call_with_retries(self, user_payload: str, stream: bool = False,
+                           generation_config: Optional[dict] = None, *,
+                           priority: int = PRIORITY_INTERACTIVE, key: Optional[str] = None,
+                           deadline: Optional[Deadline] = None, group: Optional[tuple] = None):
         """
         간단한 재시도(backoff) 포함. SDK 오류 메시지를 LLMError로 래핑.
+        매 시도 전에 스케줄러에서 RPM/TPM 여유를 기다리고, 429 면 해당 모델을 잠시 멈춘다.
+        시도마다 request_timeout 을 요청 타임아웃으로 건다. deadline 은 스케줄러 대기와 재시도에만 적용하고,
+        첫 시도는 마감을 넘겨도 끊지 않는다 (늦어진 만큼은 deadline 의 단계 초과로 기록된다).
+        마감 전에 다시 시도할 시간이 없으면 DeadlineExceeded.
+        (응답, 재시도 수) 반환. 스트리밍이 아니면 토큰 사용량도 여기서 기록한다.
         """
+        model_name, sys_prompt = self._signature
+        est = estimate_tokens(sys_prompt, user_payload)
         last_err: Optional[Exception] = None
-        for attempt in range(1, self._max_retries + 1):
+        attempt, attempts = 0, self._max_retries
+        while attempt < attempts:
+            attempt += 1
             try:
-                resp = self._model.generate_content(
+                wait = deadline.timeout() if deadline is not None else None
+                self._scheduler.acquire(model_name, est, priority=priority, key=key, timeout=wait, group=group)
+            except SupersededError as e:
+                raise LLMSupersededError(str(e))
+            except TimeoutError as e:
+                if deadline is None or isinstance(e, DeadlineExceeded):
+                    raise
+                raise DeadlineExceeded(f"마감 전에 요청 순서가 오지 않음 ({model_name})")
+            timeout = deadline.timeout(self._timeout) if deadline is not None and attempt > 1 else self._timeout
+            cached = self._cached_model()
+            t0 = time.monotonic()
+            try:
+                resp = (cached or self._model).generate_content(
                     user_payload,
                     generation_config={
                         "temperature": self._temperature,
+                        **(generation_config or {}),
                     },
                     safety_settings=None,
+                    stream=stream,
+                    request_options={"timeout": timeout} if timeout is not None else None,
                 )
-                return resp
+                self._last_used = time.monotonic()
+                metrics.observe("llm.latency", self._last_used - t0)
+                if self._use_context_cache():
+                    metrics.observe("llm.latency.context_cache" if cached is not None else "llm.latency.no_context_cache",
+                                    self._last_used - t0)
+                if not stream:
+                    meta = getattr(resp, "usage_metadata", None)
+                    self._scheduler.settle(model_name, est, int(getattr(meta, "prompt_token_count", 0) or 0))
+                    self._record_usage(key, meta, attempt - 1)
+                return resp, attempt - 1
             except Exception as e:
                 last_err = e
-                if attempt >= self._max_retries:
+                if cached is not None and _cache_lost(e):
+                    # 캐시가 서버에서 만료/삭제됨: 바로 system_instruction 으로 한 번 더 (캐시는 백그라운드에서 다시 등록)
+                    metrics.incr("llm.context_cache.lost")
+                    with self._ctx_lock:
+                        if self._ctx is not None and self._ctx.model is cached:
+                            self._ctx = None
+                    if attempts == self._max_retries:
+                        attempts += 1
+                    continue
+                delay = self._retry_base_delay * (2 ** (attempt - 1))
+                limited = _rate_limit_delay(e)
+                if limited is not None:
+                    # 429: 같은 모델의 다른 요청도 함께 기다리도록 스케줄러에서 멈춤 (재시도는 acquire 에서 대기)
+                    metrics.incr("llm.rate_limited")
+                    self._scheduler.penalize(model_name, max(delay, limited))
+                if attempt >= attempts:
                     break
-                time.sleep(self._retry_base_delay * (2 ** (attempt - 1)))
+                if deadline is not None and deadline.remaining() <= delay:
+                    metrics.incr("llm.deadline_abort")
+                    self._record_usage(key, None, attempt - 1, failed=True)
+                    raise DeadlineExceeded(f"마감 전에 다시 시도할 시간이 없음: {last_err}")
+                if limited is None:
+                    time.sleep(delay)
+        self._record_usage(key, None, attempt - 1, failed=True)
         raise LLMError(f"Gemini 호출 실패: {last_err}")
 
+    def _record_usage(self, key: Optional[str], meta, retries: int, failed: bool = False):
+        """usage_metadata(없으면 0)를 사용량 집계에 추가. total 이 입력+출력보다 크면 그 차이는 thinking (출력으로 과금)."""
+        prompt = int(getattr(meta, "prompt_token_count", 0) or 0)
+        output = int(getattr(meta, "candidates_token_count", 0) or 0)
+        total = int(getattr(meta, "total_token_count", 0) or 0)
+        usage.record(self._signature[0], region_of(key), prompt=prompt,
+                     cached=int(getattr(meta, "cached_content_token_count", 0) or 0),
+                     output=max(output, total - prompt), retries=retries,
+                     system=self._system_tokens if meta is not None else 0, failed=failed)
+
     @staticmethod
     def _extract_text(resp) -> str:
 
@@ -0,0 +1,336 @@
+"""
+로컬 번역 서버 (localhost 전용).
+
+  GET  /health                    → {"ok": true, ...}
+  POST /ocr?lang=en-US            (body: 이미지 바이트)          → {"ocr_text": ...}
+  POST /translate?lang=en-US      (body: 이미지 바이트 또는 텍스트) → {"ocr_text": ..., "translation": ...}
+  POST /translate/stream?lang=... (동일)                         → text/event-stream (ocr / delta / done / error)
+
+본문이 text/* 이면 OCR을 건너뛰고 곧바로 번역한다.
+번역은 배치 우선순위로 스케줄되며(앱의 캡처가 먼저), ?key=... 를 주면 같은 key 의
+아직 보내지 않은 이전 요청은 취소된다(409).
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import io
+import json
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import urlsplit, parse_qs
+
+from PIL import Image
+
+from llm_api import LLMError, LLMSupersededError
+from ocr_win import OcrBusyError
+from pipeline import TranslationPipeline
+from scheduler import PRIORITY_BATCH
+
+MAX_BODY_BYTES = 32 * 1024 * 1024
+DEFAULT_LANG = "en-US"
+
+_STATUS_TEXT = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error", 502: "Bad Gateway",
+    503: "Service Unavailable",
+}
+
+
+class _HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class _Request:
+    def __init__(self, method: str, path: str, query: dict, headers: dict, body: bytes):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    @property
+    def lang(self) -> str:
+        return (self.query.get("lang") or [DEFAULT_LANG])[0]
+
+    @property
+    def key(self) -> Optional[str]:
+        return (self.query.get("key") or [None])[0]
+
+    @property
+    def is_text(self) -> bool:
+        return self.headers.get("content-type", "").startswith("text/")
+
+
+class LocalTranslationServer:
+    """
+    asyncio 기반 로컬 HTTP 서버.
+    - 전용 백그라운드 이벤트 루프(ocr_win._make_bg_loop 과 같은 구조)에서 동작
+    - 동시 처리 수(max_concurrency) 제한 + 대기열 상한(max_queue) 초과 시 503
+    - OCR/번역은 앱과 같은 TranslationPipeline 을 공유
+    """
+    def __init__(self, pipeline: TranslationPipeline, *, host: str = "127.0.0.1",
+                 port: int = 8765, max_concurrency: int = 2, max_queue: int = 16):
+        self.pipeline = pipeline
+        self.host = host
+        self.port = int(port)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue = max(0, int(max_queue))
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._waiting = 0
+        self._running = 0
+        self.last_error: str | None = None
+
+    # -------------------- lifecycle --------------------
+
+    def start(self) -> bool:
+        if self._thread:
+            return True
+        ready = threading.Event()
+
+        def _worker():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self._open())
+            except Exception as e:
+                self.last_error = f"서버 시작 실패: {e}"
+                ready.set()
+                self._loop.close()
+                return
+            ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._close())
+            self._loop.close()
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                            thread_name_prefix="ocr-translator-SERVER")
+        self._thread = threading.Thread(target=_worker, name="ocr-translator-SERVERLOOP", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if self._server is None:
+            self._thread = None
+            self._executor.shutdown(wait=False)
+            return False
+        return True
+
+    def stop(self):
+        if self._loop and self._thread:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=2.0)
+        if self._executor:
+            self._executor.shutdown(wait=False)
+        self._thread = None
+        self._server = None
+
+    async def _open(self):
+        self._sem = asyncio.Semaphore(self.max_concurrency)
+        self._server = await asyncio.start_server(self._handle_conn, self.host, self.port)
+
+    async def _close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    # -------------------- connection --------------------
+
+    async def _handle_conn(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            req = await self._read_request(reader)
+            await self._dispatch(req, writer)
+        except _HttpError as e:
+            await self._send_json(writer, e.status, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            try:
+                await self._send_json(writer, 500, {"error": str(e)})
+            except Exception:
+                pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> _Request:
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise _HttpError(400, "잘못된 요청 줄")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                k, v = line.split(":", 1)
+                headers[k.strip().lower()] = v.strip()
+
+        raw_length = headers.get("content-length") or "0"
+        if not (raw_length.isascii() and raw_length.isdigit()):
+            raise _HttpError(400, "잘못된 Content-Length")
+        length = int(raw_length)
+        if length > MAX_BODY_BYTES:
+            raise _HttpError(413, "본문이 너무 큽니다.")
+        body = await reader.readexactly(length) if length else b""
+
+        url = urlsplit(target)
+        return _Request(method.upper(), url.path, parse_qs(url.query), headers, body)
+
+    async def _dispatch(self, req: _Request, writer: asyncio.StreamWriter):
+        if req.path == "/health":
+            await self._send_json(writer, 200, {
+                "ok": True, "running": self._running, "waiting": self._waiting,
+                "max_concurrency": self.max_concurrency, "max_queue": self.max_queue,
+            })
+            return
+
+        routes = {
+            "/ocr": self._route_ocr,
+            "/translate": self._route_translate,
+            "/translate/stream": self._route_translate_stream,
+        }
+        route = routes.get(req.path)
+        if route is None:
+            raise _HttpError(404, f"알 수 없는 경로: {req.path}")
+        if req.method != "POST":
+            raise _HttpError(405, "POST만 지원합니다.")
+        if not req.body:
+            raise _HttpError(400, "본문이 비어 있습니다.")
+
+        async with self._slot():
+            await route(req, writer)
+
+    # -------------------- queueing --------------------
+
+    @contextlib.asynccontextmanager
+    async def _slot(self):
+        if self._sem.locked() and self._waiting >= self.max_queue:
+            raise _HttpError(503, "대기열이 가득 찼습니다.")
+        self._waiting += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self._waiting -= 1
+        self._running += 1
+        try:
+            yield
+        finally:
+            self._running -= 1
+            self._sem.release()
+
+    async def _in_executor(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    # -------------------- routes --------------------
+
+    async def _ocr_or_text(self, req: _Request) -> str:
+        if req.is_text:
+            charset = "utf-8"
+            ctype = req.headers.get("content-type", "")
+            if "charset=" in ctype:
+                charset = ctype.split("charset=", 1)[1].split(";")[0].strip()
+            return req.body.decode(charset, errors="replace").strip()
+
+        try:
+            img = Image.open(io.BytesIO(req.body))
+            img.load()
+        except Exception as e:
+            raise _HttpError(400, f"이미지를 읽을 수 없습니다: {e}")
+        try:
+            text = await self._in_executor(self.pipeline.ocr, img, req.lang)
+            return self.pipeline.clean(text, req.lang).payload
+        except OcrBusyError as e:
+            raise _HttpError(503, str(e))
+        except Exception as e:
+            raise _HttpError(502, f"OCR 실패: {e}")
+
+    async def _route_ocr(self, req: _Request, writer: asyncio.StreamWriter):
+        if req.is_text:
+            raise _HttpError(400, "이미지 본문이 필요합니다.")
+        ocr_text = await self._ocr_or_text(req)
+        await self._send_json(writer, 200, {"ocr_text": ocr_text, "lang": req.lang})
+
+    async def _route_translate(self, req: _Request, writer: asyncio.StreamWriter):
+        ocr_text = await self._ocr_or_text(req)
+        translated = ""
+        if ocr_text:
+            try:
+                translated = await self._in_executor(functools.partial(
+                    self.pipeline.translate, ocr_text, priority=PRIORITY_BATCH, key=req.key))
+            except LLMSupersededError as e:
+                raise _HttpError(409, str(e))
+            except LLMError as e:
+                raise _HttpError(502, f"번역 실패: {e}")
+        await self._send_json(writer, 200, {"ocr_text": ocr_text, "translation": translated})
+
+    async def _route_translate_stream(self, req: _Request, writer: asyncio.StreamWriter):
+        ocr_text = await self._ocr_or_text(req)
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream; charset=utf-8\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        await self._send_event(writer, "ocr", {"ocr_text": ocr_text})
+        if not ocr_text:
+            await self._send_event(writer, "done", {"translation": ""})
+            return
+
+        loop = asyncio.get_running_loop()
+        q: asyncio.Queue = asyncio.Queue()
+        _END = object()
+
+        def _produce():
+            try:
+                for piece in self.pipeline.translate_stream(ocr_text, priority=PRIORITY_BATCH, key=req.key):
+                    loop.call_soon_threadsafe(q.put_nowait, piece)
+            except Exception as e:
+                loop.call_soon_threadsafe(q.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(q.put_nowait, _END)
+
+        producer = loop.run_in_executor(self._executor, _produce)
+        buf = []
+        while True:
+            item = await q.get()
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                await self._send_event(writer, "error", {"error": f"번역 실패: {item}"})
+                await producer
+                return
+            buf.append(item)
+            await self._send_event(writer, "delta", {"text": item})
+        await producer
+        await self._send_event(writer, "done", {"translation": "".join(buf).strip()})
+
+    # -------------------- response helpers --------------------
+
+    @staticmethod
+    async def _send_json(writer: asyncio.StreamWriter, status: int, obj: dict):
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+    @staticmethod
+    async def _send_event(writer: asyncio.StreamWriter, event: str, obj: dict):
+        data = json.dumps(obj, ensure_ascii=False)
+        writer.write(f"event: {event}\ndata: {data}\n\n".encode("utf-8"))
+        await writer.drain()
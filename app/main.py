@@ -1,32 +1,19 @@
+import multiprocessing
+import sqlite3
 import sys
 from PyQt5 import QtCore, QtWidgets, QtGui
 from PyQt5.QtCore import Qt
-import mss
-from PIL import Image
 
 from ui_app import MainWindow
-from ocr_win import windows_ocr
-from hotkey_manager import WinHotkeyManager
+from hotkey_manager import HotkeyService
 from settings import SettingsManager
-from overlay import OverlayWindow
-from llm_api import LLMClient, LLMError
-
-def capture_rect_global(rect) -> Image.Image:
-    with mss.mss() as sct:
-        raw = sct.grab({"left": rect.x(), "top": rect.y(),
-                        "width": rect.width(), "height": rect.height()})
-        return Image.frombytes("RGB", (raw.width, raw.height), raw.rgb)
-
-def _prefix_function(s: str) -> list[int]:
-    pi = [0] * len(s)
-    j = 0
-    for i in range(1, len(s)):
-        while j and s[i] != s[j]:
-            j = pi[j - 1]
-        if s[i] == s[j]:
-            j += 1
-            pi[i] = j
-    return pi
+from pipeline import TranslationPipeline
+from local_server import LocalTranslationServer
+from controller import CaptureController
+from ocr_win import ocr_executor
+from history import HistoryStore
+from session_trace import SessionRecorder
+from usage import usage
 
 class App(QtWidgets.QApplication):
     pass
@@ -36,124 +23,102 @@ def main():
 
     # 1) 설정 로드
     mgr = SettingsManager()
-    w = MainWindow(mgr)
+    try:
+        history = HistoryStore()   # 번역 기록 (AppData/history.db)
+    except sqlite3.Error:
+        history = None
+    w = MainWindow(mgr, history)
     w.setWindowIcon(QtGui.QIcon("icon.ico"))
     w.show()
 
-    # LLM 클라이언트
-    llm = LLMClient(mgr)
-
-    # overlay
-    w.current_overlay = None
-
-    # 2) OCR 연결
-    before_ocr_text = None
-    def run_pipeline(rect_global):
-        nonlocal before_ocr_text
-        if getattr(w, "current_overlay", None):
-            try: w.current_overlay.close()
-            except Exception: pass
-            w.current_overlay = None
-
-        # 오버레이 생성
-        overlay = None
-        if mgr.use_overlay_layout:
-            overlay = OverlayWindow(rect_global, "", font_family=mgr.font_family, font_size=mgr.font_size)
-            w.current_overlay = overlay
-
-        # 캡처/OCR/번역
-        try:
-            img = capture_rect_global(rect_global)
-            ocr_text = windows_ocr(img, w.get_lang_tag())
-            if not ocr_text:
-                return
-        except Exception as e:
-            w.show_text(f"OCR 실패: {e}")
-            return
-        
-        if mgr.use_scroll_detect and before_ocr_text != None:
-            index = 0
-            maxlen = len(ocr_text) - 7
-            while index <= maxlen:
-                temp = ocr_text[index:] + "궯" + before_ocr_text
-                temp_len = _prefix_function(temp)[-1]
-                if temp_len >= 7: break
-                index += 1
-                
-            if temp_len >= 7:
-                ocr_text = before_ocr_text + ocr_text[index+temp_len:]
-        before_ocr_text = ocr_text
-
-        try:
-            translated = LLMClient(mgr).translate(ocr_text)
-            if mgr.use_overlay_layout: overlay.set_text(translated)
-            w.show_text(translated + f"\n\n\n### 캡처한 원문:\n{ocr_text}")
-        except LLMError as e:
-            w.show_text(f"번역 실패: {e}")
-
-
-    def on_rect_selected(rect_global):
-        w.last_selection_rect = QtCore.QRect(rect_global)
-        run_pipeline(rect_global)
-
-    w.rectSelected.connect(on_rect_selected)
-
-    # 3) 전역 핫키 등록
-    before_hk_key = None
-    before_hk_rem_key = None
-    hk = None
-    hk_rem = None
+    # OCR 동시 실행/대기열 제한
+    ocr_executor().configure(mgr.ocr_concurrency, mgr.ocr_queue_limit)
+
+    # OCR/번역 파이프라인 (LLM 클라이언트는 GUI/로컬 서버가 공유)
+    pipeline = TranslationPipeline(mgr)
+
+    # 2) 캡처 → OCR → 번역 연결
+    controller = CaptureController(w, mgr, pipeline, history=history)
+
+    # 3) 전역 핫키 등록 (하나의 서비스 스레드가 모든 핫키를 처리)
+    hotkeys = HotkeyService()
+    hotkeys.start()   # 실패 이유는 아래 등록 결과에 함께 표시됨
+
+    # (hotkey id, 설정값, 호출할 MainWindow 슬롯)
+    hotkey_table = [
+        (1, lambda: mgr.hotkey_combo, "start_capture"),
+        (2, lambda: mgr.hotkey_rem_combo, "run_last_rect"),
+        (3, lambda: mgr.hotkey_regions_combo, "run_saved_regions"),
+        (4, lambda: mgr.hotkey_retranslate_combo, "retranslate_last_rect"),
+    ]
     def register_hotkey():
-        nonlocal hk, hk_rem, before_hk_key, before_hk_rem_key
-        ok1 = True
-        ok2 = True
-        # hotkey 1
-        if before_hk_key != mgr.hotkey_combo and mgr.hotkey_combo: 
-            ok1 = None
-            if hk is not None:
-                hk.stop(); hk = None
-
-            def on_hotkey():
-                QtCore.QMetaObject.invokeMethod(w, "start_capture", Qt.QueuedConnection)
-
-            hk = WinHotkeyManager(on_hotkey, combo=mgr.hotkey_combo, norepeat=True, hotkey_id=1)
-            ok1 = hk.start()
-            before_hk_key = mgr.hotkey_combo
-
-        # hotkey 2
-        if before_hk_rem_key != mgr.hotkey_rem_combo and mgr.hotkey_rem_combo: 
-            ok2 = None
-            if hk_rem is not None:
-                hk_rem.stop(); hk_rem = None
-
-            def on_hotkey_rem():
-                QtCore.QMetaObject.invokeMethod(w, "run_last_rect", Qt.QueuedConnection)
-
-            hk_rem = WinHotkeyManager(on_hotkey_rem, combo=mgr.hotkey_rem_combo, norepeat=True, hotkey_id=2)    
-            ok2 = hk_rem.start()
-            before_hk_rem_key = mgr.hotkey_rem_combo
+        errors = []
+        for hotkey_id, get_combo, slot in hotkey_table:
+            combo = get_combo()
+            if not combo:
+                hotkeys.remove_hotkey(hotkey_id)
+                continue
+            on_hotkey = lambda slot=slot: QtCore.QMetaObject.invokeMethod(w, slot, Qt.QueuedConnection)
+            if not hotkeys.set_hotkey(hotkey_id, combo, on_hotkey, norepeat=True):
+                errors.append(f"{combo}: {hotkeys.last_error}")
 
         # post processing
-        if ok1 and ok2:
-            w.statusBar().showMessage(f"전역 핫키 등록: {mgr.hotkey_combo}, {mgr.hotkey_rem_combo}", 4000)
+        if not errors:
+            combos = ", ".join(hotkeys.registered().values())
+            w.statusBar().showMessage(f"전역 핫키 등록: {combos}", 4000)
         else:
-            reason = hk.last_error
-            if not reason: reason = hk_rem.last_error
+            reason = "\n".join(errors)
             w.statusBar().showMessage(f"전역 핫키 등록 실패: {reason}", 6000)
             QtWidgets.QMessageBox.warning(w, "핫키 등록 실패", f"핫키 등록 실패:{reason}")
     register_hotkey()
 
-    # 4) 설정 저장
+    # 4) 로컬 서버
+    server = None
+    def restart_server():
+        nonlocal server
+        if server is not None:
+            server.stop(); server = None
+        if not mgr.use_local_server:
+            return
+        server = LocalTranslationServer(pipeline, port=mgr.local_server_port,
+                                        max_concurrency=mgr.local_server_concurrency)
+        if server.start():
+            w.statusBar().showMessage(f"로컬 서버 실행: http://127.0.0.1:{server.port}", 4000)
+        else:
+            w.statusBar().showMessage(server.last_error or "로컬 서버 시작 실패", 6000)
+            server = None
+    restart_server()
+
+    # 5) 캡처 세션 기록 (재현 벤치마크용, 설정에서 켠 동안만)
+    def restart_trace():
+        if mgr.record_trace and controller.trace is None:
+            try:
+                controller.trace = SessionRecorder()
+            except OSError as e:
+                w.statusBar().showMessage(f"세션 기록 시작 실패: {e}", 6000)
+                return
+            w.statusBar().showMessage(f"세션 기록: {controller.trace.path}", 4000)
+        elif not mgr.record_trace and controller.trace is not None:
+            controller.trace.close()
+            controller.trace = None
+    restart_trace()
+
+    # 6) 설정 저장
     def on_settings_updated():
-        nonlocal llm
         mgr.load()
         register_hotkey()   # 새 조합으로 재등록
-        llm = LLMClient(mgr)# llm 클라이언트 재구성
-        
+        ocr_executor().configure(mgr.ocr_concurrency, mgr.ocr_queue_limit)
+        pipeline.reload()   # llm 클라이언트 재구성
+        restart_server()
+        restart_trace()
+
     w.settingsUpdated.connect(on_settings_updated)
 
-    app.aboutToQuit.connect(lambda: (hk and hk.stop(), hk_rem and hk_rem.stop()))
+    app.aboutToQuit.connect(lambda: (hotkeys.stop(), server and server.stop(), pipeline.close(),
+                                     history and history.close(), controller.trace and controller.trace.close(),
+                                     usage.save_session()))
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()   # 작업 프로세스(spawn)를 실행 파일로 묶었을 때 필요
     main()
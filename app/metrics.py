@@ -0,0 +1,76 @@
+"""
+프로세스 전역 지표(카운터 + 시간 분포).
+    from metrics import metrics
+    metrics.incr("llm.rate_limited")
+    metrics.observe("llm.queue_wait", 0.12)
+시간 분포(observe, 초 단위)는 최근 window 개 샘플로 백분위를 계산한다.
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """정렬된 값의 q(0~1) 백분위 (최근접 순위). 비어 있으면 0."""
+    if not sorted_values:
+        return 0.0
+    i = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[i]
+
+
+class Metrics:
+    def __init__(self, window: int = 512):
+        self._lock = threading.Lock()
+        self._window = window
+        self._counters: dict[str, float] = {}
+        self._samples: dict[str, deque] = {}
+        self._totals: dict[str, tuple[int, float, float]] = {}   # name → (count, sum, max)
+
+    def incr(self, name: str, n: float = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            dq = self._samples.get(name)
+            if dq is None:
+                dq = self._samples[name] = deque(maxlen=self._window)
+            dq.append(value)
+            count, total, peak = self._totals.get(name, (0, 0.0, 0.0))
+            self._totals[name] = (count + 1, total + value, max(peak, value))
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._samples.clear()
+            self._totals.clear()
+
+    def snapshot(self) -> dict:
+        """{"counters": {name: n}, "timings": {name: {count, mean, p50, p90, p99, max}}}"""
+        with self._lock:
+            counters = dict(self._counters)
+            samples = {k: sorted(v) for k, v in self._samples.items()}
+            totals = dict(self._totals)
+        timings = {}
+        for name, vals in samples.items():
+            count, total, peak = totals[name]
+            timings[name] = {"count": count, "mean": total / count if count else 0.0,
+                             "p50": percentile(vals, 0.5), "p90": percentile(vals, 0.9),
+                             "p99": percentile(vals, 0.99), "max": peak}
+        return {"counters": counters, "timings": timings}
+
+    def report(self) -> str:
+        snap = self.snapshot()
+        lines = []
+        for name, n in sorted(snap["counters"].items()):
+            lines.append(f"{name}: {n:g}")
+        if snap["timings"]:
+            lines.append("")
+        for name, t in sorted(snap["timings"].items()):
+            lines.append(f"{name}: n={t['count']} mean {t['mean'] * 1000:.1f}ms p50 {t['p50'] * 1000:.1f}ms "
+                         f"p90 {t['p90'] * 1000:.1f}ms p99 {t['p99'] * 1000:.1f}ms max {t['max'] * 1000:.1f}ms")
+        return "\n".join(lines) if lines else "기록된 지표가 없습니다."
+
+
+metrics = Metrics()
@@ -0,0 +1,79 @@
+"""
+같은 화면 OCR 생략: 캡처한 픽셀의 해시가 같은 영역의 최근 캡처와 같으면 저장된 OCR 결과를 바로 쓴다.
+
+직전 영역 재실행(run_last_rect)은 화면이 그대로여도 캡처 → 이미지 변환 → Windows OCR 을 모두 거친다.
+- 해시  : 캡처 버퍼(capture.Frame)를 복사하지 않고 줄 단위로 바로 해시한다. xxhash 가 있으면 xxh3_128,
+          없으면 blake2b. 일부 픽셀만 보는 축소 해시는 숫자 한 글자 같은 작은 변화를 놓칠 수 있어 쓰지 않는다.
+- 키    : (영역, 요청 언어, 글자 영역만 OCR 여부, 해시) — OCR 결과를 바꾸는 입력이 모두 같을 때만 적중
+- LRU   : 최근 MAX_ENTRIES 개. 빈 결과는 저장하지 않는다 (일시적인 실패일 수 있음).
+적중률과 아낀 시간은 metrics 의 ocr_cache.hit / miss / saved_ms, 해시 시간은 ocr_cache.hash_time.
+"""
+from __future__ import annotations
+
+import hashlib
+import struct
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+try:
+    import xxhash
+except ImportError:   # 선택 의존성: 없으면 blake2b (조금 느림)
+    xxhash = None
+
+MAX_ENTRIES = 32
+
+
+def frame_hash(img) -> bytes:
+    """img(capture.Frame 또는 PIL 이미지)의 픽셀 해시 (크기 포함)."""
+    h = xxhash.xxh3_128() if xxhash is not None else hashlib.blake2b(digest_size=16)
+    w, ht = img.size
+    h.update(struct.pack("<II", w, ht))
+    if hasattr(img, "byte_offset"):
+        row, start = w * 4, img.byte_offset
+        if row == img.stride:
+            h.update(img.buf[start:start + row * ht])
+        else:
+            for y in range(ht):
+                off = start + y * img.stride
+                h.update(img.buf[off:off + row])
+    else:
+        h.update(img.mode.encode("ascii"))
+        h.update(img.tobytes())
+    return h.digest()
+
+
+class OcrEntry(NamedTuple):
+    text: str
+    lang: str
+    elapsed: float   # 처음 인식할 때 걸린 시간(초), 적중 시 아낀 시간 계산용
+
+
+class OcrCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[tuple, OcrEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: tuple) -> Optional[OcrEntry]:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                self._items.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, text: str, lang: str, elapsed: float):
+        if not text:
+            return
+        with self._lock:
+            self._items[key] = OcrEntry(text, lang, elapsed)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
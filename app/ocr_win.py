@@ -1,4 +1,6 @@
 import asyncio
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import NamedTuple
 from PIL import Image
 import threading
 
@@ -7,6 +9,21 @@ from winsdk.windows.media.ocr import OcrEngine
 from winsdk.windows.graphics.imaging import BitmapPixelFormat, SoftwareBitmap, BitmapAlphaMode
 from winsdk.windows.storage.streams import DataWriter
 
+from text_layout import reconstruct
+
+
+OCR_LANGS = ["en-US", "ja-JP", "zh-CN"]
+AUTO_LANG = "auto"
+OCR_TIMEOUT = 3.0   # 마감(deadline)이 없을 때의 기본 타임아웃, 있을 때도 이보다 길게 기다리지 않음
+
+class OcrWord(NamedTuple):
+    """OCR 단어 하나와 이미지 기준 픽셀 좌표."""
+    text: str
+    x: int
+    y: int
+    w: int
+    h: int
+    line: int
 
 def is_ocr_language_supported(lang_tag: str) -> bool:
     try:
@@ -14,12 +31,16 @@ def is_ocr_language_supported(lang_tag: str) -> bool:
     except Exception:
         return False
     
-def _pil_to_sbmp(pil_img: Image.Image) -> SoftwareBitmap:
-    if pil_img.mode != "RGBA":
-        pil_img = pil_img.convert("RGBA")
-
-    w, h = pil_img.size
-    bgra_bytes = pil_img.tobytes("raw", "BGRA")
+def _pil_to_sbmp(pil_img) -> SoftwareBitmap:
+    if hasattr(pil_img, "to_bgra_bytes"):
+        # capture.Frame: 캡처 버퍼(BGRA)를 변환 없이 그대로 사용
+        w, h = pil_img.size
+        bgra_bytes = pil_img.to_bgra_bytes()
+    else:
+        if pil_img.mode != "RGBA":
+            pil_img = pil_img.convert("RGBA")
+        w, h = pil_img.size
+        bgra_bytes = pil_img.tobytes("raw", "BGRA")
     assert len(bgra_bytes) == w * h * 4
 
     writer = DataWriter()
@@ -62,23 +83,196 @@ def _make_bg_loop():
     ready.wait()
     return _bg_loop
 
-def _run_coro_sync(coro, timeout: float):
-    loop = _make_bg_loop()
-    fut = asyncio.run_coroutine_threadsafe(coro, loop)
-    return fut.result(timeout=timeout)
+class OcrBusyError(RuntimeError):
+    """OCR 대기열이 가득 차 새 작업을 받지 않음 (backpressure)."""
+    pass
+
+
+class OcrExecutor:
+    """
+    백그라운드 루프에서 실행되는 OCR 작업 관리.
+    - 동시 실행 수 제한(max_concurrency), 대기열 상한(max_queue) 초과 시 OcrBusyError
+    - 타임아웃/같은 key 의 새 작업(supersede) 시 실제 task 를 취소 (WinRT 인식 작업까지 cancel)
+    - queued / running / completed / failed / cancelled / timed_out / superseded / rejected 카운터
+    """
+    def __init__(self, max_concurrency: int = 2, max_queue: int = 4):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue = max(0, int(max_queue))
+        self._sem: asyncio.Semaphore | None = None
+        self._lock = threading.Lock()
+        self._latest: dict[str, Future] = {}
+        self._stats = dict(queued=0, running=0, completed=0, failed=0,
+                           cancelled=0, timed_out=0, superseded=0, rejected=0)
+
+    def configure(self, max_concurrency: int, max_queue: int):
+        """다음에 만들어지는 세마포어부터 적용 (실행 중인 작업은 그대로)."""
+        with self._lock:
+            self.max_concurrency = max(1, int(max_concurrency))
+            self.max_queue = max(0, int(max_queue))
+            self._sem = None
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _bump(self, **delta):
+        with self._lock:
+            for k, v in delta.items():
+                self._stats[k] += v
+
+    async def _job(self, coro, state: dict):
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        sem = self._sem
+        await sem.acquire()
+        with self._lock:
+            if state["phase"] != "queued":   # 기다리는 동안 취소됨 (_on_done 이 이미 정리)
+                sem.release()
+                return None
+            state["phase"] = "running"
+            self._stats["queued"] -= 1
+            self._stats["running"] += 1
+        try:
+            return await coro
+        finally:
+            self._bump(running=-1)
+            sem.release()
+
+    def _on_done(self, fut: Future, state: dict, coro, key: str | None):
+        with self._lock:
+            dropped = state["phase"] == "queued"
+            if dropped:
+                # 시작 전에 취소됨 → 안쪽 코루틴은 한 번도 실행되지 않음
+                state["phase"] = "dropped"
+                self._stats["queued"] -= 1
+        if dropped:
+            coro.close()
+        if fut.cancelled():
+            self._bump(cancelled=1)
+        elif fut.exception() is not None:
+            self._bump(failed=1)
+        else:
+            self._bump(completed=1)
+        if key:
+            with self._lock:
+                if self._latest.get(key) is fut:
+                    del self._latest[key]
+
+    def submit(self, coro, *, key: str | None = None) -> Future:
+        """
+        작업을 예약하고 Future 반환. key 가 같은 이전 작업이 아직 끝나지 않았으면 취소한다.
+        대기열이 가득 차면 OcrBusyError.
+        """
+        with self._lock:
+            prev = self._latest.get(key) if key else None
+        if prev is not None and prev.cancel():
+            self._bump(superseded=1)
+
+        with self._lock:
+            if self._stats["queued"] + self._stats["running"] >= self.max_concurrency + self.max_queue:
+                self._stats["rejected"] += 1
+                coro.close()
+                raise OcrBusyError(f"OCR 대기열이 가득 찼습니다. (실행 {self._stats['running']}, 대기 {self._stats['queued']})")
+            self._stats["queued"] += 1
+
+        state = {"phase": "queued"}
+        fut = asyncio.run_coroutine_threadsafe(self._job(coro, state), _make_bg_loop())
+        if key:
+            with self._lock:
+                self._latest[key] = fut
+        fut.add_done_callback(lambda f: self._on_done(f, state, coro, key))
+        return fut
+
+    def run(self, coro, timeout: float, *, key: str | None = None):
+        """동기 실행. 타임아웃이면 task 를 취소하고 TimeoutError."""
+        fut = self.submit(coro, key=key)
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeoutError:
+            if fut.cancel():
+                self._bump(timed_out=1)
+            raise TimeoutError(f"OCR 시간 초과 ({timeout:.1f}s)")
+
+
+_executor = OcrExecutor()
+
+def ocr_executor() -> OcrExecutor:
+    return _executor
+
+def _run_coro_sync(coro, timeout: float, key: str | None = None):
+    return _executor.run(coro, timeout, key=key)
+
+async def _await_op(op):
+    """WinRT 비동기 작업을 기다리되, 취소되면 WinRT 작업도 취소."""
+    try:
+        return await op
+    except asyncio.CancelledError:
+        try: op.cancel()
+        except Exception: pass
+        raise
+
+async def _recognize_boxes(sbmp: SoftwareBitmap, lang_tag: str) -> list[OcrWord]:
+    engine = OcrEngine.try_create_from_language(Language(lang_tag))
+
+    if engine is None: raise RuntimeError(f"OCR 엔진 생성 실패")
+
+    result = await _await_op(engine.recognize_async(sbmp))
+    words = []
+    for li, line in enumerate(result.lines):
+        for w in line.words:
+            r = w.bounding_rect
+            words.append(OcrWord(w.text, int(r.x), int(r.y), int(r.width), int(r.height), li))
+    return words
+
+async def _recognize(sbmp: SoftwareBitmap, lang_tag: str) -> str:
+    # 단어를 " " 로 잇지 않고 좌표/문자 체계로 줄·문단을 다시 조립 (ja/zh 글자 사이 공백 제거)
+    return reconstruct(await _recognize_boxes(sbmp, lang_tag))
+
+async def _recognize_words(pil_img, lang_tag: str) -> list[OcrWord]:
+    if not is_ocr_language_supported(lang_tag): raise RuntimeError(f"해당 언어팩 미설치됨{lang_tag}")
+    return await _recognize_boxes(_pil_to_sbmp(pil_img), lang_tag)
+
+async def _ocr_work(pil_img, lang_tag: str) -> str:
+    if not is_ocr_language_supported(lang_tag): return f"해당 언어팩 미설치됨{lang_tag}"
+    return await _recognize(_pil_to_sbmp(pil_img), lang_tag)
+
+async def _ocr_candidates_work(pil_img, langs: list[str]) -> dict[str, str]:
+    """같은 비트맵을 여러 언어 엔진으로 동시에 인식. 언어팩이 없는 언어는 건너뛴다."""
+    langs = [l for l in langs if is_ocr_language_supported(l)]
+    if not langs:
+        raise RuntimeError("설치된 OCR 언어팩이 없습니다.")
+    sbmp = _pil_to_sbmp(pil_img)
+    texts = await asyncio.gather(*(_recognize(sbmp, l) for l in langs))
+    return dict(zip(langs, texts))
+
+def windows_ocr(pil_img: Image.Image, lang_tag: str, timeout: float = OCR_TIMEOUT, key: str | None = None) -> str:
+    return _run_coro_sync(_ocr_work(pil_img, lang_tag), timeout=timeout, key=key)
+
+def windows_ocr_many(images: list, lang_tag: str, timeout: float = OCR_TIMEOUT, key: str | None = None) -> list[str]:
+    """
+    여러 이미지(캡처 영역)를 백그라운드 루프에서 동시에 OCR.
+    입력 순서대로 결과를 반환하며, 하나라도 실패하면 예외를 그대로 전달한다.
+    """
+    async def _gather():
+        return await asyncio.gather(*(_ocr_work(img, lang_tag) for img in images))
 
-def windows_ocr(pil_img: Image.Image, lang_tag: str, timeout: float = 3.0) -> str:
-    async def _ocr_work():
-        if not is_ocr_language_supported(lang_tag): return f"해당 언어팩 미설치됨{lang_tag}"
-        engine = OcrEngine.try_create_from_language(Language(lang_tag))
+    return _run_coro_sync(_gather(), timeout=timeout, key=key)
 
-        if engine is None: raise RuntimeError(f"OCR 엔진 생성 실패")
+def windows_ocr_candidates(pil_img, langs: list[str], timeout: float = OCR_TIMEOUT,
+                           key: str | None = None) -> dict[str, str]:
+    """후보 언어별 OCR 결과 {lang_tag: text}. (자동 언어 모드)"""
+    return _run_coro_sync(_ocr_candidates_work(pil_img, langs), timeout=timeout, key=key)
 
-        sbmp = _pil_to_sbmp(pil_img)
+def windows_ocr_jobs(jobs: list[tuple], timeout: float = OCR_TIMEOUT, key: str | None = None) -> list[dict[str, str]]:
+    """
+    [(이미지, [후보 언어...]), ...] 를 한 번에 동시 실행.
+    이미지마다 {lang_tag: text} 를 입력 순서대로 반환.
+    """
+    async def _gather():
+        return await asyncio.gather(*(_ocr_candidates_work(img, langs) for img, langs in jobs))
 
-        result = await engine.recognize_async(sbmp)
-        #lines = [" ".join(w.text for w in line.words) for line in result.lines]
-        #return "\n".join(lines).strip()
-        return " ".join(w.text for line in result.lines for w in line.words)
+    return _run_coro_sync(_gather(), timeout=timeout, key=key)
 
-    return _run_coro_sync(_ocr_work(), timeout=timeout)
\ No newline at end of file
+def submit_ocr_words(pil_img, lang_tag: str, key: str | None = None) -> Future:
+    """단어 박스 OCR 을 백그라운드 루프에 맡기고 기다리지 않고 Future 반환 (추측 OCR)."""
+    return _executor.submit(_recognize_words(pil_img, lang_tag), key=key)
@@ -10,6 +10,15 @@ HWND_TOPMOST   = -1
 SWP_NOMOVE     = 0x0002
 SWP_NOSIZE     = 0x0001
 SWP_SHOWWINDOW = 0x0040
+WDA_EXCLUDEFROMCAPTURE = 0x0011  # Windows 10 2004+
+
+def exclude_from_capture(widget: QtWidgets.QWidget) -> bool:
+    """화면 캡처(mss 포함)에 이 창이 찍히지 않도록 설정. 지원하지 않는 OS면 False."""
+    try:
+        hwnd = int(widget.winId())
+        return bool(ctypes.windll.user32.SetWindowDisplayAffinity(wintypes.HWND(hwnd), WDA_EXCLUDEFROMCAPTURE))
+    except Exception:
+        return False
 
 class OverlayWindow(QtWidgets.QWidget):
     """선택 영역에 맞춰 폭을 고정, 텍스트 높이에 맞춰 동적으로 높이를 조절하는 오버레이."""
@@ -18,15 +27,20 @@ class OverlayWindow(QtWidgets.QWidget):
     def __init__(self, rect_global: QtCore.QRect, text: str = "",
                  parent: Optional[QtWidgets.QWidget] = None,
                  font_family: Optional[str] = None,
-                 font_size: int = 14):
+                 font_size: int = 14,
+                 popup: bool = True):
         super().__init__(parent=None)  # 항상 최상위
 
+        # popup=False: 여러 오버레이를 동시에 띄우는 경우(저장된 영역 캡처). 포커스를 잃어도 닫히지 않고, 클릭하면 닫힌다.
+        self._popup = popup
+        self.held = False   # 직전 영역 재실행 동안 유지 중 (hold/release)
         self.setWindowFlags(
-            Qt.Popup
+            (Qt.Popup if popup else Qt.Tool)
             | Qt.FramelessWindowHint
             | Qt.WindowStaysOnTopHint
         )
         self.setAttribute(Qt.WA_TranslucentBackground, True)
+        self.setAttribute(Qt.WA_DeleteOnClose, True)
         self.setAutoFillBackground(False)
         self.setFocusPolicy(Qt.StrongFocus)
 
@@ -74,8 +88,9 @@ class OverlayWindow(QtWidgets.QWidget):
         self._relayout()
         self.show()
         self.raise_()
-        self.activateWindow()
-        self.setFocus(Qt.ActiveWindowFocusReason)
+        if popup:
+            self.activateWindow()
+            self.setFocus(Qt.ActiveWindowFocusReason)
 
         try:
             hwnd = int(self.winId())
@@ -84,6 +99,9 @@ class OverlayWindow(QtWidgets.QWidget):
         except Exception:
             pass
 
+        # 캡처에서 제외되면 재캡처 시 오버레이를 숨기고 기다릴 필요가 없다
+        self.excluded_from_capture = exclude_from_capture(self)
+
     # ---------------- 동적 레이아웃 ----------------
     def _screen_for_rect(self, rect: QtCore.QRect) -> QtGui.QScreen:
         scr = QtWidgets.QApplication.screenAt(rect.center())
@@ -134,6 +152,22 @@ class OverlayWindow(QtWidgets.QWidget):
         self.label.setText(text or "")
         self._relayout()
 
+    def hold(self):
+        """직전 영역을 다시 캡처하는 동안 포커스를 잃어도 닫히지 않게 두고, 캡처에 찍히면 잠시 숨긴다."""
+        self.held = True
+        if not self.excluded_from_capture:
+            self.hide()
+
+    def release(self):
+        """hold() 를 풀고 숨겼으면 다시 띄운다."""
+        self.held = False
+        if self.isHidden():
+            self.show()
+            self.raise_()
+            if self._popup:
+                self.activateWindow()
+                self.setFocus(Qt.ActiveWindowFocusReason)
+
     # ------------------------------
     def paintEvent(self, e: QtGui.QPaintEvent):
         p = QtGui.QPainter(self)
@@ -141,5 +175,11 @@ class OverlayWindow(QtWidgets.QWidget):
         p.fillRect(self.rect(), QtGui.QColor(0, 0, 0, 190))
 
     def focusOutEvent(self, e: QtGui.QFocusEvent):
-        self.close()
+        if self._popup and not self.held:
+            self.close()
         super().focusOutEvent(e)
+
+    def mousePressEvent(self, e: QtGui.QMouseEvent):
+        if not self._popup:
+            self.close()
+        super().mousePressEvent(e)
@@ -0,0 +1,455 @@
+from __future__ import annotations
+
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Iterator, Optional
+
+from PIL import Image
+
+from ocr_win import (windows_ocr, windows_ocr_many, windows_ocr_candidates, windows_ocr_jobs,
+                     submit_ocr_words, OCR_LANGS, AUTO_LANG, OCR_TIMEOUT)
+from lang_score import score as lang_score, pick_best
+from spatial_index import GridIndex
+from text_norm import NormalizedText, normalize
+from text_layout import reconstruct
+from text_detect import detect_text_regions, union_box, crop as crop_box
+from chunking import split_chunks
+from translation_cache import TranslationCache
+from ocr_cache import OcrCache, frame_hash
+from llm_api import LLMClient
+from scheduler import PRIORITY_INTERACTIVE
+from settings import SettingsManager
+from metrics import metrics
+from deadline import Deadline
+from worker_proc import WorkerProcess, WorkerLLM, WorkerUnavailableError, llm_settings
+
+# 작업 프로세스를 쓸 수 없을 때 이 프로세스에서 실행할 OCR 함수 (WorkerProcess 와 같은 이름)
+_LOCAL_OCR = {
+    "windows_ocr": windows_ocr,
+    "windows_ocr_many": windows_ocr_many,
+    "windows_ocr_candidates": windows_ocr_candidates,
+    "windows_ocr_jobs": windows_ocr_jobs,
+    "submit_ocr_words": submit_ocr_words,
+}
+
+
+def _prefix_function(s: str) -> list[int]:
+    pi = [0] * len(s)
+    j = 0
+    for i in range(1, len(s)):
+        while j and s[i] != s[j]:
+            j = pi[j - 1]
+        if s[i] == s[j]:
+            j += 1
+            pi[i] = j
+    return pi
+
+
+class _Speculation:
+    """캡처 보드가 열린 동안 진행되는 전체 프레임 OCR. 완료되면 단어 박스를 격자 인덱스에 담는다."""
+    def __init__(self, frame, lang_tag: str, submit=submit_ocr_words):
+        self.left, self.top = frame.left, frame.top
+        self.lang = lang_tag
+        self.index: Optional[GridIndex] = None
+        self.future = submit(frame, lang_tag, key="speculative")
+        self.future.add_done_callback(self._build_index)
+
+    def _build_index(self, fut):
+        if fut.cancelled() or fut.exception() is not None:
+            return
+        index = GridIndex(cell=64)
+        index.extend(((w.x, w.y, w.w, w.h), w) for w in fut.result())
+        self.index = index
+
+
+class TranslationPipeline:
+    """
+    OCR → 번역 단계를 묶는 공용 파이프라인.
+    - GUI(run_pipeline)와 로컬 서버가 같은 인스턴스(LLM 클라이언트)를 공유한다.
+    - 스크롤 병합 상태는 GUI 캡처에서만 사용한다.
+    - use_worker_process 가 켜져 있으면 OCR/번역을 작업 프로세스(worker_proc)에 맡긴다.
+    """
+    SCROLL_MIN_OVERLAP = 7
+    AUTO_RECHECK_SCORE = 0.5   # 기억된 언어의 결과 점수가 이보다 낮으면 다시 경합
+    CHUNK_CONTEXT = 150        # 청크마다 붙이는 앞뒤 문맥 글자 수
+
+    def __init__(self, settings: SettingsManager):
+        self._settings = settings
+        self._llm = LLMClient(settings)
+        self._worker: Optional[WorkerProcess] = None
+        self._worker_llm: Optional[WorkerLLM] = None
+        self._sync_worker()
+        self.warm_up()
+        self._before_ocr_text: Optional[str] = None
+        self._spec: Optional[_Speculation] = None
+        self._chunk_pool: Optional[ThreadPoolExecutor] = None
+        self._chunk_workers = 0
+        self._chunk_groups = itertools.count(1)   # 한 글의 청크들을 스케줄러에서 순서대로 보내기 위한 id
+        self._cache = TranslationCache()
+        self._ocr_cache = OcrCache()
+        self.last_from_cache = False   # 마지막 translate_chunked 결과가 캐시에서 왔는지 (GUI 표시용)
+
+    # -------------------- public API --------------------
+
+    @property
+    def llm(self) -> LLMClient:
+        return self._worker_llm if self._worker_llm is not None else self._llm
+
+    def reload(self):
+        """설정 변경 후 LLM 클라이언트에서 바뀐 부분만 재구성 (연결은 가능하면 유지)."""
+        self._sync_worker()
+        if self.llm.reload():
+            self.llm.warm_up(max_idle=0)
+
+    def close(self):
+        """종료 시: 작업 프로세스와 청크 번역 스레드를 정리."""
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = self._worker_llm = None
+        if self._chunk_pool is not None:
+            self._chunk_pool.shutdown(wait=False, cancel_futures=True)
+            self._chunk_pool = None
+
+    def _sync_worker(self):
+        """use_worker_process 에 맞춰 작업 프로세스를 띄우거나 내리고, 켜져 있으면 바뀐 설정을 전달."""
+        s = self._settings
+        ocr_limits = (s.ocr_concurrency, s.ocr_queue_limit)
+        if not s.use_worker_process:
+            if self._worker is not None:
+                self._worker.stop()
+                self._worker = self._worker_llm = None
+            return
+        if self._worker is None:
+            self._worker = WorkerProcess(llm_settings(s), ocr_limits=ocr_limits).start()
+            self._worker_llm = WorkerLLM(self._worker, self._llm)
+        else:
+            self._worker.configure(llm_settings(s), ocr_limits)
+
+    def _ocr(self, name: str, *args, **kwargs):
+        """OCR 호출. 작업 프로세스가 준비돼 있으면 그쪽에서, 아니면(꺼짐/시작·재시작 중) 이 프로세스에서."""
+        worker = self._worker
+        if worker is not None and worker.ready:
+            try:
+                return getattr(worker, name)(*args, **kwargs)
+            except WorkerUnavailableError:
+                metrics.incr("worker.fallback")
+        return _LOCAL_OCR[name](*args, **kwargs)
+
+    def warm_up(self):
+        """곧 번역 요청이 있을 것 같을 때(캡처 보드가 열릴 때 등) 연결을 미리 맺는다."""
+        self.llm.warm_up()
+
+    def ocr(self, img: Image.Image, lang_tag: str) -> str:
+        return self.ocr_detect(img, lang_tag)[0]
+
+    @staticmethod
+    def _ocr_timeout(deadline: Optional[Deadline]) -> float:
+        return deadline.timeout(OCR_TIMEOUT) if deadline is not None else OCR_TIMEOUT
+
+    def ocr_detect(self, img: Image.Image, lang_tag: str, remembered: Optional[str] = None,
+                   key: Optional[str] = None, deadline: Optional[Deadline] = None) -> tuple[str, str]:
+        """
+        (텍스트, 사용한 언어) 반환.
+        lang_tag 가 auto 이면 후보 엔진을 동시에 돌려 점수가 가장 높은 결과를 고른다.
+        remembered(이전에 이긴 언어)가 있으면 그 언어만 먼저 시도한다.
+        key 가 같은 이전 OCR 이 아직 돌고 있으면 취소된다(새 캡처가 이전 캡처를 대체).
+        deadline 이 있으면 OCR 타임아웃을 남은 시간에 맞춘다.
+        '글자 영역만 OCR' 이 켜져 있으면 글자가 있는 상자만 잘라 인식하고,
+        검출이 확실하지 않거나 잘라낸 곳에서 글자를 못 읽으면 영역 전체를 인식한다.
+        """
+        crops = self._text_crops(img, single=lang_tag == AUTO_LANG)
+        if crops is not None:
+            if len(crops) == 1:
+                text, lang = self._ocr_detect_one(crops[0], lang_tag, remembered, key, deadline)
+            else:
+                texts = self._ocr("windows_ocr_many", crops, lang_tag, self._ocr_timeout(deadline), key=key)
+                text, lang = "\n\n".join(t for t in texts if t), lang_tag
+            if text:
+                return text, lang
+            metrics.incr("text_detect.empty")
+        return self._ocr_detect_one(img, lang_tag, remembered, key, deadline)
+
+    def ocr_detect_cached(self, img, rect: tuple, lang_tag: str, remembered: Optional[str] = None,
+                          key: Optional[str] = None, deadline: Optional[Deadline] = None,
+                          bypass_cache: bool = False) -> tuple[str, str]:
+        """
+        ocr_detect 와 같지만, 같은 영역(rect)의 픽셀이 최근 캡처와 똑같으면 OCR 없이 저장된 결과를 돌려준다
+        ('같은 화면 OCR 생략', ocr_cache). img 가 capture.Frame 이면 변환 전 캡처 버퍼를 바로 해시한다.
+        bypass_cache 이면(캐시 무시 재번역) 저장된 결과를 쓰지 않고 다시 인식해 덮어쓴다.
+        """
+        if not self._settings.use_ocr_cache:
+            return self.ocr_detect(img, lang_tag, remembered, key=key, deadline=deadline)
+        t0 = time.perf_counter()
+        ck = (rect, lang_tag, self._settings.use_text_detect, frame_hash(img))
+        hashed = time.perf_counter() - t0
+        metrics.observe("ocr_cache.hash_time", hashed)
+        hit = None if bypass_cache else self._ocr_cache.get(ck)
+        if hit is not None:
+            metrics.incr("ocr_cache.hit")
+            metrics.incr("ocr_cache.saved_ms", max(0, round((hit.elapsed - hashed) * 1000)))
+            return hit.text, hit.lang
+        metrics.incr("ocr_cache.bypass" if bypass_cache else "ocr_cache.miss")
+        t0 = time.perf_counter()
+        text, lang = self.ocr_detect(img, lang_tag, remembered, key=key, deadline=deadline)
+        self._ocr_cache.put(ck, text, lang, time.perf_counter() - t0)
+        return text, lang
+
+    def _text_crops(self, img, single: bool) -> Optional[list]:
+        """
+        글자 영역 상자로 잘라낸 이미지들 (읽는 순서). 설정이 꺼져 있거나 확실하지 않으면 None.
+        single 이면 상자들을 모두 감싸는 하나로 (auto 모드는 언어 경합을 한 번만 하도록).
+        """
+        if not self._settings.use_text_detect:
+            return None
+        t0 = time.perf_counter()
+        boxes = detect_text_regions(img)
+        metrics.observe("text_detect.time", time.perf_counter() - t0)
+        if boxes is None:
+            metrics.incr("text_detect.fallback")
+            return None
+        if single and len(boxes) > 1:
+            boxes = [union_box(boxes)]
+        w, h = img.size
+        metrics.incr("text_detect.pixels_full", w * h)
+        metrics.incr("text_detect.pixels_ocr", sum(bw * bh for _, _, bw, bh in boxes))
+        return [crop_box(img, b) for b in boxes]
+
+    def _ocr_detect_one(self, img, lang_tag: str, remembered: Optional[str],
+                        key: Optional[str], deadline: Optional[Deadline]) -> tuple[str, str]:
+        if lang_tag != AUTO_LANG:
+            return self._ocr("windows_ocr", img, lang_tag, self._ocr_timeout(deadline), key=key), lang_tag
+        if remembered:
+            text = self._ocr("windows_ocr", img, remembered, self._ocr_timeout(deadline), key=key)
+            if not text or lang_score(text, remembered) >= self.AUTO_RECHECK_SCORE:
+                return text, remembered
+        lang, text, _ = pick_best(self._ocr("windows_ocr_candidates", img, OCR_LANGS,
+                                            self._ocr_timeout(deadline), key=key))
+        return text, lang
+
+    def clean(self, text: str, lang_tag: str) -> NormalizedText:
+        """
+        OCR 결과 정규화 (text_norm). key 는 항상 정규화된 캐시 키,
+        정리 기능이 꺼져 있으면 payload 는 원문 그대로.
+        """
+        norm = normalize(text, lang_tag)
+        if not self._settings.use_text_norm:
+            return NormalizedText(norm.key, text, 0)
+        return norm
+
+    def _lookup(self, text: str, bypass_cache: bool) -> tuple[Optional[tuple], Optional[str]]:
+        """(캐시 키, 캐시된 번역). 캐시를 쓰지 않으면 (None, None), bypass 면 기존 항목을 지우고 미스."""
+        if not self._settings.use_translation_cache:
+            return None, None
+        ck = TranslationCache.make_key(text, self._settings.system_prompt, self._settings.gemini_model)
+        if bypass_cache:
+            self._cache.discard(ck)
+            return ck, None
+        return ck, self._cache.get(ck)
+
+    def translate(self, text: str, *, priority: int = PRIORITY_INTERACTIVE, key: Optional[str] = None,
+                  bypass_cache: bool = False, deadline: Optional[Deadline] = None) -> str:
+        ck, hit = self._lookup(text, bypass_cache)
+        if hit is not None:
+            return hit
+        out = self.llm.translate(text, priority=priority, key=key, deadline=deadline)
+        if ck is not None:
+            self._cache.put(ck, text, out)
+        return out
+
+    def speculate(self, frame, lang_tag: str):
+        """캡처 보드가 열리는 즉시 freeze-frame 전체 OCR 을 시작 (추측 OCR, auto 모드 제외)."""
+        self.cancel_speculation()
+        if lang_tag == AUTO_LANG:
+            return
+        self._spec = _Speculation(frame, lang_tag, submit=partial(self._ocr, "submit_ocr_words"))
+
+    def cancel_speculation(self):
+        spec, self._spec = self._spec, None
+        if spec is not None:
+            spec.future.cancel()
+
+    def speculative_text(self, rect_global, lang_tag: str) -> Optional[str]:
+        """
+        추측 OCR 결과에서 선택 영역 안의 단어만 꺼낸다.
+        아직 끝나지 않았거나 실패/언어 불일치/단어 없음이면 None (→ 일반 OCR 로 대체).
+        """
+        spec, self._spec = self._spec, None
+        if spec is None:
+            return None
+        index = spec.index
+        if index is None or spec.lang != lang_tag:
+            spec.future.cancel()
+            return None
+        words = index.query((rect_global.x() - spec.left, rect_global.y() - spec.top,
+                             rect_global.width(), rect_global.height()))
+        if not words:
+            return None
+        return reconstruct(words)
+
+    def ocr_many(self, images: list, lang_tag: str) -> list[str]:
+        return [t for t, _ in self.ocr_many_detect(images, lang_tag)]
+
+    def ocr_many_detect(self, images: list, lang_tag: str, remembered: Optional[list] = None,
+                        key: Optional[str] = None, deadline: Optional[Deadline] = None) -> list[tuple[str, str]]:
+        """여러 이미지를 동시에 OCR. auto 모드의 언어 선택 규칙·key·deadline 은 ocr_detect 와 같다."""
+        if lang_tag != AUTO_LANG:
+            return [(t, lang_tag) for t in self._ocr("windows_ocr_many", images, lang_tag,
+                                                     self._ocr_timeout(deadline), key=key)]
+
+        remembered = list(remembered or [None] * len(images))
+        jobs = [(img, [lang] if lang else OCR_LANGS) for img, lang in zip(images, remembered)]
+        results = self._ocr("windows_ocr_jobs", jobs, self._ocr_timeout(deadline), key=key)
+
+        out = [pick_best(r)[:2] for r in results]
+        # 기억된 언어의 결과가 이상하면 해당 영역만 다시 경합
+        retry = [i for i, (lang, text) in enumerate(out)
+                 if remembered[i] and text and lang_score(text, lang) < self.AUTO_RECHECK_SCORE]
+        if retry:
+            again = self._ocr("windows_ocr_jobs", [(images[i], OCR_LANGS) for i in retry],
+                              self._ocr_timeout(deadline), key=key)
+            for i, r in zip(retry, again):
+                out[i] = pick_best(r)[:2]
+        return [(text, lang) for lang, text in out]
+
+    def translate_chunked(self, text: str, *, priority: int = PRIORITY_INTERACTIVE,
+                          key: Optional[str] = None, bypass_cache: bool = False,
+                          deadline: Optional[Deadline] = None) -> Iterator[str]:
+        """
+        긴 글을 문단/문장 경계에서 나눠(chunk_chars) 동시에 번역하고(chunk_workers 개까지),
+        앞에서부터 이어지는 부분이 완성될 때마다 (구분자 포함) 조각을 원문 순서대로 내보낸다.
+        짧은 글은 요청 한 번. 전체 결과는 번역 캐시에 저장/조회한다.
+        deadline 은 첫 조각(번역이 처음 보이는 시점)에만 적용한다. 나머지는 보이는 대로 이어 붙인다.
+        청크들은 스케줄러에서 앞 청크부터 보낸다 (대화형 요청은 최신 순이라 그대로 두면 거꾸로 나감).
+        """
+        self.last_from_cache = False
+        ck, hit = self._lookup(text, bypass_cache)
+        if hit is not None:
+            self.last_from_cache = True
+            yield hit
+            return
+
+        chunks = split_chunks(text, self._settings.chunk_chars, self.CHUNK_CONTEXT)
+        if len(chunks) <= 1:
+            out = self.llm.translate(text, priority=priority, key=key, deadline=deadline)
+            if ck is not None:
+                self._cache.put(ck, text, out)
+            yield out
+            return
+
+        pool = self._pool()
+        gid = next(self._chunk_groups)
+        futures = [
+            pool.submit(self.llm.translate, c.text, priority=priority, before=c.before, after=c.after,
+                        key=f"{key}#{i}" if key else None, deadline=deadline if i == 0 else None,
+                        group=(gid, i))
+            for i, c in enumerate(chunks)
+        ]
+        parts = []
+        try:
+            for c, fut in zip(chunks, futures):
+                parts.append(c.sep + fut.result())
+                yield parts[-1]
+            if ck is not None:
+                self._cache.put(ck, text, "".join(parts))
+        finally:
+            for fut in futures:
+                fut.cancel()   # 중간에 실패/중단되면 아직 시작하지 않은 청크는 보내지 않음
+
+    def translate_lines(self, lines: list[str], indices: list[int], *, priority: int = PRIORITY_INTERACTIVE,
+                        key: Optional[str] = None,
+                        deadline: Optional[Deadline] = None) -> Iterator[tuple[int, str]]:
+        """
+        lines 중 indices 번째 줄만 번역해 (줄 번호, 번역) 을 내보낸다 (직전 영역 재실행의 바뀐 줄).
+        번역 캐시를 줄 단위로 쓰고, 캐시에 없는 줄은 한 번의 translate_many 요청으로 묶는다
+        (바뀐 줄 바로 앞뒤의 그대로인 줄을 CHUNK_CONTEXT * 2 글자까지 문맥으로 한 번만 붙임).
+        번역은 한 줄로 합친다 (줄 대응 유지).
+        """
+        pending: dict[str, tuple[int, Optional[tuple]]] = {}
+        for i in indices:
+            ck, hit = self._lookup(lines[i], False)
+            if hit is not None:
+                yield i, hit
+            else:
+                pending[str(i)] = (i, ck)
+        if not pending:
+            return
+        changed = set(indices)
+        near = sorted({j for i in changed for j in (i - 1, i + 1)
+                       if 0 <= j < len(lines) and j not in changed and lines[j].strip()})
+        context = "\n".join(lines[j] for j in near)[:self.CHUNK_CONTEXT * 2]
+        got = self.llm.translate_many({k: lines[i] for k, (i, _) in pending.items()}, priority=priority,
+                                      key=key, deadline=deadline, context=context)
+        for k, (i, ck) in pending.items():
+            out = " ".join(got.get(k, "").split("\n")).strip()
+            if ck is not None:
+                self._cache.put(ck, lines[i], out)
+            yield i, out
+
+    def remember(self, text: str, translated: str):
+        """따로 번역해 합친 결과를 전체 글의 번역으로 캐시에 넣는다 (다음에 같은 글이면 요청 없이)."""
+        ck, _ = self._lookup(text, False)
+        if ck is not None:
+            self._cache.put(ck, text, translated)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        workers = max(1, self._settings.chunk_workers)
+        if self._chunk_pool is None or workers != self._chunk_workers:
+            if self._chunk_pool is not None:
+                self._chunk_pool.shutdown(wait=False)
+            self._chunk_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-translator-CHUNK")
+            self._chunk_workers = workers
+        return self._chunk_pool
+
+    def translate_regions(self, texts: list[str], *, priority: int = PRIORITY_INTERACTIVE,
+                          key: Optional[str] = None, deadline: Optional[Deadline] = None) -> list[str]:
+        """
+        여러 영역의 텍스트를 한 번의 요청(translate_many)으로 번역. 입력 순서대로 반환.
+        번역 캐시에 있는 영역은 요청에서 뺀다.
+        """
+        got: dict[str, str] = {}
+        keys: dict[str, tuple] = {}
+        segments = {}
+        for i, t in enumerate(texts):
+            if not t:
+                continue
+            sid = f"r{i + 1}"
+            ck, hit = self._lookup(t, False)
+            if hit is not None:
+                got[sid] = hit
+                continue
+            segments[sid] = t
+            if ck is not None:
+                keys[sid] = ck
+        if len(segments) == 1:
+            (sid, t), = segments.items()
+            got[sid] = self.llm.translate(t, priority=priority, key=key, deadline=deadline)
+        elif segments:
+            got.update(self.llm.translate_many(segments, priority=priority, key=key, deadline=deadline))
+        for sid, ck in keys.items():
+            if got.get(sid):
+                self._cache.put(ck, segments[sid], got[sid])
+        return [got.get(f"r{i + 1}", "") for i in range(len(texts))]
+
+    def translate_stream(self, text: str, *, priority: int = PRIORITY_INTERACTIVE,
+                         key: Optional[str] = None, deadline: Optional[Deadline] = None) -> Iterator[str]:
+        return self.llm.translate_stream(text, priority=priority, key=key, deadline=deadline)
+
+    def merge_scroll(self, ocr_text: str) -> str:
+        """직전 캡처와 겹치는 경우 두 문장을 이어 붙인다(스크롤 인식)."""
+        before = self._before_ocr_text
+        if self._settings.use_scroll_detect and before is not None:
+            index = 0
+            temp_len = 0
+            maxlen = len(ocr_text) - self.SCROLL_MIN_OVERLAP
+            while index <= maxlen:
+                temp = ocr_text[index:] + "궯" + before
+                temp_len = _prefix_function(temp)[-1]
+                if temp_len >= self.SCROLL_MIN_OVERLAP: break
+                index += 1
+
+            if temp_len >= self.SCROLL_MIN_OVERLAP:
+                ocr_text = before + ocr_text[index+temp_len:]
+        self._before_ocr_text = ocr_text
+        return ocr_text
@@ -0,0 +1,202 @@
+"""
+LLM 요청 스케줄러.
+- 모델별 토큰 버킷 두 개(분당 요청 수 RPM, 분당 토큰 수 TPM)로 보내기 전에 기다린다.
+- 대기 순서: 우선순위(대화형 → 배치), 대화형은 가장 최근 요청부터, 배치는 먼저 온 순서.
+  group(id, 순번)으로 묶인 요청(한 캡처의 청크들)은 처음 들어온 시점을 함께 쓰고 그 안에서는 순번대로 나간다.
+- 같은 key 로 새 요청이 들어오면 아직 보내지 않은 이전 요청은 SupersededError 로 버린다.
+- 429 를 받으면 penalize() 로 해당 모델을 잠시 멈춰, 재시도가 곧바로 API 를 두드리지 않게 한다.
+- 대기 시간은 metrics 의 llm.queue_wait(.interactive / .batch) 로 기록한다.
+"""
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from typing import Optional
+
+from metrics import metrics
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+_PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+
+
+class SupersededError(RuntimeError):
+    """같은 key 의 새 요청에 밀려 보내지 않고 버린 요청."""
+    pass
+
+
+def estimate_tokens(*texts: str) -> int:
+    """대략적인 토큰 수. CJK 는 글자당 1, 나머지는 4글자당 1."""
+    n = 0.0
+    for t in texts:
+        if not t:
+            continue
+        cjk = sum(1 for c in t if c >= "⺀")
+        n += cjk + (len(t) - cjk) / 4
+    return int(n) + 1
+
+
+class TokenBucket:
+    """분당 per_minute 개가 채워지는 버킷. capacity 기본값 = per_minute (1분 치 burst)."""
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity or per_minute)
+        self.tokens = self.capacity
+        self._stamp = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def wait_time(self, n: float, now: float) -> float:
+        """n 개를 꺼낼 수 있을 때까지 남은 시간(초). capacity 보다 큰 요청은 가득 찰 때까지 기다린다."""
+        self._refill(now)
+        need = min(n, self.capacity)
+        return 0.0 if self.tokens >= need else (need - self.tokens) / self.rate
+
+    def take(self, n: float, now: float):
+        self._refill(now)
+        self.tokens -= n
+
+    def give_back(self, n: float):
+        """추정치와 실제 사용량의 차이를 돌려준다(음수면 더 가져감)."""
+        self.tokens = min(self.capacity, self.tokens + n)
+
+
+class _Entry:
+    __slots__ = ("order", "model", "tokens", "key", "priority", "state")
+
+    def __init__(self, order: tuple, model: str, tokens: int, key: Optional[str], priority: int):
+        self.order = order
+        self.model = model
+        self.tokens = tokens
+        self.key = key
+        self.priority = priority
+        self.state = "waiting"   # waiting / superseded
+
+
+class RequestScheduler:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._waiting: list[_Entry] = []
+        self._latest: dict[str, _Entry] = {}
+        self._buckets: dict[str, tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self._paused_until: dict[str, float] = {}
+        self._seq = itertools.count()
+        self._groups: dict[object, list[int]] = {}   # group id → [순서 번호, 대기 중인 요청 수]
+
+    def set_limits(self, model: str, rpm: int, tpm: int):
+        """모델별 한도. 0 이하는 무제한. 값이 같으면 기존 버킷 상태를 유지한다."""
+        with self._cond:
+            old = self._buckets.get(model)
+            new_rpm = TokenBucket(rpm) if rpm > 0 else None
+            new_tpm = TokenBucket(tpm) if tpm > 0 else None
+            if old is not None:
+                if old[0] is not None and new_rpm is not None and old[0].capacity == new_rpm.capacity:
+                    new_rpm = old[0]
+                if old[1] is not None and new_tpm is not None and old[1].capacity == new_tpm.capacity:
+                    new_tpm = old[1]
+            self._buckets[model] = (new_rpm, new_tpm)
+            self._cond.notify_all()
+
+    def _wait_time(self, entry: _Entry, now: float) -> float:
+        rpm, tpm = self._buckets.get(entry.model, (None, None))
+        wait = max(0.0, self._paused_until.get(entry.model, 0.0) - now)
+        if rpm is not None:
+            wait = max(wait, rpm.wait_time(1, now))
+        if tpm is not None:
+            wait = max(wait, tpm.wait_time(entry.tokens, now))
+        return wait
+
+    def _is_next(self, entry: _Entry) -> bool:
+        """같은 모델을 기다리는 요청 중 entry 가 가장 앞인지."""
+        first = min((e for e in self._waiting if e.model == entry.model), key=lambda e: e.order)
+        return first is entry
+
+    def acquire(self, model: str, tokens: int, *, priority: int = PRIORITY_INTERACTIVE,
+                key: Optional[str] = None, timeout: Optional[float] = None,
+                group: Optional[tuple] = None) -> float:
+        """
+        보내도 될 때까지 기다린 뒤 버킷에서 꺼낸다. 기다린 시간(초)을 반환.
+        같은 key 의 새 요청이 오면 SupersededError, timeout 이 지나면 TimeoutError.
+        group=(id, 순번): 같은 id 의 요청은 순번이 작은 것부터 (id 는 pickle 가능한 값).
+        """
+        t0 = time.monotonic()
+        gid, part = group if group is not None else (None, 0)
+        with self._cond:
+            if gid is not None:
+                g = self._groups.setdefault(gid, [next(self._seq), 0])
+                g[1] += 1
+                seq = g[0]
+            else:
+                seq = next(self._seq)
+            order = (priority, -seq if priority == PRIORITY_INTERACTIVE else seq, part)
+            entry = _Entry(order, model, max(1, int(tokens)), key, priority)
+            if key is not None:
+                prev = self._latest.get(key)
+                if prev is not None and prev.state == "waiting":
+                    prev.state = "superseded"
+                self._latest[key] = entry
+            self._waiting.append(entry)
+            self._cond.notify_all()
+            try:
+                while True:
+                    if entry.state == "superseded":
+                        metrics.incr("llm.superseded")
+                        raise SupersededError("새 요청으로 대체되어 취소됨")
+                    now = time.monotonic()
+                    wait = self._wait_time(entry, now) if self._is_next(entry) else None
+                    if wait == 0.0:
+                        rpm, tpm = self._buckets.get(model, (None, None))
+                        if rpm is not None:
+                            rpm.take(1, now)
+                        if tpm is not None:
+                            tpm.take(entry.tokens, now)
+                        break
+                    if timeout is not None:
+                        left = timeout - (now - t0)
+                        if left <= 0:
+                            metrics.incr("llm.queue_timeout")
+                            raise TimeoutError("LLM 요청 대기 시간 초과")
+                        wait = left if wait is None else min(wait, left)
+                    self._cond.wait(wait)
+            finally:
+                self._waiting.remove(entry)
+                if key is not None and self._latest.get(key) is entry:
+                    del self._latest[key]
+                if gid is not None:
+                    self._groups[gid][1] -= 1
+                    if not self._groups[gid][1]:
+                        del self._groups[gid]
+                self._cond.notify_all()
+
+        waited = time.monotonic() - t0
+        metrics.observe("llm.queue_wait", waited)
+        metrics.observe(f"llm.queue_wait.{_PRIORITY_NAMES.get(priority, priority)}", waited)
+        return waited
+
+    def settle(self, model: str, estimated: int, actual: int):
+        """응답의 실제 토큰 수로 TPM 버킷을 보정."""
+        with self._cond:
+            tpm = self._buckets.get(model, (None, None))[1]
+            if tpm is not None and actual > 0:
+                tpm.give_back(estimated - actual)
+                self._cond.notify_all()
+
+    def penalize(self, model: str, seconds: float):
+        """429 를 받았을 때: seconds 동안 해당 모델로 아무것도 보내지 않는다."""
+        until = time.monotonic() + max(0.0, seconds)
+        with self._cond:
+            self._paused_until[model] = max(self._paused_until.get(model, 0.0), until)
+            self._cond.notify_all()
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            out = {name: 0 for name in _PRIORITY_NAMES.values()}
+            for e in self._waiting:
+                out[_PRIORITY_NAMES.get(e.priority, str(e.priority))] += 1
+            return out
+
+
+scheduler = RequestScheduler()
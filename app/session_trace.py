@@ -0,0 +1,164 @@
+"""
+캡처 세션 기록 (재현 벤치마크용).
+
+실제 사용 패턴(스크롤 연속 캡처, 같은 툴팁 반복, 몰아서 누르는 핫키)을 그대로 다시 돌려 보기 위해
+run_pipeline 한 번마다 다음을 AppData/traces/session-<시각>.trace 에 추가한다.
+  - 시작 시각(세션 시작 기준 초), 영역, 요청 언어, 캡처한 이미지
+  - OCR 결과(정리 전 원문)와 인식 언어, 단계별 소요 시간(capture/ocr/translate), LLM 전체 시간, 캐시 사용 여부
+재현은 tools/replay_trace.py (같은 이미지/시간 간격으로 파이프라인을 가짜 또는 스텁 백엔드로 다시 실행).
+
+파일 형식 (추가만 하므로 도중에 종료돼도 앞부분은 읽을 수 있다)
+  MAGIC, 그다음 레코드 반복: <II (meta 길이, blob 길이) + meta(JSON, UTF-8) + blob
+  - {"type": "session", ...}        : 첫 레코드 (버전, 시작 시각)
+  - {"type": "frame", "id", "w", "h"}: blob 은 PNG. 같은 이미지가 다시 나오면 새로 저장하지 않고 id 만 참조
+  - {"type": "capture", "t", "frame", ...}
+이미지 복사는 호출한 스레드에서(캡처 버퍼가 재사용될 수 있으므로), PNG 압축과 쓰기는 기록 스레드에서 한다.
+대기열이 차거나 파일이 MAX_BYTES 를 넘으면 그 캡처는 버린다 (trace.dropped).
+"""
+from __future__ import annotations
+
+import glob
+import hashlib
+import io
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Iterator, Optional
+
+from PIL import Image
+
+from metrics import metrics
+from settings import appdata_dir
+
+MAGIC = b"OCRTRACE1\n"
+VERSION = 1
+TRACE_DIR = os.path.join(appdata_dir(), "traces")
+MAX_BYTES = 256 * 2**20   # 세션 파일 하나의 크기 상한
+KEEP_SESSIONS = 20        # 새 세션을 시작할 때 이보다 오래된 세션 파일은 지운다
+QUEUE_LIMIT = 32          # 기록 스레드가 밀렸을 때 쌓아 둘 캡처 수
+
+_HEADER = struct.Struct("<II")
+
+
+def _snapshot(img) -> Optional[tuple[int, int, bytes]]:
+    """이미지(capture.Frame 또는 PIL)를 (w, h, BGRA 바이트)로 복사."""
+    if img is None:
+        return None
+    if hasattr(img, "to_bgra_bytes"):
+        w, h = img.size
+        return w, h, img.to_bgra_bytes()
+    w, h = img.size
+    return w, h, img.convert("RGBA").tobytes("raw", "BGRA")
+
+
+def decode_frame(blob: bytes) -> Image.Image:
+    """frame 레코드의 blob(PNG) → RGB 이미지."""
+    img = Image.open(io.BytesIO(blob))
+    return img.convert("RGB")
+
+
+class SessionRecorder:
+    def __init__(self, directory: str = TRACE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self._prune(directory)
+        self.path = os.path.join(directory, time.strftime("session-%Y%m%d-%H%M%S.trace"))
+        self._f = open(self.path, "wb")
+        self._f.write(MAGIC)
+        self._size = len(MAGIC)
+        self._t0 = time.monotonic()
+        self._frames: dict[bytes, int] = {}   # 이미지 해시 → frame id
+        self._q: "queue.Queue[Optional[tuple]]" = queue.Queue(QUEUE_LIMIT)
+        self._write({"type": "session", "version": VERSION, "started": time.time()})
+        self._thread = threading.Thread(target=self._run, name="ocr-translator-TRACE", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _prune(directory: str):
+        paths = sorted(glob.glob(os.path.join(directory, "session-*.trace")))
+        for p in paths[:max(0, len(paths) - KEEP_SESSIONS + 1)]:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+    def add_capture(self, event: dict, started: float, img=None):
+        """
+        캡처 한 번을 기록. started 는 time.monotonic() 기준 캡처 시작 시각.
+        event 의 값은 JSON 으로 쓸 수 있어야 한다. img 는 지금 복사해 두고 기록 스레드에서 압축한다.
+        """
+        if self._size >= MAX_BYTES:
+            metrics.incr("trace.dropped")
+            return
+        item = (dict(event, type="capture", t=round(started - self._t0, 4)), _snapshot(img))
+        try:
+            self._q.put_nowait(item)
+        except queue.Full:
+            metrics.incr("trace.dropped")
+
+    def close(self):
+        """남은 기록을 모두 쓰고 파일을 닫는다."""
+        self._q.put(None)
+        self._thread.join()
+        self._f.close()
+
+    def _run(self):
+        while True:
+            item = self._q.get()
+            if item is None:
+                return
+            event, snap = item
+            t0 = time.perf_counter()
+            try:
+                event["frame"] = self._frame_id(snap)
+                self._write(event)
+                self._f.flush()
+            except (OSError, ValueError):
+                metrics.incr("trace.error")
+                continue
+            metrics.incr("trace.captures")
+            metrics.observe("trace.write", time.perf_counter() - t0)
+
+    def _frame_id(self, snap) -> Optional[int]:
+        if snap is None:
+            return None
+        w, h, raw = snap
+        digest = hashlib.blake2b(raw, digest_size=16, person=struct.pack("<II", w, h)).digest()
+        fid = self._frames.get(digest)
+        if fid is not None:
+            metrics.incr("trace.frame_reused")
+            return fid
+        buf = io.BytesIO()
+        Image.frombuffer("RGB", (w, h), raw, "raw", "BGRX", 0, 1).save(buf, "PNG", compress_level=1)
+        fid = len(self._frames)
+        self._write({"type": "frame", "id": fid, "w": w, "h": h}, buf.getvalue())
+        self._frames[digest] = fid
+        return fid
+
+    def _write(self, meta: dict, blob: bytes = b""):
+        raw = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._f.write(_HEADER.pack(len(raw), len(blob)) + raw + blob)
+        self._size += _HEADER.size + len(raw) + len(blob)
+
+
+def read_trace(path: str) -> Iterator[tuple[dict, bytes]]:
+    """(meta, blob) 레코드들. 끝이 잘린 파일(기록 중 종료)은 온전한 레코드까지만."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"세션 기록 파일이 아닙니다: {path}")
+        while True:
+            head = f.read(_HEADER.size)
+            if len(head) < _HEADER.size:
+                return
+            n_meta, n_blob = _HEADER.unpack(head)
+            raw, blob = f.read(n_meta), f.read(n_blob)
+            if len(raw) < n_meta or len(blob) < n_blob:
+                return
+            yield json.loads(raw), blob
+
+
+def latest_trace(directory: str = TRACE_DIR) -> Optional[str]:
+    paths = sorted(glob.glob(os.path.join(directory, "session-*.trace")))
+    return paths[-1] if paths else None
@@ -1,17 +1,17 @@
 import json, os
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from typing import Optional
 from PyQt5 import QtGui
 
 APP_NAME = "OCR Translate"
 
-def _appdata_dir() -> str:
+def appdata_dir() -> str:
     base = os.environ.get("APPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Roaming")
     d = os.path.join(base, APP_NAME)
     os.makedirs(d, exist_ok=True)
     return d
 
-DEFAULT_PATH = os.path.join(_appdata_dir(), "settings.json")
+DEFAULT_PATH = os.path.join(appdata_dir(), "settings.json")
 ASSET_FONTS_DIR = os.path.join(os.path.dirname(__file__), "fonts")
 
 @dataclass
@@ -19,7 +19,17 @@ class AppSettings:
     # 1) 핫키
     hotkey_combo: str = "ctrl+shift+c"
     hotkey_rem_combo: str = ""
+    hotkey_regions_combo: str = ""
+    hotkey_retranslate_combo: str = ""   # 마지막 영역을 번역 캐시 없이 다시 번역
     use_scroll_detect: bool = True
+    use_speculative_ocr: bool = False
+    use_text_norm: bool = True    # OCR 결과 정규화(공백/따옴표/UI 기호 정리)
+    use_text_detect: bool = False # 넓은 영역에서 글자가 있는 부분만 잘라 OCR (numpy 필요)
+    use_line_diff: bool = True    # 직전 영역을 다시 실행하면 바뀐 줄만 번역해 오버레이를 고침
+    use_ocr_cache: bool = True    # 같은 영역의 화면이 그대로면 OCR 을 건너뛰고 저장된 결과 사용
+    ocr_concurrency: int = 2      # 동시에 실행할 OCR 작업 수
+    ocr_queue_limit: int = 4      # 실행 대기 OCR 작업 상한 (넘으면 새 요청 거절)
+    use_worker_process: bool = False   # OCR/번역을 별도 작업 프로세스에서 실행
     # 2) 프롬프트
     system_prompt: str = (
         "너는 FPS 게임 Arena Breakout: Infinite의 공식 번역가다.\n"
@@ -34,11 +44,29 @@ class AppSettings:
     # 3) API
     gemini_model: str = "gemini-2.5-flash-lite-preview-06-17"
     gemini_api_key: str = ""
+    gemini_rpm: int = 0           # 분당 요청 수 한도 (0 = 제한 없음, 무료 등급은 15)
+    gemini_tpm: int = 0           # 분당 입력 토큰 한도 (0 = 제한 없음, 무료 등급은 250000)
+    chunk_chars: int = 800        # 이보다 긴 글은 문단/문장 단위로 나눠 동시에 번역 (0 = 나누지 않음)
+    chunk_workers: int = 3        # 동시에 번역할 청크 수
+    use_translation_cache: bool = True   # 검증을 통과한 번역을 메모리에 캐시
+    use_context_cache: bool = False      # 시스템 프롬프트를 Gemini 컨텍스트 캐시에 등록해 요청마다 다시 보내지 않음
+    deadline_seconds: float = 0.0  # 선택을 마친 뒤 번역이 처음 보일 때까지의 목표 시간 (0 = 제한 없음)
     
     # 4) overlay
     font_family: str = "Malgun Gothic"
     font_size: int = 14
     use_overlay_layout: bool = True
+    use_history: bool = True      # 캡처한 원문/번역을 기록(history.db)에 저장
+    record_trace: bool = False    # 캡처 세션(이미지, OCR 결과, 소요 시간)을 traces/ 에 기록 (재현 벤치마크용)
+
+    # 5) 로컬 서버
+    use_local_server: bool = False
+    local_server_port: int = 8765
+    local_server_concurrency: int = 2
+
+    # 6) 저장된 캡처 영역: {"모니터 번호": [{"name": str, "rect": [x, y, w, h], "lang": str}]}
+    #    rect 는 해당 모니터 좌상단 기준 좌표, lang 은 자동 언어 모드에서 마지막으로 선택된 OCR 언어
+    saved_regions: dict = field(default_factory=dict)
 
 class SettingsManager:
     def __init__(self, path: str = DEFAULT_PATH):
@@ -99,10 +127,50 @@ class SettingsManager:
     def hotkey_rem_combo(self) -> str:
         return self._settings.hotkey_rem_combo
     
+    @property
+    def hotkey_regions_combo(self) -> str:
+        return self._settings.hotkey_regions_combo
+
+    @property
+    def hotkey_retranslate_combo(self) -> str:
+        return self._settings.hotkey_retranslate_combo
+
     @property
     def use_scroll_detect(self) -> bool:
         return self._settings.use_scroll_detect
 
+    @property
+    def use_speculative_ocr(self) -> bool:
+        return self._settings.use_speculative_ocr
+
+    @property
+    def use_text_norm(self) -> bool:
+        return self._settings.use_text_norm
+
+    @property
+    def use_text_detect(self) -> bool:
+        return self._settings.use_text_detect
+
+    @property
+    def use_line_diff(self) -> bool:
+        return self._settings.use_line_diff
+
+    @property
+    def use_ocr_cache(self) -> bool:
+        return self._settings.use_ocr_cache
+
+    @property
+    def ocr_concurrency(self) -> int:
+        return self._settings.ocr_concurrency
+
+    @property
+    def ocr_queue_limit(self) -> int:
+        return self._settings.ocr_queue_limit
+
+    @property
+    def use_worker_process(self) -> bool:
+        return self._settings.use_worker_process
+
     @property
     def system_prompt(self) -> str:
         return self._settings.system_prompt
@@ -115,6 +183,34 @@ class SettingsManager:
     def gemini_api_key(self) -> str:
         return self._settings.gemini_api_key
 
+    @property
+    def use_translation_cache(self) -> bool:
+        return self._settings.use_translation_cache
+
+    @property
+    def use_context_cache(self) -> bool:
+        return self._settings.use_context_cache
+
+    @property
+    def deadline_seconds(self) -> float:
+        return self._settings.deadline_seconds
+
+    @property
+    def chunk_chars(self) -> int:
+        return self._settings.chunk_chars
+
+    @property
+    def chunk_workers(self) -> int:
+        return self._settings.chunk_workers
+
+    @property
+    def gemini_rpm(self) -> int:
+        return self._settings.gemini_rpm
+
+    @property
+    def gemini_tpm(self) -> int:
+        return self._settings.gemini_tpm
+
     @property
     def font_family(self) -> str:
         return self._settings.font_family
@@ -130,7 +226,30 @@ class SettingsManager:
     @property
     def use_overlay_layout(self) -> bool:
         return self._settings.use_overlay_layout
+
+    @property
+    def use_history(self) -> bool:
+        return self._settings.use_history
+
+    @property
+    def record_trace(self) -> bool:
+        return self._settings.record_trace
     
+    @property
+    def use_local_server(self) -> bool:
+        return self._settings.use_local_server
+
+    @property
+    def local_server_port(self) -> int:
+        return self._settings.local_server_port
+
+    @property
+    def local_server_concurrency(self) -> int:
+        return self._settings.local_server_concurrency
+
+    def saved_regions_for(self, monitor_idx: int) -> list[dict]:
+        return [dict(r) for r in self._settings.saved_regions.get(str(monitor_idx), [])]
+
     # ---------- setters ----------
     def set_hotkey_combo(self, combo: str):
         self._settings.hotkey_combo = combo
@@ -138,9 +257,54 @@ class SettingsManager:
     def set_hotkey_rem_combo(self, combo: str):
         self._settings.hotkey_rem_combo = combo
 
+    def set_hotkey_regions_combo(self, combo: str):
+        self._settings.hotkey_regions_combo = combo
+
+    def set_hotkey_retranslate_combo(self, combo: str):
+        self._settings.hotkey_retranslate_combo = combo
+
+    def add_saved_region(self, monitor_idx: int, name: str, rect_local: tuple[int, int, int, int]):
+        name = (name or "").strip()
+        if not name:
+            raise ValueError("영역 이름을 입력하세요.")
+        regions = [r for r in self._settings.saved_regions.get(str(monitor_idx), []) if r.get("name") != name]
+        regions.append({"name": name, "rect": [int(v) for v in rect_local]})
+        self._settings.saved_regions[str(monitor_idx)] = regions
+
+    def set_saved_region_lang(self, monitor_idx: int, name: str, lang_tag: str):
+        for r in self._settings.saved_regions.get(str(monitor_idx), []):
+            if r.get("name") == name:
+                r["lang"] = lang_tag
+
+    def remove_saved_region(self, monitor_idx: int, name: str):
+        regions = self._settings.saved_regions.get(str(monitor_idx), [])
+        self._settings.saved_regions[str(monitor_idx)] = [r for r in regions if r.get("name") != name]
+
     def set_use_scroll_detect(self, enabled: bool):
         self._settings.use_scroll_detect = bool(enabled)
 
+    def set_use_speculative_ocr(self, enabled: bool):
+        self._settings.use_speculative_ocr = bool(enabled)
+
+    def set_use_text_norm(self, enabled: bool):
+        self._settings.use_text_norm = bool(enabled)
+
+    def set_use_text_detect(self, enabled: bool):
+        self._settings.use_text_detect = bool(enabled)
+
+    def set_use_line_diff(self, enabled: bool):
+        self._settings.use_line_diff = bool(enabled)
+
+    def set_use_ocr_cache(self, enabled: bool):
+        self._settings.use_ocr_cache = bool(enabled)
+
+    def set_ocr_limits(self, concurrency: int, queue_limit: int):
+        self._settings.ocr_concurrency = max(1, int(concurrency))
+        self._settings.ocr_queue_limit = max(0, int(queue_limit))
+
+    def set_use_worker_process(self, enabled: bool):
+        self._settings.use_worker_process = bool(enabled)
+
     def set_system_prompt(self, prompt: str):
         self._settings.system_prompt = prompt or ""
 
@@ -150,6 +314,23 @@ class SettingsManager:
         self._settings.gemini_model = model
         self._settings.gemini_api_key = api_key
 
+    def set_use_translation_cache(self, enabled: bool):
+        self._settings.use_translation_cache = bool(enabled)
+
+    def set_use_context_cache(self, enabled: bool):
+        self._settings.use_context_cache = bool(enabled)
+
+    def set_deadline_seconds(self, seconds: float):
+        self._settings.deadline_seconds = max(0.0, float(seconds))
+
+    def set_chunking(self, chunk_chars: int, workers: int):
+        self._settings.chunk_chars = max(0, int(chunk_chars))
+        self._settings.chunk_workers = max(1, int(workers))
+
+    def set_gemini_limits(self, rpm: int, tpm: int):
+        self._settings.gemini_rpm = max(0, int(rpm))
+        self._settings.gemini_tpm = max(0, int(tpm))
+
     def set_font(self, family, size):
         family = (family or "").strip()
         if not family: return
@@ -161,6 +342,19 @@ class SettingsManager:
     def set_use_overlay_layout(self, enabled: bool):
         self._settings.use_overlay_layout = bool(enabled)
 
+    def set_use_history(self, enabled: bool):
+        self._settings.use_history = bool(enabled)
+
+    def set_record_trace(self, enabled: bool):
+        self._settings.record_trace = bool(enabled)
+
+    def set_local_server(self, enabled: bool, port: int, concurrency: int):
+        if not(1024 <= int(port) <= 65535):
+            raise ValueError("서버 포트는 1024~65535 사이여야 합니다.")
+        self._settings.use_local_server = bool(enabled)
+        self._settings.local_server_port = int(port)
+        self._settings.local_server_concurrency = max(1, int(concurrency))
+
     def update(self, *, hotkey_combo: Optional[str]=None, hotkey_rem_combo: Optional[str]=None,
                system_prompt: Optional[str]=None, gemini_model: Optional[str]=None,
                gemini_api_key: Optional[str]=None, font_family: Optional[str]=None,
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Generic, Iterable, TypeVar
+
+T = TypeVar("T")
+
+
+class GridIndex(Generic[T]):
+    """
+    균일 격자 공간 인덱스.
+    항목을 (x, y, w, h) 박스가 걸치는 모든 셀에 등록하고, 사각형 질의 시 겹치는 셀만 확인한다.
+    질의 결과는 삽입 순서를 유지한다(OCR 단어 순서 = 읽는 순서).
+    """
+    def __init__(self, cell: int = 64):
+        self.cell = max(1, int(cell))
+        self._cells: dict[tuple[int, int], list[int]] = defaultdict(list)
+        self._items: list[tuple[tuple[int, int, int, int], T]] = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _cell_range(self, x: int, y: int, w: int, h: int):
+        c = self.cell
+        return range(x // c, (x + max(w, 1) - 1) // c + 1), range(y // c, (y + max(h, 1) - 1) // c + 1)
+
+    def insert(self, box: tuple[int, int, int, int], item: T):
+        idx = len(self._items)
+        self._items.append((box, item))
+        xs, ys = self._cell_range(*box)
+        for cx in xs:
+            for cy in ys:
+                self._cells[(cx, cy)].append(idx)
+
+    def extend(self, entries: Iterable[tuple[tuple[int, int, int, int], T]]):
+        for box, item in entries:
+            self.insert(box, item)
+
+    def query(self, rect: tuple[int, int, int, int]) -> list[T]:
+        """박스 중심이 rect(x, y, w, h) 안에 있는 항목."""
+        rx, ry, rw, rh = rect
+        xs, ys = self._cell_range(rx, ry, rw, rh)
+        hits = set()
+        for cx in xs:
+            for cy in ys:
+                hits.update(self._cells.get((cx, cy), ()))
+        out = []
+        for idx in sorted(hits):
+            (x, y, w, h), item = self._items[idx]
+            mx, my = x + w / 2, y + h / 2
+            if rx <= mx < rx + rw and ry <= my < ry + rh:
+                out.append(item)
+        return out
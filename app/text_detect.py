@@ -0,0 +1,208 @@
+"""
+선택 영역 안에서 글자가 있는 부분만 찾아 OCR 할 픽셀을 줄인다 (NumPy).
+
+넉넉하게 드래그한 영역은 대부분 배경 그림이라 OCR 엔진이 필요 없는 픽셀까지 처리한다.
+  1) 축소   : 긴 변이 MAX_SIDE 이하가 되도록 정수 간격으로 건너뛴 회색조 (캡처 버퍼를 복사하지 않는 뷰에서)
+  2) 에지   : 옆/아래 픽셀과 밝기 차이가 EDGE_THRESHOLD 이상인 곳
+  3) 밀도   : DENSITY_WIN 창 안의 에지 비율이 MIN_DENSITY 이상인 곳만 남긴다 (흩어진 잡음 제거)
+  4) 닫힘   : 가로로 길게 팽창 → 침식 (closing) 해서 한 줄의 글자들을 하나로 잇는다
+  5) 연결 요소: 행마다 run 을 구해 윗줄 run 과 겹치면 합친다 (union-find).
+              가로/세로 에지가 모두 있는 것만 글자로 본다 (UI 테두리 같은 직선 제외)
+  6) 여백을 붙이고 겹치는 상자를 합쳐 원래 좌표로, 읽는 순서(위→아래, 왼쪽→오른쪽)로 반환
+확신이 없으면 None — 글자 후보가 없거나, 에지가 너무 많거나(무늬/사진), 상자가 영역 대부분을 덮으면.
+호출하는 쪽은 None 이면 영역 전체를 OCR 한다. numpy 가 없으면 항상 None.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:   # 선택 의존성: 없으면 영역 축소를 하지 않는다
+    np = None
+
+MIN_PIXELS = 120_000      # 이보다 작은 영역은 줄여도 이득이 적어 그대로 OCR
+MAX_SIDE = 640            # 축소 후 긴 변 상한
+EDGE_THRESHOLD = 48       # 에지로 볼 밝기 차이 (0~255)
+DENSITY_WIN = 5           # 밀도를 볼 창 크기 (축소 픽셀)
+MIN_DENSITY = 0.12        # 창 안 에지 비율 하한
+MAX_EDGE_RATIO = 0.25     # 축소 이미지 전체 에지 비율이 이보다 크면 무늬로 보고 포기
+CLOSE_W, CLOSE_H = 9, 3   # closing 크기 (축소 픽셀): 글자/단어 사이를 메울 만큼 가로로 길게
+MIN_AREA = 20             # 이보다 작은 요소는 잡음 (축소 픽셀 수)
+MIN_AXIS_RATIO = 0.15     # 요소 안 가로 에지/세로 에지 중 적은 쪽의 비율 하한 (직선 제외)
+MARGIN = 8                # 상자 둘레 여백 (원본 픽셀)
+MAX_BOXES = 6             # 이보다 많으면 전체를 감싸는 상자 하나로
+MAX_COVER = 0.7           # 상자 넓이 합이 영역의 이 비율 이상이면 줄일 이득이 없어 None
+
+Box = tuple[int, int, int, int]   # (x, y, w, h) 이미지 기준 픽셀
+
+
+def available() -> bool:
+    return np is not None
+
+
+def _gray(img, step: int):
+    """img(capture.Frame 또는 PIL 이미지)를 step 간격으로 건너뛴 회색조 int16 배열."""
+    if hasattr(img, "byte_offset"):
+        w, h = img.size
+        a = np.frombuffer(img.buf, np.uint8, count=(h - 1) * img.stride + w * 4, offset=img.byte_offset)
+        a = np.lib.stride_tricks.as_strided(a, shape=(h, w, 4), strides=(img.stride, 4, 1))[::step, ::step]
+        b, g, r = (a[..., i].astype(np.int32) for i in range(3))
+        return ((b * 29 + g * 150 + r * 77) >> 8).astype(np.int16)
+    return np.asarray(img.convert("L"), dtype=np.uint8)[::step, ::step].astype(np.int16)
+
+
+def _shift_sum(a, k: int, axis: int):
+    """axis 방향으로 각 원소를 중심으로 한 k 개의 합 (밀어서 더하기, 가장자리 밖은 0)."""
+    r1 = k // 2
+    pad = [(0, 0), (0, 0)]
+    pad[axis] = (r1, k - 1 - r1)
+    p = np.pad(a, pad)
+    n = a.shape[axis]
+    out = np.zeros_like(a)
+    for i in range(k):
+        out += p[i:i + n] if axis == 0 else p[:, i:i + n]
+    return out
+
+
+def _window_sum(m, kh: int, kw: int):
+    """bool 배열 m 에서 각 픽셀을 중심으로 한 kh x kw 창 안의 True 개수 (kh * kw <= 255)."""
+    return _shift_sum(_shift_sum(m.astype(np.uint8), kw, 1), kh, 0)
+
+
+def _components(mask) -> list[list[int]]:
+    """4-연결 요소들의 [x0, y0, x1, y1, 넓이] (x1, y1 은 끝 다음 좌표)."""
+    d = np.diff(mask.astype(np.int8), axis=1, prepend=0, append=0)
+    rows, starts = np.nonzero(d == 1)
+    ends = np.nonzero(d == -1)[1]
+
+    parent: list[int] = []
+
+    def find(a: int) -> int:
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    boxes: list[list[int]] = []
+    prev: list[tuple[int, int, int]] = []   # 윗줄 run (start, end, label)
+    cur: list[tuple[int, int, int]] = []
+    row = -1
+    for r, s, e in zip(rows.tolist(), starts.tolist(), ends.tolist()):
+        if r != row:
+            prev = cur if r == row + 1 else []
+            cur, row, j = [], r, 0
+        label = -1
+        while j < len(prev) and prev[j][1] <= s:   # 이 run 보다 완전히 왼쪽인 윗줄 run 건너뜀
+            j += 1
+        k = j
+        while k < len(prev) and prev[k][0] < e:
+            root = find(prev[k][2])
+            if label < 0:
+                label = root
+            elif root != label:
+                parent[root] = label
+            k += 1
+        if label < 0:
+            label = len(parent)
+            parent.append(label)
+            boxes.append([s, r, e, r + 1, 0])
+        b = boxes[label]
+        b[0], b[1], b[2], b[3] = min(b[0], s), min(b[1], r), max(b[2], e), max(b[3], r + 1)
+        b[4] += e - s
+        cur.append((s, e, label))
+
+    merged: dict[int, list[int]] = {}
+    for i, b in enumerate(boxes):
+        root = find(i)
+        m = merged.get(root)
+        if m is None:
+            merged[root] = list(b)
+        else:
+            m[0], m[1], m[2], m[3] = min(m[0], b[0]), min(m[1], b[1]), max(m[2], b[2]), max(m[3], b[3])
+            m[4] += b[4]
+    return list(merged.values())
+
+
+def _merge(boxes: list[list[int]]) -> list[list[int]]:
+    """겹치거나 맞닿은 상자 [x0, y0, x1, y1] 를 더 이상 합칠 것이 없을 때까지 합친다."""
+    boxes = [list(b) for b in boxes]
+    changed = True
+    while changed:
+        changed = False
+        out: list[list[int]] = []
+        for b in boxes:
+            for o in out:
+                if b[0] <= o[2] and o[0] <= b[2] and b[1] <= o[3] and o[1] <= b[3]:
+                    o[0], o[1], o[2], o[3] = min(o[0], b[0]), min(o[1], b[1]), max(o[2], b[2]), max(o[3], b[3])
+                    changed = True
+                    break
+            else:
+                out.append(b)
+        boxes = out
+    return boxes
+
+
+def detect_text_regions(img) -> Optional[list[Box]]:
+    """
+    img(capture.Frame 또는 PIL 이미지) 안의 글자 영역 상자들 (읽는 순서).
+    줄일 필요가 없거나 확신이 없으면 None (→ 전체 OCR).
+    """
+    if np is None:
+        return None
+    width, height = img.size
+    if width * height < MIN_PIXELS:
+        return None
+    step = max(1, -(-max(width, height) // MAX_SIDE))
+    g = _gray(img, step)
+
+    dx = np.zeros(g.shape, bool)
+    dy = np.zeros(g.shape, bool)
+    dx[:, 1:] = np.abs(g[:, 1:] - g[:, :-1]) >= EDGE_THRESHOLD
+    dy[1:, :] = np.abs(g[1:, :] - g[:-1, :]) >= EDGE_THRESHOLD
+    edges = dx | dy
+    if edges.mean() > MAX_EDGE_RATIO:
+        return None
+
+    dense = _window_sum(edges, DENSITY_WIN, DENSITY_WIN) >= MIN_DENSITY * DENSITY_WIN * DENSITY_WIN
+    closed = _window_sum(_window_sum(dense, CLOSE_H, CLOSE_W) > 0, CLOSE_H, CLOSE_W) == CLOSE_H * CLOSE_W
+    mask = closed | dense   # closing 은 가장자리를 깎지 않게 원래 영역과 합침
+
+    pad = -(-MARGIN // step)
+    gh, gw = g.shape
+    keep = []
+    for x0, y0, x1, y1, area in _components(mask):
+        if area < MIN_AREA:
+            continue
+        nx, ny = int(np.count_nonzero(dx[y0:y1, x0:x1])), int(np.count_nonzero(dy[y0:y1, x0:x1]))
+        if min(nx, ny) < MIN_AXIS_RATIO * max(nx, ny, 1):
+            continue
+        keep.append([max(0, x0 - pad), max(0, y0 - pad), min(gw, x1 + pad), min(gh, y1 + pad)])
+    if not keep:
+        return None
+
+    boxes = _merge(keep)
+    if len(boxes) > MAX_BOXES:
+        boxes = [[min(b[0] for b in boxes), min(b[1] for b in boxes),
+                  max(b[2] for b in boxes), max(b[3] for b in boxes)]]
+    out: list[Box] = []
+    for x0, y0, x1, y1 in sorted(boxes, key=lambda b: (b[1], b[0])):
+        x, y = x0 * step, y0 * step
+        out.append((x, y, min(width, x1 * step) - x, min(height, y1 * step) - y))
+    if sum(w * h for _, _, w, h in out) >= MAX_COVER * width * height:
+        return None
+    return out
+
+
+def union_box(boxes: list[Box]) -> Box:
+    x0, y0 = min(b[0] for b in boxes), min(b[1] for b in boxes)
+    x1, y1 = max(b[0] + b[2] for b in boxes), max(b[1] + b[3] for b in boxes)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def crop(img, box: Box):
+    """capture.Frame 은 복사 없는 뷰로, PIL 이미지는 crop() 으로 잘라낸다."""
+    x, y, w, h = box
+    if hasattr(img, "crop_local"):
+        return img.crop_local(x, y, w, h)
+    return img.crop((x, y, x + w, y + h))
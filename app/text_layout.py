@@ -0,0 +1,109 @@
+"""
+OCR 단어 박스(OcrWord)에서 원문 텍스트를 다시 조립한다.
+
+WinRT OCR 은 ja/zh 결과를 한 글자(또는 짧은 묶음) 단위 단어로 돌려준다. 이것을 " " 로 이어 붙이면
+보내는 글자 수가 거의 두 배가 되고, 줄/문단 구조가 사라져 번역 품질과 스크롤 인식이 나빠진다.
+박스 좌표와 문자 체계로 다음을 정한다.
+
+- 같은 줄 안: CJK 끼리는 붙인다 (간격이 글자 높이의 WIDE_GAP 배 이상이면 공백 하나, 표/열 구분).
+              CJK 와 라틴/숫자 사이는 눈에 보이는 간격(SPACE_GAP)이 있을 때만 공백. 라틴/숫자끼리는 공백.
+- 줄 사이  : 빈 공간이 줄 높이의 PARA_GAP 배 이상이면 문단 구분(빈 줄).
+              다음 줄의 첫 단어가 앞 줄 끝에 들어갈 자리가 있었거나(= 일부러 끊은 줄),
+              다음 줄이 들여쓰기/글머리 기호로 시작하거나, 위로 올라가면(다른 열) 줄바꿈.
+              그 밖(자동 줄바꿈)은 이어 붙인다 — CJK 는 그대로, 라틴은 공백 하나 (줄 끝 하이픈은 유지).
+줄은 OCR 엔진의 줄 번호(OcrWord.line) 순서를 따르고, 줄 안에서는 x 좌표 순서.
+"""
+from __future__ import annotations
+
+import re
+from statistics import median
+from typing import Iterable
+
+WIDE_GAP = 1.0      # CJK 글자 사이 빈 공간이 글자 높이의 이 배 이상이면 공백 (표/열 구분)
+SPACE_GAP = 0.2     # CJK 와 라틴/숫자 사이 빈 공간이 이 배 이상이면 공백 ("攻撃力 +45" vs "HPが")
+PARA_GAP = 0.8      # 줄 사이 빈 공간이 줄 높이의 이 배 이상이면 문단 구분
+FIT_SLACK = 0.5     # 앞 줄 끝에 (다음 줄 첫 단어 + 글자 높이의 이 배) 만큼 자리가 남았으면 강제 줄바꿈
+INDENT = 1.0        # 줄 시작이 가장 왼쪽보다 글자 높이의 이 배 이상 들어가 있으면 새 줄로 본다
+
+_CJK_RE = re.compile(r"[぀-ヿ㐀-䶿一-鿿豈-﫿ｦ-ﾟ　-〿＀-｠]")
+_BULLET_RE = re.compile(r"[•·●○◎■□▪▫▶►▷◆◇★☆※・\-*]|\d{1,2}[.)]|[①-⑳]")
+
+
+def is_cjk(ch: str) -> bool:
+    """공백 없이 이어 쓰는 문자 (가나, 한자, 전각 기호/영숫자). 한글은 띄어 쓰므로 제외."""
+    return bool(ch) and _CJK_RE.match(ch) is not None
+
+
+def _joiner(left: str, right: str) -> str:
+    """자동 줄바꿈으로 갈라진 두 줄을 이을 때 사이에 넣을 문자."""
+    if is_cjk(left[-1]) or is_cjk(right[0]):
+        return ""
+    if left.endswith("-") and len(left) > 1 and left[-2].isalpha() and right[0].islower():
+        return ""
+    return " "
+
+
+class _Line:
+    __slots__ = ("text", "x0", "y0", "x1", "y1", "first_w")
+
+    def __init__(self, words: list):
+        words = sorted(words, key=lambda w: w.x)
+        self.x0 = min(w.x for w in words)
+        self.y0 = min(w.y for w in words)
+        self.x1 = max(w.x + w.w for w in words)
+        self.y1 = max(w.y + w.h for w in words)
+        self.first_w = words[0].w
+        h = self.height
+        parts = [words[0].text]
+        for prev, w in zip(words, words[1:]):
+            gap = w.x - (prev.x + prev.w)
+            a, b = is_cjk(prev.text[-1]), is_cjk(w.text[0])
+            if a and b:
+                if gap >= WIDE_GAP * h:
+                    parts.append(" ")
+            elif a or b:
+                if gap >= SPACE_GAP * h:
+                    parts.append(" ")
+            else:
+                parts.append(" ")
+            parts.append(w.text)
+        self.text = "".join(parts).strip()
+
+    @property
+    def height(self) -> int:
+        return max(1, self.y1 - self.y0)
+
+
+def _group_lines(words: Iterable) -> list[_Line]:
+    by_line: dict[int, list] = {}
+    for w in words:
+        if w.text.strip():
+            by_line.setdefault(w.line, []).append(w)
+    lines = [_Line(by_line[k]) for k in sorted(by_line)]
+    return [ln for ln in lines if ln.text]
+
+
+def reconstruct(words: Iterable) -> str:
+    """OcrWord(text, x, y, w, h, line) 들을 줄/문단 구조를 살린 텍스트로."""
+    lines = _group_lines(words)
+    if not lines:
+        return ""
+    h = median(ln.height for ln in lines)
+    left = min(ln.x0 for ln in lines)
+    right = max(ln.x1 for ln in lines)
+
+    out = [lines[0].text]
+    for prev, cur in zip(lines, lines[1:]):
+        gap = cur.y0 - prev.y1
+        if gap >= PARA_GAP * h:
+            sep = "\n\n"
+        elif (cur.y0 < prev.y0
+              or right - prev.x1 > cur.first_w + FIT_SLACK * h
+              or cur.x0 > left + INDENT * h
+              or _BULLET_RE.match(cur.text)):
+            sep = "\n"
+        else:
+            sep = _joiner(out[-1], cur.text)
+        out.append(sep)
+        out.append(cur.text)
+    return "".join(out)
@@ -0,0 +1,106 @@
+"""
+OCR 결과 정규화.
+같은 툴팁이라도 캡처마다 공백, |/l, 따옴표 모양, UI 기호, 반복 문장부호가 조금씩 달라
+캐시가 빗나가고 Gemini 에 잡음 토큰이 들어간다. 표(str.translate) + 몇 개의 정규식으로
+- payload: LLM 에 보낼 정리된 텍스트
+- key    : 캐시 키 (payload 를 casefold 하고 공백을 모두 제거)
+- stripped: 원문 대비 줄어든 글자 수
+를 만든다. 언어별 규칙은 LANG_RULES 에서 설정한다.
+"""
+from __future__ import annotations
+
+import re
+from typing import NamedTuple, Optional
+
+
+class NormalizedText(NamedTuple):
+    key: str
+    payload: str
+    stripped: int
+
+
+# ---------- 문자 치환 표 ----------
+
+_COMMON_MAP = {
+    # 따옴표/아포스트로피
+    "‘": "'", "’": "'", "‚": "'", "‛": "'", "′": "'", "`": "'", "´": "'",
+    "“": '"', "”": '"', "„": '"', "‟": '"', "″": '"',
+    # 대시/하이픈
+    "‐": "-", "‑": "-", "‒": "-", "–": "-", "—": "-", "―": "-", "−": "-",
+    # 공백류
+    " ": " ", " ": " ", " ": " ", " ": " ", " ": " ", "\t": " ",
+    # 말줄임표
+    "…": "...",
+}
+_COMMON_DELETE = "​‌‍⁠﻿­"   # zero-width, soft hyphen
+
+# 전각 영숫자 → 반각 (ja/zh OCR 이 섞어서 내보냄)
+_FULLWIDTH_ALNUM = {c: c - 0xFEE0 for c in range(0xFF10, 0xFF5B) if chr(c - 0xFEE0).isalnum()}
+# 전각 문장부호 → 반각 (영어 결과에 섞인 경우만)
+_FULLWIDTH_PUNCT = {c: c - 0xFEE0 for c in range(0xFF01, 0xFF5F) if not chr(c - 0xFEE0).isalnum()}
+_FULLWIDTH_PUNCT[0x3000] = 0x20   # 전각 공백
+
+
+def _table(*maps: dict, delete: str = "") -> dict[int, Optional[str | int]]:
+    t: dict = {}
+    for m in maps:
+        t.update(str.maketrans(m) if any(isinstance(k, str) for k in m) else m)
+    t.update(str.maketrans("", "", delete))
+    return t
+
+
+# ---------- 정규식 ----------
+
+_CJK = r"぀-ヿ㐀-䶿一-鿿豈-﫿ｦ-ﾟ"
+_UI_GLYPHS = r"•·●○◎■□▪▫▶►▷◀◁◆◇★☆※|¦>»«◈◉♦"
+
+_RE_SPACES = re.compile(r" {2,}")
+_RE_SPACE_NL = re.compile(r" *\n *")
+_RE_MANY_NL = re.compile(r"\n{3,}")
+# 줄 맨 앞의 글머리 기호만 지운다 (문장 중간의 | > 는 글자일 수 있음: "Press > to", "I said | was")
+_RE_UI_GLYPH = re.compile(rf"^ *[{_UI_GLYPHS}]+(?= |$)", re.MULTILINE)
+_RE_DOTS = re.compile(r"\.{4,}")
+_RE_REPEAT_PUNCT = re.compile(r"([,;:!?~_=*\-])\1+")
+
+# 영어: 홀로 선 | 뒤에 소문자 단어나 ' 가 오면 대명사 I ("| think", "|'m"), 단어 안의 | → l,
+#       문장부호 앞 공백 제거
+_RE_EN_PIPE_I = re.compile(r"(?:(?<=\s)|^)\|(?= +[a-z]|')", re.MULTILINE)
+_RE_EN_PIPE = re.compile(r"(?<=[A-Za-z])\|(?=[A-Za-z])|(?<=\s)\|(?=[a-z])")
+_RE_EN_SPACE_PUNCT = re.compile(r" +(?=[,.!?;:%)\]])")
+_RE_EN_SPACE_OPEN = re.compile(r"(?<=[(\[]) +")
+# CJK: 글자 사이 공백 제거 (WinRT OCR 은 한 글자씩 단어로 잘라 공백으로 이어 붙임)
+_RE_CJK_SPACE = re.compile(rf"(?<=[{_CJK}、。，．！？：；「」『』（）]) +(?=[{_CJK}、。，．！？：；「」『』（）])")
+
+_COMMON_RULES = [(_RE_UI_GLYPH, ""), (_RE_DOTS, "..."), (_RE_REPEAT_PUNCT, r"\1")]
+
+LANG_RULES: dict[str, tuple[dict, list]] = {
+    # lang_tag: (str.translate 표, [(정규식, 치환), ...])  — 표 적용 후 규칙 순서대로 적용
+    "en-US": (_table(_COMMON_MAP, _FULLWIDTH_ALNUM, _FULLWIDTH_PUNCT, delete=_COMMON_DELETE),
+              [(_RE_EN_PIPE_I, "I"), (_RE_EN_PIPE, "l"), *_COMMON_RULES, (_RE_EN_SPACE_PUNCT, ""), (_RE_EN_SPACE_OPEN, "")]),
+    "ja-JP": (_table(_COMMON_MAP, _FULLWIDTH_ALNUM, delete=_COMMON_DELETE),
+              [*_COMMON_RULES, (_RE_CJK_SPACE, "")]),
+    "zh-CN": (_table(_COMMON_MAP, _FULLWIDTH_ALNUM, delete=_COMMON_DELETE),
+              [*_COMMON_RULES, (_RE_CJK_SPACE, "")]),
+}
+_DEFAULT_RULES = (_table(_COMMON_MAP, _FULLWIDTH_ALNUM, delete=_COMMON_DELETE),
+                  [*_COMMON_RULES, (_RE_CJK_SPACE, "")])
+
+_RE_ALL_SPACE = re.compile(r"\s+")
+
+
+def normalize(text: str, lang_tag: str = "") -> NormalizedText:
+    """OCR 텍스트 → (캐시 키, 정리된 텍스트, 줄어든 글자 수). lang_tag 가 모르는 값이면 공통 규칙만."""
+    if not text:
+        return NormalizedText("", "", 0)
+    table, rules = LANG_RULES.get(lang_tag, _DEFAULT_RULES)
+    s = text.translate(table)
+    for rx, repl in rules:
+        s = rx.sub(repl, s)
+    s = _RE_SPACES.sub(" ", s)
+    s = _RE_MANY_NL.sub("\n\n", _RE_SPACE_NL.sub("\n", s)).strip()
+    key = _RE_ALL_SPACE.sub("", s.casefold())
+    return NormalizedText(key, s, max(0, len(text) - len(s)))
+
+
+def cache_key(text: str, lang_tag: str = "") -> str:
+    return normalize(text, lang_tag).key
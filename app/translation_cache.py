@@ -0,0 +1,132 @@
+"""
+번역 결과 LRU 캐시 (프로세스 메모리).
+- 키: (정규화된 원문 키, 시스템 프롬프트 해시, 모델명)
+- 항목 수(max_entries)와 바이트 수(max_bytes) 두 기준으로 오래된 것부터 제거
+- 검증(validate)을 통과한 응답만 저장한다: 한글 비율, 길이 비율, 거절/프롬프트 노출/원문 그대로(에코) 검사
+  (MORT 처럼 잘못된 번역이 캐시에 남아 계속 재사용되는 것을 막기 위함)
+적중/거부 횟수는 metrics 의 cache.* 카운터로 기록한다.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from metrics import metrics
+from text_norm import cache_key
+
+MIN_HANGUL_RATIO = 0.3           # 번역문 글자 중 한글 비율 하한 (고유명사는 영문 유지하므로 낮게)
+MIN_LEN_RATIO, MAX_LEN_RATIO = 0.15, 4.0
+_LEN_CHECK_MIN_SOURCE = 20       # 이보다 짧은 원문은 길이 비율을 보지 않음
+
+_HANGUL_RE = re.compile(r"[가-힣ㄱ-ㆎ]")
+_LETTER_RE = re.compile(r"[^\W\d_]")
+_REFUSAL_RE = re.compile(
+    r"죄송|번역할 수 없|번역이 불가|I'm sorry|I am sorry|I cannot|I can't|as an AI|"
+    r"Text to Translate|Context \((?:before|after)\)",
+    re.IGNORECASE,
+)
+
+
+def validate(source: str, translated: str) -> Optional[str]:
+    """캐시에 넣어도 되는 응답이면 None, 아니면 거부 사유."""
+    t = (translated or "").strip()
+    if not t:
+        return "빈 응답"
+    if _REFUSAL_RE.search(t):
+        return "거절 또는 프롬프트 노출"
+    if cache_key(t) == cache_key(source):
+        return "원문 그대로 반환"
+    letters = len(_LETTER_RE.findall(t))
+    if letters >= 4:
+        ratio = len(_HANGUL_RE.findall(t)) / letters
+        if ratio < MIN_HANGUL_RATIO:
+            return f"한글 비율 낮음 ({ratio:.0%})"
+    if len(source) >= _LEN_CHECK_MIN_SOURCE:
+        ratio = len(t) / len(source)
+        if not (MIN_LEN_RATIO <= ratio <= MAX_LEN_RATIO):
+            return f"길이 비율 이상 ({ratio:.2f})"
+    return None
+
+
+def prompt_hash(system_prompt: str) -> str:
+    return hashlib.blake2b((system_prompt or "").encode("utf-8"), digest_size=8).hexdigest()
+
+
+class TranslationCache:
+    def __init__(self, max_entries: int = 512, max_bytes: int = 4 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[tuple, tuple[str, int]]" = OrderedDict()   # key → (번역, 크기)
+        self._bytes = 0
+
+    @staticmethod
+    def make_key(text: str, system_prompt: str, model: str) -> tuple:
+        return cache_key(text), prompt_hash(system_prompt), model
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+        metrics.incr("cache.hit" if item is not None else "cache.miss")
+        return item[0] if item is not None else None
+
+    def put(self, key: tuple, source: str, translated: str) -> bool:
+        """검증을 통과하면 저장하고 True. 거부되면 False (metrics: cache.reject)."""
+        if not key[0]:
+            return False
+        reason = validate(source, translated)
+        if reason is not None:
+            metrics.incr("cache.reject")
+            return False
+        size = len(translated.encode("utf-8")) + len(key[0].encode("utf-8")) + 64
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._items[key] = (translated, size)
+            self._bytes += size
+            evicted = 0
+            while self._items and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, s) = self._items.popitem(last=False)
+                self._bytes -= s
+                evicted += 1
+        metrics.incr("cache.store")
+        if evicted:
+            metrics.incr("cache.evict", evicted)
+        return True
+
+    def discard(self, key: tuple):
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+
+def cache_summary() -> str:
+    """metrics 카운터로 계산한 적중률/거부율 한 줄."""
+    c = metrics.snapshot()["counters"]
+    hit, miss = c.get("cache.hit", 0), c.get("cache.miss", 0)
+    store, reject = c.get("cache.store", 0), c.get("cache.reject", 0)
+    hit_rate = hit / (hit + miss) if hit + miss else 0.0
+    reject_rate = reject / (store + reject) if store + reject else 0.0
+    return (f"번역 캐시: 적중 {hit:g}/{hit + miss:g} ({hit_rate:.0%}), "
+            f"거부 {reject:g}/{store + reject:g} ({reject_rate:.0%})")
@@ -1,28 +1,45 @@
 from typing import Optional
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtCore import Qt
-from settings import SettingsManager, ASSET_FONTS_DIR
+from settings import SettingsManager, ASSET_FONTS_DIR, appdata_dir
+from capture import Frame, grab_frame
+from text_detect import available as text_detect_available
+from usage import usage
 import os
 import html
+import json
+import sqlite3
+import time
+import tracemalloc
 
 # ---- 캡처 오버레이 ----
 class SelectionOverlay(QtWidgets.QWidget):
     selected = QtCore.pyqtSignal(QtCore.QRect)   # 글로벌 좌표
     cancelled = QtCore.pyqtSignal()
 
-    def __init__(self, monitor_geo: QtCore.QRect):
+    def __init__(self, monitor_geo: QtCore.QRect, frame: Optional[Frame] = None):
         super().__init__(parent=None)
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Window)
         self.setAttribute(Qt.WA_TranslucentBackground, True)
+        self.setAttribute(Qt.WA_DeleteOnClose, True)
         self.setCursor(Qt.CrossCursor)
         self.monitor_geo = monitor_geo
         self.setGeometry(monitor_geo)
         self._start: Optional[QtCore.QPoint] = None
         self._end: Optional[QtCore.QPoint] = None
 
+        # 오버레이를 열 때 캡처한 화면(freeze-frame)을 배경으로 그린다
+        self._bg: Optional[QtGui.QImage] = None
+        if frame is not None:
+            self._bg_bytes = frame.to_bgra_bytes()  # QImage 가 버퍼를 참조하므로 보관
+            self._bg = QtGui.QImage(self._bg_bytes, frame.width, frame.height,
+                                    frame.width * 4, QtGui.QImage.Format_RGB32)
+
     def paintEvent(self, e):
         p = QtGui.QPainter(self)
         p.setRenderHint(QtGui.QPainter.Antialiasing)
+        if self._bg is not None:
+            p.drawImage(self.rect(), self._bg)
         p.fillRect(self.rect(), QtGui.QColor(0, 0, 0, 120))
         if self._start and self._end:
             rect = self._rect_local()
@@ -114,14 +131,53 @@ class SettingsDialog(QtWidgets.QDialog):
         self.edt_hotkey.setPlaceholderText("캡처 보드를 여는 핫키")
         self.edt_hotkey_rem = QtWidgets.QLineEdit()
         self.edt_hotkey_rem.setPlaceholderText("직전 캡처 영역을 그대로 다시 캡처하여 번역하는 핫키")
+        self.edt_hotkey_regions = QtWidgets.QLineEdit()
+        self.edt_hotkey_regions.setPlaceholderText("저장된 영역을 한 번에 캡처하여 번역하는 핫키")
+        self.edt_hotkey_retranslate = QtWidgets.QLineEdit()
+        self.edt_hotkey_retranslate.setPlaceholderText("직전 캡처 영역을 번역 캐시 없이 다시 번역하는 핫키")
         self.chk_overlay_0 = QtWidgets.QCheckBox("스크롤 인식: 이전에 캡처한 문장과 겹치는 경우, 두 문장을 합쳐서 번역합니다.")
         self.chk_overlay_0.setToolTip("직전 번역 기록과 겹치는 문장을 캡처하면, 이전 문장과 합쳐서 번역합니다.")
+        self.chk_speculative = QtWidgets.QCheckBox("추측 OCR: 캡처 보드가 열리는 즉시 화면 전체를 미리 OCR합니다.")
+        self.chk_speculative.setToolTip("드래그가 끝나면 미리 인식한 단어 중 선택 영역 안의 것만 사용합니다. (auto 언어 제외)")
+        self.chk_text_norm = QtWidgets.QCheckBox("OCR 결과 정리: 불필요한 공백, 따옴표 모양, UI 기호, 반복 문장부호를 정리합니다.")
+        self.chk_text_norm.setToolTip("같은 문장이 캡처마다 조금씩 다르게 인식되는 것을 줄이고, 번역 요청의 잡음을 없앱니다.")
+        self.chk_text_detect = QtWidgets.QCheckBox("글자 영역만 OCR: 넓게 선택한 영역에서 글자가 있는 부분만 잘라 인식합니다.")
+        if text_detect_available():
+            self.chk_text_detect.setToolTip("배경 그림이 대부분인 영역의 OCR 시간을 줄입니다. "
+                                            "글자 위치가 확실하지 않으면 영역 전체를 인식합니다.")
+        else:
+            self.chk_text_detect.setEnabled(False)
+            self.chk_text_detect.setToolTip("numpy 가 설치되어 있어야 사용할 수 있습니다.")
+        self.chk_line_diff = QtWidgets.QCheckBox("바뀐 줄만 번역: 재번역 핫키로 같은 영역을 다시 캡처하면 달라진 줄만 번역합니다.")
+        self.chk_line_diff.setToolTip("떠 있는 오버레이를 닫지 않고 바뀐 줄만 고칩니다. "
+                                      "바뀐 줄이 절반을 넘거나 줄 대응을 알 수 없으면 전체를 번역합니다.")
+        self.chk_ocr_cache = QtWidgets.QCheckBox("같은 화면 OCR 생략: 같은 영역의 픽셀이 그대로면 이전 OCR 결과를 씁니다.")
+        self.chk_ocr_cache.setToolTip("캡처한 픽셀 전체의 해시로 비교하므로 한 글자라도 바뀌면 다시 인식합니다. "
+                                      "최근 결과 몇십 개만 메모리에 둡니다.")
+        self.chk_worker = QtWidgets.QCheckBox("작업 프로세스: OCR과 번역을 별도 프로세스에서 실행합니다.")
+        self.chk_worker.setToolTip("무거운 캡처 중에도 오버레이가 끊기지 않게 합니다. "
+                                   "작업 프로세스가 멈추거나 죽으면 자동으로 다시 띄우고, 그동안은 이 프로세스에서 처리합니다.")
+        self.spn_ocr_concurrency = QtWidgets.QSpinBox()
+        self.spn_ocr_concurrency.setRange(1, 8)
+        self.spn_ocr_queue = QtWidgets.QSpinBox()
+        self.spn_ocr_queue.setRange(0, 32)
+        self.spn_ocr_queue.setToolTip("실행 중인 OCR 외에 기다릴 수 있는 작업 수. 넘치면 새 요청을 바로 거절합니다.")
         self.lbl_hotkey_hint = QtWidgets.QLabel("형식: (커맨드 키) + (키). 예) ctrl+shift+f1, ctrl+g")
         self.lbl_hotkey_hint.setStyleSheet("color: gray;")
 
         form.addRow("캡처 핫키", self.edt_hotkey)
         form.addRow("재번역 핫키", self.edt_hotkey_rem)
+        form.addRow("저장 영역 핫키", self.edt_hotkey_regions)
+        form.addRow("캐시 무시 재번역 핫키", self.edt_hotkey_retranslate)
         form.addRow("", self.chk_overlay_0)
+        form.addRow("", self.chk_speculative)
+        form.addRow("", self.chk_text_norm)
+        form.addRow("", self.chk_text_detect)
+        form.addRow("", self.chk_line_diff)
+        form.addRow("", self.chk_ocr_cache)
+        form.addRow("", self.chk_worker)
+        form.addRow("OCR 동시 실행 수", self.spn_ocr_concurrency)
+        form.addRow("OCR 대기열 상한", self.spn_ocr_queue)
         form.addRow(self.lbl_hotkey_hint)
 
     # --- 프롬프트 ---
@@ -167,7 +223,64 @@ class SettingsDialog(QtWidgets.QDialog):
         self.edt_key.setPlaceholderText("Your Gemini API Key")
 
         form.addRow("모델", self.edt_model)
+        self.spn_rpm = QtWidgets.QSpinBox()
+        self.spn_rpm.setRange(0, 100000)
+        self.spn_rpm.setSpecialValueText("제한 없음")
+        self.spn_tpm = QtWidgets.QSpinBox()
+        self.spn_tpm.setRange(0, 100000000)
+        self.spn_tpm.setSingleStep(10000)
+        self.spn_tpm.setSpecialValueText("제한 없음")
+        self.spn_rpm.setToolTip("요금제의 분당 요청 한도. 한도에 닿으면 보내기 전에 기다립니다. (캡처 요청 우선)")
+
         form.addRow("API 키", self.edt_key)
+        form.addRow("분당 요청 수 (RPM)", self.spn_rpm)
+        form.addRow("분당 토큰 수 (TPM)", self.spn_tpm)
+
+        self.spn_deadline = QtWidgets.QDoubleSpinBox()
+        self.spn_deadline.setRange(0.0, 60.0)
+        self.spn_deadline.setSingleStep(0.5)
+        self.spn_deadline.setDecimals(1)
+        self.spn_deadline.setSuffix(" 초")
+        self.spn_deadline.setSpecialValueText("제한 없음")
+        self.spn_deadline.setToolTip("영역을 선택한 뒤 번역이 처음 보일 때까지의 목표 시간. "
+                                     "캡처/OCR/번역 단계가 남은 시간을 나눠 쓰고, 넘기면 재시도하지 않습니다. "
+                                     "이미 보낸 번역 요청은 끝까지 기다립니다.")
+        form.addRow("응답 목표 시간", self.spn_deadline)
+
+        # 긴 글 나눠 번역
+        self.spn_chunk_chars = QtWidgets.QSpinBox()
+        self.spn_chunk_chars.setRange(0, 20000)
+        self.spn_chunk_chars.setSingleStep(100)
+        self.spn_chunk_chars.setSpecialValueText("나누지 않음")
+        self.spn_chunk_chars.setSuffix(" 자")
+        self.spn_chunk_chars.setToolTip("이보다 긴 글은 문단/문장 단위로 나눠 동시에 번역하고, 앞부분부터 바로 표시합니다.")
+        self.spn_chunk_workers = QtWidgets.QSpinBox()
+        self.spn_chunk_workers.setRange(1, 8)
+        form.addRow("긴 글 나누기 기준", self.spn_chunk_chars)
+        form.addRow("동시 번역 수", self.spn_chunk_workers)
+
+        self.chk_cache = QtWidgets.QCheckBox("번역 캐시: 같은 문장을 다시 캡처하면 저장된 번역을 사용합니다.")
+        self.chk_cache.setToolTip("검사(한글 비율, 길이, 거절/원문 반환)를 통과한 번역만 저장합니다. "
+                                  "캐시 무시 재번역(F5)으로 언제든 새로 번역할 수 있습니다.")
+        form.addRow("", self.chk_cache)
+
+        self.chk_context_cache = QtWidgets.QCheckBox("컨텍스트 캐시: 프롬프트를 서버에 한 번 등록하고 요청마다 다시 보내지 않습니다.")
+        self.chk_context_cache.setToolTip("캐시된 입력 토큰은 더 싼 단가로 계산됩니다. 프롬프트가 모델의 최소 토큰 수"
+                                          "(예: 2.5 Flash 1024)보다 짧으면 등록되지 않고 지금처럼 보냅니다. "
+                                          "등록된 동안 저장 비용이 따로 듭니다.")
+        form.addRow("", self.chk_context_cache)
+
+        # 로컬 서버
+        self.chk_server = QtWidgets.QCheckBox("로컬 서버 사용 (127.0.0.1)")
+        self.chk_server.setToolTip("다른 프로그램이 HTTP로 OCR/번역 결과를 요청할 수 있습니다.")
+        self.spn_server_port = QtWidgets.QSpinBox()
+        self.spn_server_port.setRange(1024, 65535)
+        self.spn_server_concurrency = QtWidgets.QSpinBox()
+        self.spn_server_concurrency.setRange(1, 8)
+
+        form.addRow("", self.chk_server)
+        form.addRow("서버 포트", self.spn_server_port)
+        form.addRow("동시 처리 수", self.spn_server_concurrency)
 
     # --- 폰트 ---
     def _build_tab_display(self):
@@ -186,6 +299,14 @@ class SettingsDialog(QtWidgets.QDialog):
         self.chk_overlay = QtWidgets.QCheckBox("오버레이 레이아웃 사용")
         self.chk_overlay.setToolTip("해제하면 캡처 후 메인창에만 번역 결과를 표시합니다.")
         form.addRow("", self.chk_overlay)
+        self.chk_history = QtWidgets.QCheckBox("번역 기록 저장")
+        self.chk_history.setToolTip("캡처한 원문과 번역을 저장합니다. 메뉴의 '기록'(Ctrl+H)에서 검색할 수 있습니다.")
+        form.addRow("", self.chk_history)
+        self.chk_record_trace = QtWidgets.QCheckBox("캡처 세션 기록 (재현 벤치마크용)")
+        self.chk_record_trace.setToolTip(
+            "캡처한 이미지, OCR 결과, 소요 시간을 AppData의 traces 폴더에 저장합니다.\n"
+            "tools/replay_trace.py 로 같은 캡처를 다시 돌려 성능을 비교할 수 있습니다. 화면 이미지가 저장되니 주의하세요.")
+        form.addRow("", self.chk_record_trace)
         
         fonts_dir = os.path.abspath(ASSET_FONTS_DIR)
         file_url = QtCore.QUrl.fromLocalFile(fonts_dir).toString()
@@ -244,15 +365,37 @@ class SettingsDialog(QtWidgets.QDialog):
         # 핫키
         self.edt_hotkey.setText(self.mgr.hotkey_combo)
         self.edt_hotkey_rem.setText(self.mgr.hotkey_rem_combo)
+        self.edt_hotkey_regions.setText(self.mgr.hotkey_regions_combo)
+        self.edt_hotkey_retranslate.setText(self.mgr.hotkey_retranslate_combo)
         self.chk_overlay_0.setChecked(self.mgr.use_scroll_detect)
+        self.chk_speculative.setChecked(self.mgr.use_speculative_ocr)
+        self.chk_text_norm.setChecked(self.mgr.use_text_norm)
+        self.chk_text_detect.setChecked(self.mgr.use_text_detect)
+        self.chk_line_diff.setChecked(self.mgr.use_line_diff)
+        self.chk_ocr_cache.setChecked(self.mgr.use_ocr_cache)
+        self.chk_worker.setChecked(self.mgr.use_worker_process)
+        self.spn_ocr_concurrency.setValue(self.mgr.ocr_concurrency)
+        self.spn_ocr_queue.setValue(self.mgr.ocr_queue_limit)
         # Commands
         self.txt_commands.setPlainText(self.mgr.system_prompt)
         # API
         self.edt_model.setText(self.mgr.gemini_model)
         self.edt_key.setText(self.mgr.gemini_api_key)
+        self.spn_rpm.setValue(self.mgr.gemini_rpm)
+        self.spn_tpm.setValue(self.mgr.gemini_tpm)
+        self.spn_deadline.setValue(self.mgr.deadline_seconds)
+        self.spn_chunk_chars.setValue(self.mgr.chunk_chars)
+        self.spn_chunk_workers.setValue(self.mgr.chunk_workers)
+        self.chk_cache.setChecked(self.mgr.use_translation_cache)
+        self.chk_context_cache.setChecked(self.mgr.use_context_cache)
+        self.chk_server.setChecked(self.mgr.use_local_server)
+        self.spn_server_port.setValue(self.mgr.local_server_port)
+        self.spn_server_concurrency.setValue(self.mgr.local_server_concurrency)
         # 폰트
         idx = self.cmb_font.findText(self.mgr.font_family, Qt.MatchFixedString)
         self.chk_overlay.setChecked(self.mgr.use_overlay_layout)
+        self.chk_history.setChecked(self.mgr.use_history)
+        self.chk_record_trace.setChecked(self.mgr.record_trace)
         if idx >= 0:
             self.cmb_font.setCurrentIndex(idx)
         else:
@@ -279,37 +422,188 @@ class SettingsDialog(QtWidgets.QDialog):
         # UI에 기본값 주입
         self.edt_hotkey.setText(defaults.hotkey_combo)
         self.edt_hotkey_rem.setText(defaults.hotkey_rem_combo)
+        self.edt_hotkey_regions.setText(defaults.hotkey_regions_combo)
+        self.edt_hotkey_retranslate.setText(defaults.hotkey_retranslate_combo)
         self.chk_overlay_0.setChecked(defaults.use_scroll_detect)
+        self.chk_speculative.setChecked(defaults.use_speculative_ocr)
+        self.chk_text_norm.setChecked(defaults.use_text_norm)
+        self.chk_text_detect.setChecked(defaults.use_text_detect)
+        self.chk_line_diff.setChecked(defaults.use_line_diff)
+        self.chk_ocr_cache.setChecked(defaults.use_ocr_cache)
+        self.chk_worker.setChecked(defaults.use_worker_process)
+        self.spn_ocr_concurrency.setValue(defaults.ocr_concurrency)
+        self.spn_ocr_queue.setValue(defaults.ocr_queue_limit)
         self.txt_commands.setPlainText(defaults.system_prompt)
         self.edt_model.setText(defaults.gemini_model)
         self.edt_key.setText(defaults.gemini_api_key)
+        self.spn_rpm.setValue(defaults.gemini_rpm)
+        self.spn_tpm.setValue(defaults.gemini_tpm)
+        self.spn_deadline.setValue(defaults.deadline_seconds)
+        self.spn_chunk_chars.setValue(defaults.chunk_chars)
+        self.spn_chunk_workers.setValue(defaults.chunk_workers)
+        self.chk_cache.setChecked(defaults.use_translation_cache)
+        self.chk_context_cache.setChecked(defaults.use_context_cache)
         self.chk_overlay.setChecked(defaults.use_overlay_layout)
+        self.chk_history.setChecked(defaults.use_history)
+        self.chk_record_trace.setChecked(defaults.record_trace)
+        self.chk_server.setChecked(defaults.use_local_server)
+        self.spn_server_port.setValue(defaults.local_server_port)
+        self.spn_server_concurrency.setValue(defaults.local_server_concurrency)
 
     def _apply_to_manager(self):
         self.mgr.set_hotkey_combo(self.edt_hotkey.text().strip())
         self.mgr.set_hotkey_rem_combo(self.edt_hotkey_rem.text().strip())
+        self.mgr.set_hotkey_regions_combo(self.edt_hotkey_regions.text().strip())
+        self.mgr.set_hotkey_retranslate_combo(self.edt_hotkey_retranslate.text().strip())
         self.mgr.set_use_scroll_detect(self.chk_overlay_0.isChecked())
+        self.mgr.set_use_speculative_ocr(self.chk_speculative.isChecked())
+        self.mgr.set_use_text_norm(self.chk_text_norm.isChecked())
+        self.mgr.set_use_text_detect(self.chk_text_detect.isChecked())
+        self.mgr.set_use_line_diff(self.chk_line_diff.isChecked())
+        self.mgr.set_use_ocr_cache(self.chk_ocr_cache.isChecked())
+        self.mgr.set_use_worker_process(self.chk_worker.isChecked())
+        self.mgr.set_ocr_limits(self.spn_ocr_concurrency.value(), self.spn_ocr_queue.value())
         self.mgr.set_system_prompt(self.txt_commands.toPlainText())
         self.mgr.set_gemini(self.edt_model.text().strip(), self.edt_key.text())
+        self.mgr.set_gemini_limits(self.spn_rpm.value(), self.spn_tpm.value())
+        self.mgr.set_deadline_seconds(self.spn_deadline.value())
+        self.mgr.set_chunking(self.spn_chunk_chars.value(), self.spn_chunk_workers.value())
+        self.mgr.set_use_translation_cache(self.chk_cache.isChecked())
+        self.mgr.set_use_context_cache(self.chk_context_cache.isChecked())
         self.mgr.set_font(self.cmb_font.currentText(), self.spn_font_size.value())
         self.mgr.set_use_overlay_layout(self.chk_overlay.isChecked())
+        self.mgr.set_use_history(self.chk_history.isChecked())
+        self.mgr.set_record_trace(self.chk_record_trace.isChecked())
+        self.mgr.set_local_server(self.chk_server.isChecked(), self.spn_server_port.value(),
+                                  self.spn_server_concurrency.value())
         self.mgr.save()
 
+# ---- 번역 기록 ----
+class HistoryDialog(QtWidgets.QDialog):
+    """
+    번역 기록(history.HistoryStore) 검색 창. 입력이 SEARCH_DELAY_MS 동안 멈추면 검색하고,
+    결과는 최신순 LIMIT 개까지만 목록에 올린다. 검색어가 없으면 메모리에 있는 최근 기록.
+    """
+    SEARCH_DELAY_MS = 120
+    LIMIT = 200
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._results = []
+        self.setWindowTitle("번역 기록")
+        self.resize(720, 520)
+
+        self.edt_query = QtWidgets.QLineEdit()
+        self.edt_query.setPlaceholderText("원문 또는 번역 검색 (띄어 쓴 단어를 모두 포함)")
+        self.edt_query.setClearButtonEnabled(True)
+        self.lbl_stat = QtWidgets.QLabel()
+        self.lbl_stat.setStyleSheet("color:#888;")
+
+        self.lst = QtWidgets.QListWidget()
+        self.lst.setUniformItemSizes(True)
+        self.txt = QtWidgets.QPlainTextEdit(); self.txt.setReadOnly(True)
+        split = QtWidgets.QSplitter(Qt.Vertical)
+        split.addWidget(self.lst)
+        split.addWidget(self.txt)
+        split.setSizes([260, 240])
+
+        btn_copy = QtWidgets.QPushButton("번역 복사")
+        btn_copy.clicked.connect(self._copy)
+        btn_clear = QtWidgets.QPushButton("기록 지우기")
+        btn_clear.clicked.connect(self._clear)
+        btns = QtWidgets.QHBoxLayout()
+        btns.addWidget(self.lbl_stat)
+        btns.addStretch(1)
+        btns.addWidget(btn_copy)
+        btns.addWidget(btn_clear)
+
+        v = QtWidgets.QVBoxLayout(self)
+        v.addWidget(self.edt_query)
+        v.addWidget(split, 1)
+        v.addLayout(btns)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.SEARCH_DELAY_MS)
+        self._timer.timeout.connect(self.refresh)
+        self.edt_query.textChanged.connect(lambda _: self._timer.start())
+        self.lst.currentRowChanged.connect(self._show_entry)
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        self.refresh()
+        self.edt_query.setFocus()
+
+    def refresh(self):
+        query = self.edt_query.text()
+        t0 = time.perf_counter()
+        try:
+            self._results = self.store.search(query, self.LIMIT)
+        except sqlite3.Error as e:
+            self._results = []
+            self.lbl_stat.setText(f"검색 실패: {e}")
+        else:
+            ms = (time.perf_counter() - t0) * 1000
+            n = len(self._results)
+            if query.strip():
+                self.lbl_stat.setText(f"{n}건{' 이상' if n >= self.LIMIT else ''} ({ms:.1f} ms)")
+            else:
+                self.lbl_stat.setText(f"최근 {n}건 / 전체 {self.store.count()}건")
+        self.lst.clear()
+        self.lst.addItems([f"{time.strftime('%m-%d %H:%M', time.localtime(e.ts))}  {e.title}"
+                           for e in self._results])
+        if self._results:
+            self.lst.setCurrentRow(0)
+        else:
+            self.txt.clear()
+
+    def _show_entry(self, row: int):
+        if not 0 <= row < len(self._results):
+            self.txt.clear()
+            return
+        e = self._results[row]
+        note = ", ".join(x for x in (e.lang, e.region) if x)
+        self.txt.setPlainText(f"{e.translation}\n\n\n### 캡처한 원문{f' ({note})' if note else ''}:\n{e.source}")
+
+    def _copy(self):
+        row = self.lst.currentRow()
+        if 0 <= row < len(self._results):
+            QtWidgets.QApplication.clipboard().setText(self._results[row].translation)
+
+    def _clear(self):
+        reply = QtWidgets.QMessageBox.question(
+            self, "기록 지우기", "저장된 번역 기록을 모두 지울까요?",
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No, QtWidgets.QMessageBox.No
+        )
+        if reply == QtWidgets.QMessageBox.Yes:
+            self.store.clear()
+            self.refresh()
+
 # ---- 메인 윈도우 ----
 class MainWindow(QtWidgets.QMainWindow):
     rectSelected = QtCore.pyqtSignal(QtCore.QRect)
+    captureStarted = QtCore.pyqtSignal(object)   # freeze-frame (capture.Frame)
+    captureCancelled = QtCore.pyqtSignal()       # 캡처 보드에서 선택 없이 취소
+    regionsRequested = QtCore.pyqtSignal()
+    retranslateRequested = QtCore.pyqtSignal(QtCore.QRect)   # 직전 영역을 번역 캐시 없이 다시 번역
     settingsUpdated = QtCore.pyqtSignal()
+    USAGE_REFRESH_MS = 2000
 
-    def __init__(self, settings: SettingsManager):
+    def __init__(self, settings: SettingsManager, history=None):
         super().__init__()
         self.mgr = settings
+        self.history = history   # history.HistoryStore (없으면 기록 메뉴 비활성)
+        self.history_dialog: Optional[HistoryDialog] = None
         self.setWindowTitle("OCR-translator")
         self.resize(820, 540)
 
         self.selected_screen_idx: int = 0
         self.sel_overlay: Optional[SelectionOverlay] = None
         self.current_overlay = None
+        self.region_overlays = []
         self.last_selection_rect = None
+        self.frozen_frame: Optional[Frame] = None
 
         # 중앙 UI
         central = QtWidgets.QWidget(); v = QtWidgets.QVBoxLayout(central)
@@ -319,8 +613,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self.btn_capture.clicked.connect(self.start_capture)
 
         self.lang = QtWidgets.QComboBox()
-        self.lang.addItems(["en-US", "ja-JP", "zh-CN"])
+        self.lang.addItems(["en-US", "ja-JP", "zh-CN", "auto"])
         self.lang.setCurrentIndex(0)
+        self.lang.setToolTip("auto: 설치된 언어 엔진을 동시에 실행해 가장 그럴듯한 결과를 선택합니다.")
 
         row.addWidget(self.btn_capture)
         row.addSpacing(12)
@@ -335,6 +630,14 @@ class MainWindow(QtWidgets.QMainWindow):
         self.setCentralWidget(central)
         self.statusBar().showMessage("준비")
 
+        # 토큰 사용량/비용 추정 (로컬 서버 요청도 포함되므로 주기적으로 갱신)
+        self.lbl_usage = QtWidgets.QLabel("")
+        self.statusBar().addPermanentWidget(self.lbl_usage)
+        self._usage_version = -1
+        self._usage_timer = QtCore.QTimer(self)
+        self._usage_timer.timeout.connect(self.refresh_usage)
+        self._usage_timer.start(self.USAGE_REFRESH_MS)
+
         # 메뉴바
         self._build_menubar()
 
@@ -342,12 +645,35 @@ class MainWindow(QtWidgets.QMainWindow):
     def _build_menubar(self):
         menubar = self.menuBar(); menubar.clear()
         
+        act_retranslate = menubar.addAction("재번역(캐시 무시)")
+        act_retranslate.setShortcut(QtGui.QKeySequence("F5"))
+        act_retranslate.setToolTip("직전 캡처 영역을 번역 캐시를 사용하지 않고 다시 번역합니다.")
+        act_retranslate.triggered.connect(self.retranslate_last_rect)
+
         act_settings = menubar.addAction("환경설정")
         act_settings.triggered.connect(self._open_settings)
 
+        act_history = menubar.addAction("기록")
+        act_history.setShortcut(QtGui.QKeySequence("Ctrl+H"))
+        act_history.setEnabled(self.history is not None)
+        act_history.triggered.connect(self._open_history)
+
+        menu_debug = menubar.addMenu("디버그")
+        act_mem = menu_debug.addAction("메모리 상위 할당 위치 덤프")
+        act_mem.triggered.connect(self._dump_memory)
+        act_ocr = menu_debug.addAction("OCR 실행 통계")
+        act_ocr.triggered.connect(self._show_ocr_stats)
+        act_metrics = menu_debug.addAction("요청 지표 (대기 시간 등)")
+        act_metrics.triggered.connect(self._show_metrics)
+        act_export = menu_debug.addAction("지표/토큰 사용량 내보내기")
+        act_export.triggered.connect(self._export_metrics)
+
         self.menu_monitor = menubar.addMenu("모니터")
         self._refresh_monitor_menu()
 
+        self.menu_regions = menubar.addMenu("영역")
+        self._refresh_regions_menu()
+
     def _refresh_monitor_menu(self):
         self.menu_monitor.clear()
         screens = QtWidgets.QApplication.screens()
@@ -364,18 +690,137 @@ class MainWindow(QtWidgets.QMainWindow):
         act_refresh.triggered.connect(self._refresh_monitor_menu)
         self.menu_monitor.addAction(act_refresh)
 
+    def _refresh_regions_menu(self):
+        self.menu_regions.clear()
+        act_capture = QtWidgets.QAction("저장된 영역 모두 캡처", self)
+        act_capture.triggered.connect(self.run_saved_regions)
+        self.menu_regions.addAction(act_capture)
+        act_save = QtWidgets.QAction("직전 캡처 영역 저장...", self)
+        act_save.triggered.connect(self._save_last_region)
+        self.menu_regions.addAction(act_save)
+
+        self.menu_regions.addSeparator()
+        regions = self.mgr.saved_regions_for(self.selected_screen_idx)
+        if not regions:
+            act_none = QtWidgets.QAction("(저장된 영역 없음)", self)
+            act_none.setEnabled(False)
+            self.menu_regions.addAction(act_none)
+        for r in regions:
+            x, y, rw, rh = r["rect"]
+            sub = self.menu_regions.addMenu(f"{r['name']} — {rw}x{rh} @ ({x},{y})")
+            act_del = QtWidgets.QAction("삭제", self)
+            act_del.triggered.connect(lambda checked, n=r["name"]: self._remove_region(n))
+            sub.addAction(act_del)
+
+    def _save_last_region(self):
+        r = self.last_selection_rect
+        geo = self.current_screen_geo()
+        if not r or r.isNull() or not geo.contains(r):
+            self.show_text("현재 모니터에서 캡처한 영역이 없습니다. 먼저 영역을 캡처해 주세요.")
+            return
+        name, ok = QtWidgets.QInputDialog.getText(self, "영역 저장", "영역 이름:")
+        if not ok:
+            return
+        try:
+            self.mgr.add_saved_region(self.selected_screen_idx, name,
+                                      (r.x() - geo.x(), r.y() - geo.y(), r.width(), r.height()))
+        except ValueError as e:
+            QtWidgets.QMessageBox.warning(self, "오류", str(e))
+            return
+        self.mgr.save()
+        self._refresh_regions_menu()
+        self.statusBar().showMessage(f"영역 저장: {name.strip()}", 2500)
+
+    def _remove_region(self, name: str):
+        self.mgr.remove_saved_region(self.selected_screen_idx, name)
+        self.mgr.save()
+        self._refresh_regions_menu()
+
+    def saved_region_rects(self) -> list[tuple[str, QtCore.QRect, Optional[str]]]:
+        """현재 모니터에 저장된 영역을 (이름, 글로벌 좌표, 기억된 OCR 언어) 목록으로 반환."""
+        geo = self.current_screen_geo()
+        out = []
+        for r in self.mgr.saved_regions_for(self.selected_screen_idx):
+            x, y, rw, rh = r["rect"]
+            out.append((r["name"], QtCore.QRect(geo.x() + x, geo.y() + y, rw, rh), r.get("lang")))
+        return out
+
     def _select_monitor(self, idx: int):
         self.selected_screen_idx = idx
         self._refresh_monitor_menu()
+        self._refresh_regions_menu()
         geo = self.current_screen_geo()
         self.statusBar().showMessage(
             f"모니터 {idx+1} 선택: {geo.width()}x{geo.height()} @ ({geo.x()},{geo.y()})", 2500
         )
 
+    def _dump_memory(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+            self.show_text("메모리 추적을 시작했습니다. 잠시 사용한 뒤 다시 누르면 상위 할당 위치를 표시합니다.")
+            return
+        from diagnostics import dump_top_allocators
+        path = os.path.join(appdata_dir(), f"memdump-{time.strftime('%Y%m%d-%H%M%S')}.txt")
+        self.show_text(dump_top_allocators(limit=25, path=path) + f"\n\n저장됨: {path}")
+
+    def _show_ocr_stats(self):
+        from ocr_win import ocr_executor
+        ex = ocr_executor()
+        lines = [f"동시 실행 {ex.max_concurrency}, 대기열 상한 {ex.max_queue}", ""]
+        lines += [f"{k}: {v}" for k, v in ex.stats().items()]
+        self.show_text("\n".join(lines))
+
+    def _show_metrics(self):
+        from metrics import metrics
+        from scheduler import scheduler
+        from translation_cache import cache_summary
+        from worker_proc import active_worker
+        waiting = ", ".join(f"{k} {v}" for k, v in scheduler.stats().items())
+        text = f"LLM 대기 중: {waiting}\n{cache_summary()}\n\n{usage.report()}\n\n{metrics.report()}"
+        worker = active_worker()
+        if worker is not None:
+            text += f"\n\n{worker.report()}"
+        self.show_text(text)
+
+    def _export_metrics(self):
+        """토큰 사용량과 지연 지표를 JSON 하나로 AppData 에 저장."""
+        from metrics import metrics
+        path = os.path.join(appdata_dir(), f"metrics-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        data = {"usage": usage.snapshot(), "metrics": metrics.snapshot()}
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+        except OSError as e:
+            QtWidgets.QMessageBox.warning(self, "오류", str(e))
+            return
+        self.show_text(f"{usage.report()}\n\n저장됨: {path}")
+
+    def refresh_usage(self):
+        """상태 표시줄의 토큰/비용 표시 갱신 (바뀐 경우만)."""
+        if usage.version == self._usage_version:
+            return
+        self._usage_version = usage.version
+        self.lbl_usage.setText(usage.status_text())
+        self.lbl_usage.setToolTip(usage.report())
+
+    def _open_history(self):
+        if self.history_dialog is None:
+            self.history_dialog = HistoryDialog(self.history, self)
+        self.history_dialog.show()
+        self.history_dialog.raise_()
+        self.history_dialog.activateWindow()
+
+    def on_history_added(self):
+        """새 기록이 추가됨 — 기록 창이 열려 있고 검색어가 없으면 목록 갱신."""
+        dlg = self.history_dialog
+        if dlg is not None and dlg.isVisible() and not dlg.edt_query.text().strip():
+            dlg.refresh()
+
     def _open_settings(self):
         dlg = SettingsDialog(self.mgr, self)
         dlg.settingsSaved.connect(lambda: self.settingsUpdated.emit())
         dlg.exec_()
+        dlg.deleteLater()
 
     def current_screen_geo(self) -> QtCore.QRect:
         screens = QtWidgets.QApplication.screens()
@@ -389,9 +834,14 @@ class MainWindow(QtWidgets.QMainWindow):
         self.close_overlays(True)
 
         monitor_geo = self.current_screen_geo()
-        self.sel_overlay = SelectionOverlay(monitor_geo) # 캡처 보드 호출
+        # 캡처 보드를 띄우기 전에 모니터 화면을 한 번 캡처해 둔다 (선택 영역은 여기서 잘라냄)
+        try:
+            self.frozen_frame = grab_frame(monitor_geo)
+        except Exception:
+            self.frozen_frame = None
+        self.sel_overlay = SelectionOverlay(monitor_geo, self.frozen_frame) # 캡처 보드 호출
         self.sel_overlay.selected.connect(self._relay_rect_selected) # 영역 선택시 호출
-        self.sel_overlay.cancelled.connect(lambda: self.statusBar().showMessage("취소됨", 2000))
+        self.sel_overlay.cancelled.connect(self._on_capture_cancelled)
 
         self.sel_overlay.showFullScreen()
         self.sel_overlay.raise_()
@@ -399,38 +849,100 @@ class MainWindow(QtWidgets.QMainWindow):
         self.statusBar().showMessage(
             f"모니터 {self.selected_screen_idx+1}: 드래그하여 영역 선택 (ESC 취소)"
         )
+        if self.frozen_frame is not None:
+            self.captureStarted.emit(self.frozen_frame)
     
     @QtCore.pyqtSlot()
     def run_last_rect(self):
+        self._rerun_last_rect(self.rectSelected, keep_overlay=self.mgr.use_line_diff)
+
+    @QtCore.pyqtSlot()
+    def retranslate_last_rect(self):
+        self._rerun_last_rect(self.retranslateRequested)
+
+    def _rerun_last_rect(self, signal, keep_overlay: bool = False):
+        """keep_overlay: 떠 있는 번역 오버레이를 닫지 않고 (캡처에 찍히면 잠시 숨겨) 두었다가 바뀐 줄만 고친다."""
         r = self.last_selection_rect
         if not r or r.isNull() or r.width() <= 0 or r.height() <= 0:
             self.show_text("이전에 캡처한 영역이 존재하지 않습니다.")
             return
+        self.frozen_frame = None  # 재캡처는 항상 현재 화면을 사용
+        if self._overlays_excluded_from_capture():
+            self.close_overlays(keep_current=keep_overlay)
+            signal.emit(r)
+            return
+        self.close_overlays(keep_current=keep_overlay)
+
+        QtWidgets.QApplication.processEvents(QtCore.QEventLoop.ExcludeUserInputEvents)
+        QtCore.QTimer.singleShot(20, lambda: signal.emit(r))
+
+    @QtCore.pyqtSlot()
+    def run_saved_regions(self):
+        if not self.mgr.saved_regions_for(self.selected_screen_idx):
+            self.show_text(f"모니터 {self.selected_screen_idx+1}에 저장된 영역이 없습니다. 메뉴 바의 영역 탭에서 저장해 주세요.")
+            return
+        if self._overlays_excluded_from_capture():
+            self.close_overlays()
+            self.regionsRequested.emit()
+            return
         self.close_overlays()
 
         QtWidgets.QApplication.processEvents(QtCore.QEventLoop.ExcludeUserInputEvents)
-        QtCore.QTimer.singleShot(20, lambda: self.rectSelected.emit(r))
+        QtCore.QTimer.singleShot(20, self.regionsRequested.emit)
 
     def _relay_rect_selected(self, rect_global: QtCore.QRect):
         self.close_overlays()
+        if self.frozen_frame is not None:
+            # freeze-frame 에서 잘라내므로 오버레이가 사라질 때까지 기다릴 필요가 없다
+            self.rectSelected.emit(rect_global)
+            return
 
         QtWidgets.QApplication.processEvents(QtCore.QEventLoop.ExcludeUserInputEvents)
         QtCore.QTimer.singleShot(30, lambda: self.rectSelected.emit(rect_global))
+
+    def _on_capture_cancelled(self):
+        self.frozen_frame = None
+        self.captureCancelled.emit()
+        self.statusBar().showMessage("취소됨", 2000)
+
+    def take_frozen_crop(self, rect_global: QtCore.QRect) -> Optional[Frame]:
+        """freeze-frame 에서 rect_global 을 잘라 반환하고 frame 은 버린다. 없으면 None."""
+        frame, self.frozen_frame = self.frozen_frame, None
+        if frame is None:
+            return None
+        try:
+            return frame.crop(rect_global)
+        except ValueError:
+            return None
+
+    def _overlays_excluded_from_capture(self) -> bool:
+        overlays = [ov for ov in [self.current_overlay, *self.region_overlays] if ov is not None]
+        return all(getattr(ov, "excluded_from_capture", False) for ov in overlays)
     
-    def close_overlays(self, hard = False):
+    def close_overlays(self, hard = False, keep_current = False):
+        """keep_current: 번역 오버레이는 닫지 않고 hold() 한다 (controller 가 같은 영역이면 다시 쓰고 release())."""
         if self.sel_overlay:
             try: 
                 self.sel_overlay.hide()
                 if hard: 
                     self.sel_overlay.close()
                     self.sel_overlay = None
+            except RuntimeError:
+                self.sel_overlay = None  # 이미 닫히며 삭제됨(WA_DeleteOnClose)
             except Exception: pass
             print("close capture overlay")
-        if getattr(self, "current_overlay", None):
+        if getattr(self, "current_overlay", None) and keep_current:
+            try: self.current_overlay.hold()
+            except RuntimeError: self.current_overlay = None  # 이미 닫히며 삭제됨(WA_DeleteOnClose)
+        elif getattr(self, "current_overlay", None):
             try: self.current_overlay.close()
             except Exception: pass
             print("close overlay")
             self.current_overlay = None
+        for ov in self.region_overlays:
+            try: ov.close()
+            except Exception: pass
+        self.region_overlays = []
 
     def get_lang_tag(self) -> str:
         return self.lang.currentText()
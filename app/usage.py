@@ -0,0 +1,180 @@
+"""
+LLM 토큰 사용량과 비용 추정 (Gemini 응답의 usage_metadata).
+
+    from usage import usage
+    usage.record(model, "capture", prompt=1200, cached=0, output=80, retries=1, system=450)
+
+- 호출마다 입력(prompt, 그중 컨텍스트 캐시 적중 cached), 출력(output, thinking 포함), 재시도 수를 모아
+  이 실행(세션) 전체 / 모델별 / 영역별로 합산한다.
+  영역은 요청 key 의 '#' 앞부분: capture = 드래그·직전 영역, regions = 저장된 영역, 그 밖은 로컬 서버 key, 없으면 "-".
+- system: 시스템 프롬프트의 추정 토큰 수 (입력 중 시스템 프롬프트가 차지하는 비중을 보기 위함, 실제 과금과 무관).
+- 비용은 PRICES 의 공개 단가(USD / 100만 토큰)로 추정한다. 단가를 모르는 모델은 비용 0 으로 두고 unpriced 로 센다.
+- 작업 프로세스에서는 forward 를 켜 두고, 번역 응답과 함께 drain() 한 기록을 GUI 프로세스로 보내 merge() 한다.
+- 종료할 때 save_session() 이 세션 합계를 AppData/usage.jsonl 에 한 줄 추가한다.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from settings import appdata_dir
+
+USAGE_LOG = os.path.join(appdata_dir(), "usage.jsonl")
+
+# (모델 이름 앞부분, 입력, 캐시된 입력, 출력) USD / 100만 토큰. 긴 이름부터 비교한다.
+PRICES = (
+    ("gemini-2.5-flash-lite", 0.10, 0.025, 0.40),
+    ("gemini-2.5-flash", 0.30, 0.075, 2.50),
+    ("gemini-2.5-pro", 1.25, 0.31, 10.00),
+    ("gemini-2.0-flash-lite", 0.075, 0.075, 0.30),
+    ("gemini-2.0-flash", 0.10, 0.025, 0.40),
+    ("gemini-1.5-flash", 0.075, 0.01875, 0.30),
+    ("gemini-1.5-pro", 1.25, 0.3125, 5.00),
+)
+_PRICES = sorted(PRICES, key=lambda p: -len(p[0]))
+
+
+def price_for(model: str) -> Optional[tuple[float, float, float]]:
+    """(입력, 캐시된 입력, 출력) 단가. 모르는 모델이면 None."""
+    name = (model or "").strip().removeprefix("models/")
+    for prefix, p_in, p_cached, p_out in _PRICES:
+        if name.startswith(prefix):
+            return p_in, p_cached, p_out
+    return None
+
+
+def region_of(key: Optional[str]) -> str:
+    return key.split("#", 1)[0] if key else "-"
+
+
+@dataclass
+class UsageTotals:
+    calls: int = 0
+    failed: int = 0
+    retries: int = 0
+    prompt: int = 0      # 입력 토큰 (cached 포함)
+    cached: int = 0
+    output: int = 0      # 출력 토큰 (thinking 포함)
+    system: int = 0      # 시스템 프롬프트 추정 토큰
+    cost: float = 0.0    # USD 추정
+    saved: float = 0.0   # 캐시된 입력 단가로 아낀 비용 (USD 추정)
+    unpriced: int = 0    # 단가를 몰라 비용에 넣지 못한 호출 수
+
+    def add(self, other: "UsageTotals"):
+        for name in self.__dataclass_fields__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+
+def _totals(model: str, prompt: int, cached: int, output: int, retries: int, system: int,
+            failed: bool) -> UsageTotals:
+    t = UsageTotals(calls=1, failed=int(failed), retries=retries, prompt=prompt, cached=cached,
+                    output=output, system=system)
+    price = price_for(model)
+    if price is None:
+        t.unpriced = 1 if (prompt or output) else 0
+    else:
+        p_in, p_cached, p_out = price
+        t.cost = ((prompt - cached) * p_in + cached * p_cached + output * p_out) / 1e6
+        t.saved = cached * (p_in - p_cached) / 1e6
+    return t
+
+
+def _fmt_tokens(n: int) -> str:
+    return f"{n / 1000:.1f}k" if n >= 1000 else str(n)
+
+
+class UsageMeter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.total = UsageTotals()
+        self.by_model: dict[str, UsageTotals] = {}
+        self.by_region: dict[str, UsageTotals] = {}
+        self.version = 0          # 기록될 때마다 증가 (표시 갱신 여부 확인용)
+        self.forward = False      # 작업 프로세스: 합산하지 않고 drain() 으로 넘길 기록만 쌓는다
+        self._pending: deque[tuple] = deque(maxlen=10_000)
+
+    def record(self, model: str, region: str, *, prompt: int = 0, cached: int = 0, output: int = 0,
+               retries: int = 0, system: int = 0, failed: bool = False):
+        rec = (model, region, int(prompt), int(cached), int(output), int(retries), int(system), bool(failed))
+        if self.forward:
+            with self._lock:
+                self._pending.append(rec)
+            return
+        self.merge([rec])
+
+    def merge(self, records: list[tuple]):
+        """record() 인자 튜플들 (작업 프로세스에서 넘어온 기록)을 합산."""
+        if not records:
+            return
+        with self._lock:
+            for model, region, *rest in records:
+                t = _totals(model, *rest)
+                self.total.add(t)
+                self.by_model.setdefault(model, UsageTotals()).add(t)
+                self.by_region.setdefault(region, UsageTotals()).add(t)
+            self.version += 1
+
+    def drain(self) -> list[tuple]:
+        with self._lock:
+            out = list(self._pending)
+            self._pending.clear()
+        return out
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.total = UsageTotals()
+            self.by_model.clear()
+            self.by_region.clear()
+            self.version += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"started": self.started, "now": time.time(), "total": asdict(self.total),
+                    "by_model": {k: asdict(v) for k, v in self.by_model.items()},
+                    "by_region": {k: asdict(v) for k, v in self.by_region.items()}}
+
+    def status_text(self) -> str:
+        """상태 표시줄용 한 줄."""
+        with self._lock:
+            t = UsageTotals(**asdict(self.total))
+        if not t.calls:
+            return ""
+        cost = f"약 ${t.cost:.4f}" + ("+?" if t.unpriced else "")
+        return f"토큰 입력 {_fmt_tokens(t.prompt)} · 출력 {_fmt_tokens(t.output)} · {cost}"
+
+    def report(self) -> str:
+        snap = self.snapshot()
+        if not snap["total"]["calls"]:
+            return "LLM 사용량: 아직 없음"
+        lines = [f"LLM 사용량 (이번 실행, {(snap['now'] - snap['started']) / 60:.0f}분)"]
+
+        def line(name: str, t: dict) -> str:
+            share = f", 시스템 프롬프트 약 {t['system'] / t['prompt']:.0%}" if t["prompt"] else ""
+            saved = f", 캐시로 -${t['saved']:.4f}" if t.get("saved") else ""
+            return (f"  {name}: 호출 {t['calls']} (실패 {t['failed']}, 재시도 {t['retries']}), "
+                    f"입력 {t['prompt']} (캐시 {t['cached']}{share}), 출력 {t['output']}, "
+                    f"${t['cost']:.4f}{saved}" + (f" (단가 모름 {t['unpriced']}회)" if t["unpriced"] else ""))
+        lines.append(line("합계", snap["total"]))
+        for title, group in (("모델", "by_model"), ("영역", "by_region")):
+            lines.append(f"{title}별")
+            lines += [line(k, v) for k, v in sorted(snap[group].items(), key=lambda kv: -kv[1]["cost"])]
+        return "\n".join(lines)
+
+    def save_session(self, path: str = USAGE_LOG) -> bool:
+        """세션 합계를 path(JSON Lines)에 한 줄 추가. 사용량이 없으면 쓰지 않는다."""
+        snap = self.snapshot()
+        if not snap["total"]["calls"]:
+            return False
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(snap, ensure_ascii=False) + "\n")
+        return True
+
+
+usage = UsageMeter()
@@ -0,0 +1,684 @@
+"""
+OCR/번역 작업 프로세스 (선택 기능, 설정 use_worker_process).
+GUI 프로세스 안에서 OCR·PIL 변환·Gemini 응답 파싱이 GIL 을 오래 잡으면 오버레이 그리기가 끊긴다.
+이 모듈은 같은 작업을 별도 프로세스에 맡긴다.
+- 프레임: multiprocessing.shared_memory 블록에 BGRA 픽셀을 한 번 써서 이름/오프셋만 넘긴다 (픽셀 pickle 없음).
+  블록은 크기별로 재사용한다(_ShmPool).
+- 요청/결과: Pipe 로 작은 튜플만 주고받는다. (id, op, args, kwargs) → (id, ok, 값 또는 예외)
+- 감독: 프로세스가 죽거나(EOF) ping 에 HANG_TIMEOUT 안에 답하지 않으면, 기다리던 요청을
+  WorkerUnavailableError 로 끝내고 다시 띄운다. RESTART_WINDOW 안에 MAX_RESTARTS 번 넘게 죽으면 포기.
+- 준비되지 않았거나 재시작 중에는 WorkerUnavailableError → 호출하는 쪽(pipeline)이 이 프로세스에서 실행한다.
+- LLM 스케줄러는 GUI 프로세스에만 있다: 작업 프로세스의 LLMClient 는 acquire/settle/penalize 를
+  GUI 프로세스로 보내 기다린다 (_RemoteScheduler). RPM/TPM 한도, 429 멈춤, 같은 key 대체가
+  스트리밍·대체 실행(GUI 프로세스)과 하나로 적용된다.
+ocr_win 의 windows_ocr* / submit_ocr_words 와 LLMClient 의 translate / translate_many 를 같은 이름으로 제공한다.
+"""
+from __future__ import annotations
+
+import itertools
+import multiprocessing as mp
+import pickle
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+from typing import Iterator, NamedTuple, Optional
+
+from metrics import metrics
+from scheduler import scheduler as default_scheduler
+from usage import usage
+
+
+class WorkerError(RuntimeError):
+    pass
+
+
+class WorkerUnavailableError(WorkerError):
+    """작업 프로세스가 준비되지 않았거나 요청 처리 중 죽음 (이 프로세스에서 다시 실행하면 됨)."""
+    pass
+
+
+class _FrameRef(NamedTuple):
+    """공유 메모리 블록 안의 BGRA 이미지 한 장."""
+    shm: str
+    offset: int
+    width: int
+    height: int
+
+
+_LLM_FIELDS = ("gemini_api_key", "gemini_model", "system_prompt", "gemini_rpm", "gemini_tpm", "use_context_cache")
+
+
+def llm_settings(settings) -> dict:
+    """작업 프로세스의 LLMClient 에 넘길 설정 값 (SettingsManager 는 넘기지 않음)."""
+    return {name: getattr(settings, name) for name in _LLM_FIELDS}
+
+
+# ======================================================================
+# 작업 프로세스 쪽
+
+class _ShmImage:
+    """ocr_win 이 받는 이미지 인터페이스(size, to_bgra_bytes)를 공유 메모리 위에서 제공."""
+    __slots__ = ("_shm", "_offset", "size")
+
+    def __init__(self, shm: shared_memory.SharedMemory, ref: _FrameRef):
+        self._shm = shm
+        self._offset = ref.offset
+        self.size = (ref.width, ref.height)
+
+    def to_bgra_bytes(self) -> bytes:
+        n = self.size[0] * self.size[1] * 4
+        with self._shm.buf[self._offset:self._offset + n] as view:
+            return bytes(view)
+
+
+class _RemoteScheduler:
+    """작업 프로세스의 LLMClient 가 쓰는 스케줄러. 모든 호출을 GUI 프로세스의 스케줄러에서 실행한다."""
+    def __init__(self, server: "_WorkerServer"):
+        self._server = server
+
+    def set_limits(self, model: str, rpm: int, tpm: int):
+        self._server.call_gui("set_limits", (model, rpm, tpm), {})
+
+    def acquire(self, model: str, tokens: int, **kwargs) -> float:
+        return self._server.call_gui("acquire", (model, tokens), kwargs)
+
+    def settle(self, model: str, estimated: int, actual: int):
+        self._server.call_gui("settle", (model, estimated, actual), {})
+
+    def penalize(self, model: str, seconds: float):
+        self._server.call_gui("penalize", (model, seconds), {})
+
+
+class _WorkerServer:
+    def __init__(self, conn, options: dict):
+        self._conn = conn
+        self._send_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=options.get("threads", 8),
+                                        thread_name_prefix="ocr-translator-WORKER")
+        self._attached: dict[str, shared_memory.SharedMemory] = {}
+        self._inflight: dict[int, Future] = {}
+        self._settings = SimpleNamespace(**options["llm_settings"])
+        self._llm_kwargs = options.get("llm_kwargs") or {}
+        self._ocr_limits = options.get("ocr_limits")
+        self._llm = None
+        self._lock = threading.Lock()
+        self._gui_ids = itertools.count(1)
+        self._gui_calls: dict[int, Future] = {}   # GUI 프로세스에 보낸 스케줄러 호출
+        usage.forward = True   # 토큰 사용량은 번역 응답에 실어 GUI 프로세스에서 합산
+
+    def serve(self):
+        self._send((None, True, "ready"))
+        while True:
+            try:
+                rid, op, args, kwargs = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            if op == "stop":
+                break
+            if op == "ping":
+                self._send((rid, True, None))
+            elif op == "forget":
+                shm = self._attached.pop(args[0], None)
+                if shm is not None:
+                    shm.close()
+            elif op == "cancel":
+                fut = self._inflight.get(args[0])
+                if fut is not None:
+                    fut.cancel()
+            elif op == "gui_result":
+                cid, ok, value = args
+                fut = self._gui_calls.pop(cid, None)
+                if fut is not None:
+                    fut.set_result(value) if ok else fut.set_exception(value)
+            else:
+                self._pool.submit(self._handle, rid, op, args, kwargs)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _send(self, msg):
+        with self._send_lock:
+            self._conn.send(msg)
+
+    def call_gui(self, method: str, args: tuple, kwargs: dict):
+        """GUI 프로세스의 스케줄러 method 를 실행하고 결과를 기다린다 (예외도 그대로)."""
+        cid = next(self._gui_ids)
+        fut: Future = Future()
+        self._gui_calls[cid] = fut
+        self._send((None, True, ("scheduler", cid, method, args, kwargs)))
+        return fut.result()
+
+    def _handle(self, rid: int, op: str, args: tuple, kwargs: dict):
+        try:
+            msg = (rid, True, self._dispatch(rid, op, args, kwargs))
+        except BaseException as e:
+            try:
+                pickle.dumps(e)
+            except Exception:
+                e = RuntimeError(f"{type(e).__name__}: {e}")
+            msg = (rid, False, e)
+        try:
+            self._send(msg)
+        except (OSError, ValueError):
+            pass
+
+    def _resolve(self, obj):
+        if isinstance(obj, _FrameRef):
+            shm = self._attached.get(obj.shm)
+            if shm is None:
+                shm = self._attached[obj.shm] = shared_memory.SharedMemory(name=obj.shm)
+            return _ShmImage(shm, obj)
+        if isinstance(obj, (list, tuple)):
+            return type(obj)(self._resolve(o) for o in obj)
+        return obj
+
+    def _client(self):
+        with self._lock:
+            if self._llm is None:
+                from llm_api import LLMClient
+                self._llm = LLMClient(self._settings, **{"scheduler": _RemoteScheduler(self), **self._llm_kwargs})
+            return self._llm
+
+    def _dispatch(self, rid: int, op: str, args: tuple, kwargs: dict):
+        if op in ("windows_ocr", "windows_ocr_many", "windows_ocr_candidates", "windows_ocr_jobs",
+                  "submit_ocr_words"):
+            import ocr_win   # winsdk 는 OCR 을 처음 요청받을 때 불러온다
+            if self._ocr_limits is not None:
+                ocr_win.ocr_executor().configure(*self._ocr_limits)
+                self._ocr_limits = None
+            args = self._resolve(args)
+            if op != "submit_ocr_words":
+                return getattr(ocr_win, op)(*args, **kwargs)
+            fut = ocr_win.submit_ocr_words(*args, **kwargs)
+            self._inflight[rid] = fut
+            try:
+                return fut.result()
+            finally:
+                self._inflight.pop(rid, None)
+        if op in ("translate", "translate_many"):
+            # (결과, 그동안 쌓인 사용량 기록) — 실패한 호출의 기록은 다음 응답에 함께 간다
+            return getattr(self._client(), op)(*args, **kwargs), usage.drain()
+        if op == "warm_up":
+            self._client().warm_up(**kwargs)
+            return None
+        if op == "configure":
+            llm, ocr_limits = args
+            self._settings.__dict__.update(llm)
+            if self._llm is not None:
+                self._llm.reload()
+            if "ocr_win" in sys.modules:
+                sys.modules["ocr_win"].ocr_executor().configure(*ocr_limits)
+            else:
+                self._ocr_limits = ocr_limits
+            return None
+        if op == "probe":
+            # 전송 비용 측정용: 프레임을 공유 메모리에서 읽기만 한다
+            return sum(len(img.to_bgra_bytes()) for img in self._resolve(args[0]))
+        if op == "report":
+            return metrics.report()   # LLM 대기열은 GUI 프로세스의 스케줄러에 있다
+        raise WorkerError(f"알 수 없는 요청: {op}")
+
+
+def _worker_main(conn, options: dict):
+    _WorkerServer(conn, options).serve()
+
+
+# ======================================================================
+# GUI 프로세스 쪽
+
+class _ShmPool:
+    """프레임 전송용 공유 메모리 블록. 요청이 끝나면 돌려받아 다음 요청에 재사용한다."""
+    GRANULE = 1 << 20
+
+    def __init__(self, keep: int = 4):
+        self._keep = keep
+        self._lock = threading.Lock()
+        self._free: list[shared_memory.SharedMemory] = []
+
+    def take(self, nbytes: int) -> shared_memory.SharedMemory:
+        with self._lock:
+            fits = [b for b in self._free if b.size >= nbytes]
+            if fits:
+                block = min(fits, key=lambda b: b.size)
+                self._free.remove(block)
+                return block
+        size = max(1, -(-nbytes // self.GRANULE)) * self.GRANULE
+        return shared_memory.SharedMemory(create=True, size=size)
+
+    def give(self, block: shared_memory.SharedMemory) -> Optional[str]:
+        """블록을 돌려받는다. 보관 수를 넘으면 가장 작은 블록을 해제하고 그 이름을 반환."""
+        with self._lock:
+            self._free.append(block)
+            if len(self._free) <= self._keep:
+                return None
+            drop = min(self._free, key=lambda b: b.size)
+            self._free.remove(drop)
+        name = drop.name
+        drop.close()
+        drop.unlink()
+        return name
+
+    def close(self):
+        with self._lock:
+            free, self._free = self._free, []
+        for b in free:
+            b.close()
+            b.unlink()
+
+
+class _Pending(NamedTuple):
+    future: Future
+    block: Optional[shared_memory.SharedMemory]
+    gen: int
+    deadline: Optional[float]   # 이 시각까지 답이 없으면 멈춘 것으로 본다 (None 이면 ping 으로만 판단)
+    counted: bool               # 통계(requests/failed)에 넣는 요청인지 (ping 제외)
+
+
+def _image_nbytes(img) -> int:
+    w, h = img.size
+    return w * h * 4
+
+
+def _write_image(img, dst: memoryview):
+    if hasattr(img, "copy_bgra_into"):
+        img.copy_bgra_into(dst)   # capture.Frame: 캡처 버퍼에서 바로 복사
+        return
+    if hasattr(img, "to_bgra_bytes"):
+        dst[:] = img.to_bgra_bytes()
+        return
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    dst[:] = img.tobytes("raw", "BGRA")
+
+
+class WorkerProcess:
+    """작업 프로세스 하나와 그 감독 스레드. start() 는 기다리지 않는다 (준비되면 ready == True)."""
+    PING_INTERVAL = 1.0
+    HANG_TIMEOUT = 5.0      # ping 응답/기한을 넘긴 요청의 답이 이만큼 늦으면 멈춘 것으로 보고 재시작
+    RESULT_GRACE = 1.0      # OCR timeout 외에 결과를 더 기다리는 시간 (프로세스 간 전송 여유)
+    MAX_RESTARTS = 3
+    RESTART_WINDOW = 60.0
+
+    def __init__(self, llm: dict, *, ocr_limits: tuple[int, int] = (2, 4),
+                 llm_kwargs: Optional[dict] = None, threads: int = 8, scheduler=None):
+        self._options = {"llm_settings": dict(llm), "ocr_limits": tuple(ocr_limits),
+                         "llm_kwargs": dict(llm_kwargs or {}), "threads": threads}
+        self._scheduler = scheduler or default_scheduler
+        # 작업 프로세스의 스케줄러 호출(acquire 는 오래 기다릴 수 있음)을 실행할 스레드
+        self._sched_pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="ocr-translator-WORKERSCHED")
+        self._lock = threading.RLock()
+        self._send_lock = threading.Lock()
+        self._shm = _ShmPool()
+        self._rid = itertools.count(1)
+        self._pending: dict[int, _Pending] = {}
+        self._proc = None
+        self._conn = None
+        self._gen = 0
+        self._ready = threading.Event()
+        self._stopping = threading.Event()
+        self._restarts: deque = deque()
+        self._gave_up = False
+        self._stats = dict(started=0, crashed=0, hung=0, requests=0, failed=0)
+        self._supervisor: Optional[threading.Thread] = None
+
+    # -------------------- 수명 --------------------
+
+    def start(self) -> "WorkerProcess":
+        global _active
+        with self._lock:
+            if self._supervisor is None:
+                self._spawn()
+                self._supervisor = threading.Thread(target=self._supervise, name="ocr-translator-WORKERSUP",
+                                                    daemon=True)
+                self._supervisor.start()
+        _active = self
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        global _active
+        self._stopping.set()
+        with self._lock:
+            proc, conn = self._proc, self._conn
+            self._ready.clear()
+            self._gen += 1
+        if conn is not None:
+            try:
+                with self._send_lock:
+                    conn.send((0, "stop", (), {}))
+            except (OSError, ValueError):
+                pass
+        if proc is not None:
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.kill()
+                proc.join(timeout)
+        if conn is not None:
+            conn.close()
+        self._fail_pending(None, "작업 프로세스를 종료했습니다.")
+        self._sched_pool.shutdown(wait=False, cancel_futures=True)
+        self._shm.close()
+        if _active is self:
+            _active = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def configure(self, llm: dict, ocr_limits: tuple[int, int]):
+        """설정 변경을 전달 (재시작할 때도 이 값으로 띄운다)."""
+        with self._lock:
+            self._options["llm_settings"] = dict(llm)
+            self._options["ocr_limits"] = tuple(ocr_limits)
+        try:
+            self._call("configure", (dict(llm), tuple(ocr_limits)))
+        except WorkerUnavailableError:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._stats, pending=len(self._pending), ready=self.ready, gave_up=self._gave_up,
+                       pid=self._proc.pid if self._proc is not None else None)
+        return out
+
+    def report(self, timeout: float = 2.0) -> str:
+        s = self.stats()
+        head = (f"작업 프로세스: pid {s['pid']}, {'준비됨' if s['ready'] else '준비 안 됨'}"
+                f"{' (재시작 포기)' if s['gave_up'] else ''}, 시작 {s['started']}회, 비정상 종료 {s['crashed']}회, "
+                f"응답 없음 {s['hung']}회, 요청 {s['requests']}, 실패 {s['failed']}, 처리 중 {s['pending']}")
+        try:
+            return head + "\n" + self._result(self._call("report"), timeout)
+        except (WorkerError, TimeoutError):
+            return head
+
+    def _spawn(self):
+        ctx = mp.get_context("spawn")
+        parent, child = ctx.Pipe()
+        proc = ctx.Process(target=_worker_main, args=(child, dict(self._options)),
+                           name="ocr-translator-WORKER", daemon=True)
+        proc.start()
+        child.close()
+        self._gen += 1
+        self._proc, self._conn = proc, parent
+        self._stats["started"] += 1
+        threading.Thread(target=self._read, args=(self._gen, parent), name="ocr-translator-WORKERIO",
+                         daemon=True).start()
+
+    def _read(self, gen: int, conn):
+        while True:
+            try:
+                rid, ok, value = conn.recv()
+            except (EOFError, OSError):
+                break
+            except Exception as e:   # 결과를 풀 수 없음 (pickle) → 해당 요청만 실패하도록 할 수 없으니 재시작
+                metrics.incr("worker.bad_message")
+                self._restart(gen, f"결과를 읽을 수 없습니다: {e}", "crashed")
+                return
+            if rid is None:
+                if value == "ready" and gen == self._gen:
+                    self._ready.set()
+                elif isinstance(value, tuple) and value[0] == "scheduler":
+                    try:
+                        self._sched_pool.submit(self._run_scheduler, *value[1:])
+                    except RuntimeError:   # 종료 중
+                        pass
+                continue
+            with self._lock:
+                p = self._pending.pop(rid, None)
+            if p is None:
+                continue
+            self._release(p.block)
+            if p.future.done():
+                continue
+            if ok:
+                p.future.set_result(value)
+            else:
+                p.future.set_exception(value)
+        self._restart(gen, "작업 프로세스가 종료되었습니다.", "crashed")
+
+    def _run_scheduler(self, cid: int, method: str, args: tuple, kwargs: dict):
+        try:
+            msg = (cid, True, getattr(self._scheduler, method)(*args, **kwargs))
+        except Exception as e:
+            msg = (cid, False, e)
+        try:
+            self._send(0, "gui_result", msg, {})
+        except WorkerUnavailableError:
+            pass   # 그 사이 작업 프로세스가 재시작됨 (기다리던 요청도 함께 사라졌다)
+
+    def _supervise(self):
+        ping: Optional[Future] = None
+        ping_at = 0.0
+        while not self._stopping.wait(self.PING_INTERVAL):
+            with self._lock:
+                gen = self._gen
+                overdue = [p for p in self._pending.values()
+                           if p.gen == gen and p.deadline is not None and time.monotonic() > p.deadline]
+            if not self.ready:
+                ping = None
+                continue
+            if overdue:
+                self._restart(gen, "작업 프로세스가 응답하지 않습니다.", "hung")
+                ping = None
+                continue
+            if ping is not None and not ping.done():
+                if time.monotonic() - ping_at > self.HANG_TIMEOUT:
+                    self._restart(gen, "작업 프로세스가 응답하지 않습니다.", "hung")
+                    ping = None
+                continue
+            try:
+                ping, ping_at = self._call("ping", count=False), time.monotonic()
+            except WorkerUnavailableError:
+                ping = None
+
+    def _restart(self, gen: int, reason: str, kind: str):
+        with self._lock:
+            if gen != self._gen or self._stopping.is_set():
+                return   # 이미 처리됨 (다른 스레드가 먼저 재시작) 또는 종료 중
+            self._ready.clear()
+            self._stats[kind] += 1
+            metrics.incr(f"worker.{kind}")
+            proc, conn = self._proc, self._conn
+            if proc is not None and proc.is_alive():
+                proc.kill()
+            if conn is not None:
+                conn.close()
+            self._fail_pending(gen, reason)
+
+            now = time.monotonic()
+            self._restarts.append(now)
+            while self._restarts and now - self._restarts[0] > self.RESTART_WINDOW:
+                self._restarts.popleft()
+            if len(self._restarts) > self.MAX_RESTARTS:
+                # 계속 죽는다 → 더 띄우지 않고 모든 작업을 GUI 프로세스에서 처리
+                self._gave_up = True
+                self._gen += 1
+                self._proc = self._conn = None
+                metrics.incr("worker.gave_up")
+                return
+            self._spawn()
+
+    def _fail_pending(self, gen: Optional[int], reason: str):
+        with self._lock:
+            dead = {rid: p for rid, p in self._pending.items() if gen is None or p.gen == gen}
+            for rid in dead:
+                del self._pending[rid]
+            self._stats["failed"] += sum(1 for p in dead.values() if p.counted and not p.future.done())
+        for p in dead.values():
+            self._release(p.block)
+            if not p.future.done():
+                p.future.set_exception(WorkerUnavailableError(reason))
+
+    def _release(self, block):
+        if block is None:
+            return
+        dropped = self._shm.give(block)
+        if dropped is not None:
+            try:
+                self._send(0, "forget", (dropped,), {})
+            except WorkerUnavailableError:
+                pass
+
+    # -------------------- 요청 --------------------
+
+    def _send(self, rid: int, op: str, args: tuple, kwargs: dict):
+        with self._lock:
+            conn = self._conn if self.ready else None
+        if conn is None:
+            raise WorkerUnavailableError("작업 프로세스가 준비되지 않았습니다.")
+        try:
+            with self._send_lock:
+                conn.send((rid, op, args, kwargs))
+        except (OSError, ValueError) as e:
+            raise WorkerUnavailableError(f"작업 프로세스에 보낼 수 없습니다: {e}")
+
+    def _call(self, op: str, args: tuple = (), kwargs: Optional[dict] = None, *,
+              block=None, deadline: Optional[float] = None, count: bool = True,
+              cancellable: bool = False) -> Future:
+        fut: Future = Future()
+        rid = next(self._rid)
+        with self._lock:
+            if not self.ready:
+                self._release(block)
+                raise WorkerUnavailableError("작업 프로세스가 준비되지 않았습니다.")
+            self._pending[rid] = _Pending(fut, block, self._gen, deadline, count)
+            if count:
+                self._stats["requests"] += 1
+        try:
+            self._send(rid, op, args, kwargs or {})
+        except WorkerUnavailableError:
+            with self._lock:
+                self._pending.pop(rid, None)
+            self._release(block)
+            raise
+        if cancellable:
+            fut.add_done_callback(lambda f: f.cancelled() and self._cancel(rid))
+        return fut
+
+    def _cancel(self, rid: int):
+        try:
+            self._send(0, "cancel", (rid,), {})
+        except WorkerUnavailableError:
+            pass
+
+    def _frames(self, images: list) -> tuple[shared_memory.SharedMemory, list[_FrameRef]]:
+        """이미지들을 블록 하나에 이어서 쓴다."""
+        sizes = [_image_nbytes(img) for img in images]
+        block = self._shm.take(sum(sizes))
+        refs = []
+        offset = 0
+        try:
+            for img, n in zip(images, sizes):
+                with block.buf[offset:offset + n] as dst:
+                    _write_image(img, dst)
+                w, h = img.size
+                refs.append(_FrameRef(block.name, offset, w, h))
+                offset += n
+        except BaseException:
+            self._release(block)
+            raise
+        return block, refs
+
+    def _result(self, fut: Future, timeout: Optional[float]):
+        t0 = time.perf_counter()
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"작업 프로세스 응답 시간 초과 ({timeout:.1f}s)")
+        finally:
+            metrics.observe("worker.roundtrip", time.perf_counter() - t0)
+
+    def _ocr(self, op: str, images: list, build_args, timeout: float, key: Optional[str]):
+        block, refs = self._frames(images)
+        deadline = time.monotonic() + timeout + self.RESULT_GRACE + self.HANG_TIMEOUT
+        fut = self._call(op, build_args(refs), {"timeout": timeout, "key": key}, block=block, deadline=deadline)
+        return self._result(fut, timeout + self.RESULT_GRACE)
+
+    def windows_ocr(self, pil_img, lang_tag: str, timeout: float = 3.0, key: Optional[str] = None) -> str:
+        return self._ocr("windows_ocr", [pil_img], lambda r: (r[0], lang_tag), timeout, key)
+
+    def windows_ocr_many(self, images: list, lang_tag: str, timeout: float = 3.0,
+                         key: Optional[str] = None) -> list[str]:
+        return self._ocr("windows_ocr_many", list(images), lambda r: (r, lang_tag), timeout, key)
+
+    def windows_ocr_candidates(self, pil_img, langs: list[str], timeout: float = 3.0,
+                               key: Optional[str] = None) -> dict[str, str]:
+        return self._ocr("windows_ocr_candidates", [pil_img], lambda r: (r[0], list(langs)), timeout, key)
+
+    def windows_ocr_jobs(self, jobs: list[tuple], timeout: float = 3.0,
+                         key: Optional[str] = None) -> list[dict[str, str]]:
+        jobs = list(jobs)
+        return self._ocr("windows_ocr_jobs", [img for img, _ in jobs],
+                         lambda r: ([(ref, list(langs)) for ref, (_, langs) in zip(r, jobs)],), timeout, key)
+
+    def submit_ocr_words(self, pil_img, lang_tag: str, key: Optional[str] = None) -> Future:
+        """기다리지 않고 Future 반환. 취소하면 작업 프로세스의 OCR 도 취소한다."""
+        block, refs = self._frames([pil_img])
+        return self._call("submit_ocr_words", (refs[0], lang_tag), {"key": key}, block=block, cancellable=True)
+
+    def probe(self, images: list, timeout: float = 5.0) -> int:
+        """프레임을 보내고 작업 프로세스가 읽었다는 답을 받는다 (전송 비용 측정용)."""
+        block, refs = self._frames(list(images))
+        return self._result(self._call("probe", (refs,), block=block), timeout)
+
+    def translate(self, ocr_text: str, **kwargs) -> str:
+        out, records = self._result(self._call("translate", (ocr_text,), kwargs), None)
+        usage.merge(records)
+        return out
+
+    def translate_many(self, segments: dict[str, str], **kwargs) -> dict[str, str]:
+        out, records = self._result(self._call("translate_many", (dict(segments),), kwargs), None)
+        usage.merge(records)
+        return out
+
+    def warm_up(self, **kwargs):
+        self._call("warm_up", (), kwargs)
+
+
+class WorkerLLM:
+    """
+    LLMClient 대신 쓰는 얇은 래퍼: translate / translate_many 는 작업 프로세스에서,
+    작업 프로세스를 쓸 수 없으면 local(LLMClient)에서 실행한다. 스트리밍은 항상 local.
+    """
+    def __init__(self, worker: WorkerProcess, local):
+        self._worker = worker
+        self._local = local
+
+    def reload(self) -> bool:
+        return self._local.reload()
+
+    def warm_up(self, max_idle: float = 30.0, wait: bool = False):
+        try:
+            self._worker.warm_up(max_idle=max_idle)
+        except WorkerUnavailableError:
+            return self._local.warm_up(max_idle=max_idle, wait=wait)
+        return None
+
+    def translate(self, ocr_text: str, **kwargs) -> str:
+        try:
+            return self._worker.translate(ocr_text, **kwargs)
+        except WorkerUnavailableError:
+            metrics.incr("worker.fallback")
+            return self._local.translate(ocr_text, **kwargs)
+
+    def translate_many(self, segments: dict[str, str], **kwargs) -> dict[str, str]:
+        try:
+            return self._worker.translate_many(segments, **kwargs)
+        except WorkerUnavailableError:
+            metrics.incr("worker.fallback")
+            return self._local.translate_many(segments, **kwargs)
+
+    def translate_stream(self, ocr_text: str, **kwargs) -> Iterator[str]:
+        return self._local.translate_stream(ocr_text, **kwargs)
+
+
+_active: Optional[WorkerProcess] = None
+
+
+def active_worker() -> Optional[WorkerProcess]:
+    """실행 중인 작업 프로세스 (디버그 메뉴 표시용). 없으면 None."""
+    return _active
@@ -0,0 +1,131 @@
+"""
+HotkeyService 테스트 (Win32 없이 QueueMessageSource 로 실행).
+
+    python -m unittest discover -s tests
+"""
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from hotkey_manager import (MOD_CONTROL, MOD_NOREPEAT, MOD_SHIFT, VK,   # noqa: E402
+                            HotkeyService, QueueMessageSource)
+
+TIMEOUT = 2.0
+
+
+class HotkeyServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.source = QueueMessageSource()
+        self.service = HotkeyService(source_factory=lambda: self.source)
+        self.assertTrue(self.service.start())
+
+    def tearDown(self):
+        self.service.stop()
+
+    def _press_and_wait(self, hotkey_id: int, fired: threading.Event) -> bool:
+        self.source.press(hotkey_id)
+        return fired.wait(TIMEOUT)
+
+    def test_start_opens_source_on_service_thread(self):
+        self.assertTrue(self.source.opened)
+        self.assertEqual(self.source.calls[0], ("open",))
+        self.assertTrue(self.service.start())   # 두 번째 start 는 그대로 성공
+        self.assertEqual(self.source.calls.count(("open",)), 1)
+
+    def test_start_failure_reports_error(self):
+        def broken():
+            raise OSError("no message queue")
+        service = HotkeyService(source_factory=broken)
+        self.assertFalse(service.start())
+        self.assertIn("no message queue", service.last_error)
+        self.assertFalse(service.set_hotkey(1, "ctrl+f1", lambda: None))
+
+    def test_set_hotkey_registers_combo(self):
+        self.assertTrue(self.service.set_hotkey(1, "ctrl+shift+f1", lambda: None))
+        self.assertEqual(self.source.registered[1], (MOD_CONTROL | MOD_SHIFT | MOD_NOREPEAT, VK["F1"]))
+        self.assertEqual(self.service.registered(), {1: "ctrl+shift+f1"})
+
+    def test_reregister_changed_combo(self):
+        self.assertTrue(self.service.set_hotkey(1, "ctrl+f1", lambda: None))
+        self.assertTrue(self.service.set_hotkey(1, "ctrl+f2", lambda: None))
+        self.assertEqual(self.source.registered, {1: (MOD_CONTROL | MOD_NOREPEAT, VK["F2"])})
+        self.assertEqual(self.service.registered(), {1: "ctrl+f2"})
+        self.assertEqual([c[0] for c in self.source.calls],
+                         ["open", "register", "unregister", "register"])
+
+    def test_same_combo_only_swaps_callback(self):
+        first, second = threading.Event(), threading.Event()
+        self.assertTrue(self.service.set_hotkey(1, "ctrl+f1", first.set))
+        self.assertTrue(self.service.set_hotkey(1, "ctrl+f1", second.set))
+        self.assertEqual([c[0] for c in self.source.calls].count("register"), 1)
+        self.assertTrue(self._press_and_wait(1, second))
+        self.assertFalse(first.is_set())
+
+    def test_reregister_conflict_leaves_hotkey_unregistered(self):
+        self.assertTrue(self.service.set_hotkey(1, "ctrl+f1", lambda: None))
+        self.source.taken.add((MOD_CONTROL, VK["F2"]))
+        self.assertFalse(self.service.set_hotkey(1, "ctrl+f2", lambda: None))
+        self.assertIn("이미", self.service.last_error)
+        self.assertEqual(self.source.registered, {})
+        self.assertEqual(self.service.registered(), {})
+
+    def test_invalid_combo(self):
+        self.assertFalse(self.service.set_hotkey(1, "ctrl+shift", lambda: None))
+        self.assertIn("형식 오류", self.service.last_error)
+        self.assertEqual(self.source.calls, [("open",)])
+
+    def test_callback_runs_on_press(self):
+        fired = threading.Event()
+        threads = []
+
+        def on_hotkey():
+            threads.append(threading.current_thread().name)
+            fired.set()
+
+        self.assertTrue(self.service.set_hotkey(2, "alt+q", on_hotkey))
+        self.assertTrue(self._press_and_wait(2, fired))
+        self.assertEqual(threads, ["ocr-translator-HOTKEY"])
+
+    def test_callback_exception_keeps_service_alive(self):
+        fired = threading.Event()
+
+        def boom():
+            raise RuntimeError("callback failed")
+
+        self.assertTrue(self.service.set_hotkey(1, "ctrl+f1", boom))
+        self.assertTrue(self.service.set_hotkey(2, "ctrl+f2", fired.set))
+        self.source.press(1)
+        self.assertTrue(self._press_and_wait(2, fired))
+
+    def test_removed_hotkey_does_not_fire(self):
+        removed, kept = threading.Event(), threading.Event()
+        self.assertTrue(self.service.set_hotkey(1, "ctrl+f1", removed.set))
+        self.assertTrue(self.service.set_hotkey(2, "ctrl+f2", kept.set))
+        self.service.remove_hotkey(1)
+        self.source.press(1)
+        self.assertTrue(self._press_and_wait(2, kept))
+        self.assertFalse(removed.is_set())
+        self.assertEqual(self.service.registered(), {2: "ctrl+f2"})
+
+    def test_stop_closes_source_and_clears_registrations(self):
+        self.assertTrue(self.service.set_hotkey(1, "ctrl+f1", lambda: None))
+        self.service.stop()
+        self.assertTrue(self.source.closed)
+        self.assertEqual(self.source.calls[-1], ("close",))
+        self.assertEqual(self.service.registered(), {})
+        self.assertFalse(self.service.set_hotkey(1, "ctrl+f1", lambda: None))
+        self.service.stop()   # 두 번 호출해도 안전
+
+    def test_restart_after_stop(self):
+        self.service.stop()
+        self.source = QueueMessageSource()
+        self.assertTrue(self.service.start())
+        self.assertTrue(self.service.set_hotkey(1, "ctrl+f1", lambda: None))
+        self.assertIn(1, self.source.registered)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+컨텍스트 캐시(use_context_cache) 효과: 시스템 프롬프트를 요청마다 보냄 vs 서버에 한 번 등록하고 참조.
+
+    python tools/bench_context_cache.py --rounds 20
+    python tools/bench_context_cache.py --prefill-per-token 0.0002 --min-cache-tokens 1024   # 최소 토큰 수 미달
+
+로컬 TLS 스텁 서버(gemini_stub.py)가 캐시 API 를 흉내내고, 캐시되지 않은 입력 토큰마다 prefill-per-token 초를
+처리 시간에 더한다. 같은 문장들을 두 방식으로 번역해
+- 요청당 입력 토큰 / 그중 캐시된 토큰 / 예상 비용 (usage, 모델 단가)
+- 요청 지연 median / p90
+을 출력한다. 캐시는 warm_up() 에서 미리 등록되므로 측정은 등록이 끝난 뒤부터다.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import llm_api                         # noqa: E402
+from llm_api import LLMClient          # noqa: E402
+from metrics import metrics            # noqa: E402
+from settings import AppSettings       # noqa: E402
+from usage import usage                # noqa: E402
+from gemini_stub import GeminiStub     # noqa: E402
+
+TEXTS = [
+    "Deliver 3 Military Batteries to the Quartermaster.",
+    "Reward: 12,000 Roubles, Reputation +0.02",
+    "The bridge to the north is destroyed; use the river path.",
+    "I told you not to come back here without the documents.",
+]
+
+
+def _run(settings, stub: GeminiStub, rounds: int) -> tuple[list[float], dict]:
+    llm_api.reset_connections()
+    client = LLMClient(settings, transport="rest", api_endpoint=stub.endpoint, max_retries=2)
+    client.warm_up(wait=True)
+    for _ in range(50):   # 백그라운드 등록을 기다림
+        if not settings.use_context_cache or client._cached_model() is not None or client._ctx_rejected:
+            break
+        time.sleep(0.05)
+    usage.reset()
+    metrics.reset()
+    times = []
+    for i in range(rounds):
+        t0 = time.perf_counter()
+        client.translate(TEXTS[i % len(TEXTS)])
+        times.append(time.perf_counter() - t0)
+    return sorted(times), usage.snapshot()["total"]
+
+
+def _report(label: str, times: list[float], t: dict):
+    n = max(1, t["calls"])
+    p90 = times[min(len(times) - 1, int(len(times) * 0.9))]
+    print(f"{label:<8} 입력 {t['prompt'] / n:7.1f} 토큰/요청 (캐시 {t['cached'] / n:7.1f})  "
+          f"median {statistics.median(times) * 1000:7.1f} ms  p90 {p90 * 1000:7.1f} ms  "
+          f"${t['cost']:.6f} (캐시로 -${t['saved']:.6f})")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=20)
+    ap.add_argument("--latency", type=float, default=0.05, help="스텁 서버 처리 시간(s)")
+    ap.add_argument("--prefill-per-token", type=float, default=0.0002,
+                    help="캐시되지 않은 입력 토큰마다 더할 처리 시간(s)")
+    ap.add_argument("--min-cache-tokens", type=int, default=0, help="스텁이 받아들이는 최소 캐시 크기")
+    ap.add_argument("--model", default="gemini-2.5-flash")
+    args = ap.parse_args()
+
+    stub = GeminiStub(latency=args.latency, prefill_per_token=args.prefill_per_token,
+                      min_cache_tokens=args.min_cache_tokens).start()
+    stub.trust()
+    settings = SimpleNamespace(gemini_api_key="stub-key", gemini_model=args.model,
+                               system_prompt=AppSettings().system_prompt, gemini_rpm=0, gemini_tpm=0,
+                               use_context_cache=False)
+    print(f"stub https://{stub.endpoint}  rounds={args.rounds}  latency={args.latency}s  "
+          f"prefill={args.prefill_per_token * 1000:.2f}ms/토큰  모델 {args.model}")
+
+    _run(settings, stub, 2)   # import / 첫 연결 비용 제외
+    plain = _run(settings, stub, args.rounds)
+    _report("보냄", *plain)
+    settings.use_context_cache = True
+    cached = _run(settings, stub, args.rounds)
+    _report("캐시", *cached)
+    if not cached[1]["cached"]:
+        print("\n컨텍스트 캐시를 쓰지 못함 (최소 토큰 수 미달 등) — 시스템 프롬프트를 그대로 보냄")
+    else:
+        full_price = 1 - (cached[1]["prompt"] - cached[1]["cached"]) / max(1, plain[1]["prompt"])
+        print(f"\n캐시 → 정가로 과금되는 입력 토큰 {full_price:.0%} 감소, "
+              f"지연 median {statistics.median(plain[0]) / statistics.median(cached[0]):.2f}x 빠름")
+    print(f"스텁: {stub.stats()}")
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
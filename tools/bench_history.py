@@ -0,0 +1,114 @@
+"""
+번역 기록(history.HistoryStore) 검색 속도와 메모리.
+
+    python tools/bench_history.py --rows 100000
+
+임시 폴더에 rows 개의 가짜 기록(en/ja/zh 원문 + 한국어 번역)을 만들고
+- 추가(add) 한 번의 지연
+- 검색어 종류별(흔한 단어/CJK/2글자(LIKE)/여러 단어/없는 단어 등) 검색 지연 median, p90
+- 기록을 연 뒤 파이썬 힙 증가량 (최근 memory_rows 개만 메모리에 있는지)
+을 출력한다.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from history import HistoryStore   # noqa: E402
+
+EN = ("armor ammo quest extraction bridge sniper weight price durability mission deliver battery "
+      "quartermaster reward level damage medkit helmet scope rifle vest stash trader contract").split()
+JA = "北の砦に向かい補給物資を守っている兵士に話しかけよう報酬として経験値とゴールドが手に入る途中の橋は壊れている"
+ZH = "我们必须在天黑之前穿过这片森林否则狼群会找到我们你带上火把和绳子我去前面探路如果遇到商人记得买一些药水"
+KO = ("방어구 탄약 임무 탈출 다리 저격수 무게 가격 내구도 배달 배터리 보급관 보상 레벨 피해 "
+      "구급상자 헬멧 조준경 소총 조끼 보관함 상인 계약").split()
+
+QUERIES = [
+    ("흔한 단어", "quest"),
+    ("드문 단어", "quartermaster"),
+    ("CJK", "補給物資"),
+    ("2글자(LIKE)", "보상"),
+    ("여러 단어", "sniper 보급관"),
+    ("없는 단어", "zzzqqq"),
+    ("없는 2글자", "뷁뷁"),   # LIKE 로 최근 SHORT_SCAN_ROWS 개를 모두 훑는 최악의 경우
+]
+
+
+def _fake(rng: random.Random, i: int) -> tuple[str, str, str]:
+    kind = i % 3
+    if kind == 0:
+        src = " ".join(rng.choice(EN) for _ in range(rng.randint(4, 30)))
+        lang = "en-US"
+    else:
+        pool = JA if kind == 1 else ZH
+        start = rng.randrange(len(pool) - 10)
+        src = pool[start:start + rng.randint(6, 40)]
+        lang = "ja-JP" if kind == 1 else "zh-CN"
+    dst = " ".join(rng.choice(KO) for _ in range(rng.randint(3, 20)))
+    return src, dst, lang
+
+
+def _fill(path: str, rows: int, seed: int):
+    rng = random.Random(seed)
+    store = HistoryStore(path, max_rows=rows * 2)
+    with store._lock:
+        store._db.executemany(
+            "INSERT INTO entries (ts, lang, region, source, translation) VALUES (?, ?, '', ?, ?)",
+            ((time.time(), lang, src, dst) for src, dst, lang in (_fake(rng, i) for i in range(rows))))
+        store._db.commit()
+    store.close()
+
+
+def _ms(v: float) -> str:
+    return f"{v * 1000:7.2f} ms"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--rounds", type=int, default=30)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="ocr-translate-history-"), "history.db")
+    t0 = time.perf_counter()
+    _fill(path, args.rows, args.seed)
+    print(f"기록 {args.rows}개 생성: {time.perf_counter() - t0:.1f}s, "
+          f"파일 {os.path.getsize(path) / 2**20:.1f} MiB\n")
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = HistoryStore(path, max_rows=args.rows * 2)
+    print(f"열기 후 힙 증가: {(tracemalloc.get_traced_memory()[0] - before) / 1024:.0f} KiB "
+          f"(메모리에 둔 기록 {len(store.recent())}개, FTS5={'예' if store.fts else '아니오'})")
+    tracemalloc.stop()
+
+    rng = random.Random(args.seed + 1)
+    adds = []
+    for i in range(args.rounds):
+        src, dst, lang = _fake(rng, i)
+        t0 = time.perf_counter()
+        store.add(src, dst, lang)
+        adds.append(time.perf_counter() - t0)
+    print(f"{'add':<14} median {_ms(statistics.median(adds))}  max {_ms(max(adds))}\n")
+
+    for label, q in QUERIES:
+        times, n = [], 0
+        for _ in range(args.rounds):
+            t0 = time.perf_counter()
+            n = len(store.search(q))
+            times.append(time.perf_counter() - t0)
+        times.sort()
+        print(f"{label:<14} {q!r:<18} {n:>4}건  median {_ms(statistics.median(times))}  "
+              f"p90 {_ms(times[int(len(times) * 0.9)])}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
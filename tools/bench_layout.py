@@ -0,0 +1,170 @@
+"""
+OCR 단어 박스 → 텍스트 조립 방식 비교: 예전 방식(단어를 " " 로 이어 붙임) vs text_layout.reconstruct().
+
+    python tools/bench_layout.py                       # 글꼴 배치로 만든 단어 박스 (WinRT 처럼 CJK 는 한 글자씩)
+    python tools/bench_layout.py --ocr --save out/     # Windows: 렌더링한 이미지를 실제 OCR 해서 비교
+    python tools/bench_layout.py --count-tokens        # GEMINI_API_KEY 로 실제 토큰 수도 센다
+
+샘플마다 글자 수 / 추정 토큰(scheduler.estimate_tokens) 을 정규화(text_norm) 전·후로 보여 주고,
+조립 결과의 문단 수가 원문과 같은지, 원문과 완전히 같은지(공백 무시 X)를 표시한다.
+"""
+import argparse
+import os
+import re
+import sys
+from typing import NamedTuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from PIL import Image, ImageDraw, ImageFont   # noqa: E402
+
+from scheduler import estimate_tokens         # noqa: E402
+from text_layout import reconstruct, is_cjk   # noqa: E402
+from text_norm import normalize               # noqa: E402
+
+SAMPLES = [
+    ("ja-quest", "ja-JP",
+     "北の砦に向かい、補給物資を守っている兵士に話しかけよう。"
+     "彼は長い間ここで仲間を待っているが、誰も戻ってこない。\n\n"
+     "報酬として経験値とゴールドが手に入る。途中の橋は壊れているので、川沿いの道を進むこと。"),
+    ("ja-tooltip", "ja-JP",
+     "鋼の大剣\n攻撃力 +45\n重量 12.5kg\n\n"
+     "古代の鍛冶師が鍛えたと言われる剣。HPが半分以下のとき、クリティカル率が上昇する。"),
+    ("zh-dialog", "zh-CN",
+     "我们必须在天黑之前穿过这片森林，否则狼群会找到我们。"
+     "你带上火把和绳子，我去前面探路。\n\n"
+     "如果遇到商人，记得买一些药水，接下来的路会很危险。"),
+    ("zh-menu", "zh-CN",
+     "开始游戏\n继续\n设置\n退出\n\n当前版本：1.2.3"),
+    ("en-quest", "en-US",
+     "Deliver 3 Military Batteries to the Quartermaster before the evacuation begins. "
+     "The well-known route through the old factory is blocked.\n\n"
+     "Reward: 12,000 Roubles"),
+]
+
+FONT_CANDIDATES = [
+    r"C:\Windows\Fonts\YuGothM.ttc", r"C:\Windows\Fonts\msgothic.ttc", r"C:\Windows\Fonts\msyh.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/System/Library/Fonts/Hiragino Sans GB.ttc",
+]
+
+
+class OcrWord(NamedTuple):
+    """ocr_win.OcrWord 와 같은 필드 (ocr_win 은 winsdk 가 있어야 임포트됨)."""
+    text: str
+    x: int
+    y: int
+    w: int
+    h: int
+    line: int
+
+
+SIZE = 24
+LINE_H = int(SIZE * 1.4)
+PARA_SPACE = SIZE
+WIDTH = 560
+_RE_TOKEN = re.compile(r"[A-Za-z0-9.,:+%'\-]+|\S")
+
+
+def _font(path: str | None):
+    for p in ([path] if path else FONT_CANDIDATES):
+        if p and os.path.exists(p):
+            return ImageFont.truetype(p, SIZE), p
+    return None, None
+
+
+def _advance(font, s: str) -> int:
+    if font is not None:
+        return int(round(font.getlength(s)))
+    return sum(SIZE if is_cjk(c) else int(SIZE * 0.55) for c in s)   # 글꼴이 없으면 고정폭으로 가정
+
+
+def layout(text: str, font) -> tuple[list[OcrWord], int]:
+    """
+    text 를 WIDTH 폭으로 자동 줄바꿈하며 배치한 단어 박스와 전체 높이.
+    WinRT 처럼 CJK 는 한 글자씩, 라틴/숫자는 공백 단위 단어로 자른다.
+    """
+    words, y, li = [], 8, 0
+    space = _advance(font, " ")
+    for pi, para in enumerate(text.split("\n\n")):
+        if pi:
+            y += PARA_SPACE
+        for hard in para.split("\n"):
+            x = 8
+            for tok in _RE_TOKEN.finditer(hard):
+                t = tok.group()
+                gap = space if tok.start() and hard[tok.start() - 1] == " " else 0
+                adv = _advance(font, t)
+                if x + gap + adv > WIDTH - 8 and x > 8:
+                    x, y, li, gap = 8, y + LINE_H, li + 1, 0
+                x += gap
+                words.append(OcrWord(t, x, y, adv, SIZE, li))
+                x += adv
+            y += LINE_H
+            li += 1
+    return words, y + 8
+
+
+def render(words: list[OcrWord], height: int, font) -> Image.Image:
+    img = Image.new("RGB", (WIDTH, height), "white")
+    draw = ImageDraw.Draw(img)
+    for w in words:
+        draw.text((w.x, w.y), w.text, font=font, fill="black")
+    return img
+
+
+def _counter(model: str):
+    import google.generativeai as genai
+    genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+    m = genai.GenerativeModel(model)
+    return lambda s: m.count_tokens(s).total_tokens
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--font", help="CJK 글꼴 경로 (기본: 시스템에서 찾음)")
+    ap.add_argument("--ocr", action="store_true", help="렌더링한 이미지를 Windows OCR 로 인식 (Windows)")
+    ap.add_argument("--save", help="렌더링한 이미지를 저장할 폴더")
+    ap.add_argument("--count-tokens", action="store_true", help="GEMINI_API_KEY 로 실제 토큰 수")
+    ap.add_argument("--model", default="gemini-2.0-flash")
+    args = ap.parse_args()
+
+    font, font_path = _font(args.font)
+    if font is None and (args.ocr or args.save):
+        sys.exit("CJK 글꼴을 찾지 못했습니다. --font 로 지정하세요.")
+    print(f"글꼴: {font_path or '없음 (고정폭 가정)'}   단어 박스: {'Windows OCR' if args.ocr else '배치 결과'}\n")
+    count = _counter(args.model) if args.count_tokens else estimate_tokens
+    if args.save:
+        os.makedirs(args.save, exist_ok=True)
+
+    print(f"{'sample':<11} {'':6} {'글자 전':>7} {'글자 후':>7} {'토큰 전':>7} {'토큰 후':>7}  문단  원문일치")
+    tot = {"raw": [0, 0, 0, 0], "norm": [0, 0, 0, 0]}
+    for name, lang, text in SAMPLES:
+        words, height = layout(text, font)
+        if font is not None:
+            img = render(words, height, font)
+            if args.save:
+                img.save(os.path.join(args.save, f"{name}.png"))
+            if args.ocr:
+                from ocr_win import submit_ocr_words
+                words = submit_ocr_words(img, lang).result(timeout=10)
+
+        naive = " ".join(w.text for w in words)
+        rebuilt = reconstruct(words)
+        paras = f"{len(rebuilt.split(chr(10) * 2))}/{len(text.split(chr(10) * 2))}"
+        for kind, a, b in (("raw", naive, rebuilt),
+                           ("norm", normalize(naive, lang).payload, normalize(rebuilt, lang).payload)):
+            row = [len(a), len(b), count(a), count(b)]
+            tot[kind] = [t + r for t, r in zip(tot[kind], row)]
+            extra = f"  {paras:>4}  {'O' if rebuilt == text else 'X'}" if kind == "raw" else ""
+            print(f"{name if kind == 'raw' else '':<11} {kind:6} " + " ".join(f"{v:7d}" for v in row) + extra)
+
+    print()
+    for kind, (c0, c1, t0, t1) in tot.items():
+        print(f"합계 {kind:<5} 글자 {c0} → {c1} ({(c0 - c1) / c0:.0%} 절약)   "
+              f"토큰 {t0} → {t1} ({(t0 - t1) / t0:.0%} 절약)")
+
+
+if __name__ == "__main__":
+    main()
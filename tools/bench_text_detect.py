@@ -0,0 +1,153 @@
+"""
+글자 영역 검출(text_detect) 효과: 영역 전체 OCR vs 글자 상자만 잘라서 OCR.
+
+    python tools/bench_text_detect.py --rounds 20
+    python tools/bench_text_detect.py --ocr          # Windows: 실제 OCR 시간/결과도 비교
+
+배경 그림 위에 글자를 그린 장면들로
+- 검출 시간 (median)
+- 처리 픽셀 수: 전체 vs 잘라낸 상자 합 (OCR 엔진과 전처리가 감당하는 양)
+- 전처리 시간: 전체 to_bgra_bytes() vs 상자들 to_bgra_bytes()
+- 그린 글자 줄이 모두 상자 안에 들어갔는지 (놓친 줄 수)
+- --ocr: windows_ocr(전체) vs windows_ocr_many(상자들) 시간과 결과 글자 수
+를 출력한다. 검출이 None(확신 없음)이면 전체 OCR 로 대체되므로 "전체" 로 표시한다.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import numpy as np                                 # noqa: E402
+from PIL import Image, ImageDraw, ImageFont        # noqa: E402
+
+from capture import Frame                          # noqa: E402
+from text_detect import detect_text_regions, crop  # noqa: E402
+
+FONT = os.path.join(os.path.dirname(__file__), "..", "app", "fonts", "KakaoSmallSans-Bold.ttf")
+LINES = [
+    "Deliver 3 Military Batteries to the Quartermaster.",
+    "Reward: 12,000 Roubles, Reputation +0.02",
+    "Weight 1.2 kg    Durability 45/45",
+    "The bridge to the north is destroyed; use the river path.",
+]
+
+
+def _art(w: int, h: int, rng: random.Random, noise: int = 6) -> np.ndarray:
+    """부드러운 그라데이션 + 흐린 덩어리 + 약한 잡음 (게임 배경 그림 대용)."""
+    yy, xx = np.mgrid[0:h, 0:w].astype(np.float32)
+    img = np.zeros((h, w, 3), np.float32)
+    for c in range(3):
+        img[..., c] = 40 + 80 * xx / w + 50 * yy / h * (c + 1) / 3
+    for _ in range(8):
+        cx, cy, r = rng.uniform(0, w), rng.uniform(0, h), rng.uniform(60, 260)
+        color = np.array([rng.uniform(-60, 60) for _ in range(3)], np.float32)
+        img += np.exp(-((xx - cx) ** 2 + (yy - cy) ** 2) / (2 * r * r))[..., None] * color
+    img += np.random.default_rng(rng.randrange(2**31)).normal(0, noise, img.shape)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+def _text_block(img: Image.Image, x: int, y: int, lines: list[str], size: int, panel: bool) -> list[tuple]:
+    """글자 줄을 그리고 각 줄의 상자 (x, y, w, h) 를 반환."""
+    draw = ImageDraw.Draw(img, "RGBA")
+    font = ImageFont.truetype(FONT, size)
+    boxes = [draw.textbbox((x, y + i * int(size * 1.5)), t, font=font) for i, t in enumerate(lines)]
+    if panel:
+        draw.rectangle((min(b[0] for b in boxes) - 12, min(b[1] for b in boxes) - 10,
+                        max(b[2] for b in boxes) + 12, max(b[3] for b in boxes) + 10), fill=(10, 12, 16, 200))
+    for i, t in enumerate(lines):
+        draw.text((x, y + i * int(size * 1.5)), t, font=font, fill=(235, 235, 225))
+    return [(b[0], b[1], b[2] - b[0], b[3] - b[1]) for b in boxes]
+
+
+def scenes(rng: random.Random):
+    """(이름, PIL 이미지, 그린 줄 상자들)"""
+    img = Image.fromarray(_art(1280, 720, rng))
+    yield "tooltip", img, _text_block(img, 700, 420, LINES, 18, panel=True)
+
+    img = Image.fromarray(_art(1600, 900, rng))
+    yield "subtitle", img, _text_block(img, 420, 800, LINES[3:], 28, panel=False)
+
+    img = Image.fromarray(_art(1400, 800, rng))
+    gt = _text_block(img, 40, 40, LINES[:2], 20, panel=True)
+    gt += _text_block(img, 860, 640, LINES[2:], 16, panel=True)
+    yield "two-panels", img, gt
+
+    img = Image.fromarray(_art(1920, 1080, rng))
+    yield "small-text", img, _text_block(img, 1300, 700, LINES, 13, panel=True)
+
+    img = Image.fromarray(_art(1000, 600, rng, noise=70))
+    yield "noisy-art", img, _text_block(img, 300, 260, LINES[:2], 20, panel=False)
+
+    img = Image.fromarray(_art(900, 420, rng))
+    yield "full-text", img, _text_block(img, 20, 20, LINES * 3, 20, panel=False)
+
+
+def _frame(img: Image.Image) -> Frame:
+    w, h = img.size
+    return Frame(bytearray(img.convert("RGBA").tobytes("raw", "BGRA")), 0, 0, w, h, w * 4)
+
+
+def _median_ms(fn, rounds: int) -> float:
+    fn()
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000
+
+
+def _covered(b, boxes) -> bool:
+    x, y, w, h = b
+    return any(bx <= x and by <= y and x + w <= bx + bw and y + h <= by + bh for bx, by, bw, bh in boxes)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=20)
+    ap.add_argument("--ocr", action="store_true", help="Windows OCR 시간/결과 비교 (en-US 언어팩 필요)")
+    ap.add_argument("--save", help="검출 상자를 그린 이미지를 저장할 폴더")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    if args.ocr:
+        from ocr_win import windows_ocr, windows_ocr_many
+    if args.save:
+        os.makedirs(args.save, exist_ok=True)
+
+    print(f"{'scene':<11} {'크기':>10} {'검출':>8} {'상자':>4} {'픽셀 전체':>10} {'픽셀 상자':>10} {'비율':>5} "
+          f"{'전처리 전체':>10} {'전처리 상자':>10}  놓친 줄")
+    for name, img, gt in scenes(random.Random(args.seed)):
+        frame = _frame(img)
+        w, h = frame.size
+        det_ms = _median_ms(lambda: detect_text_regions(frame), args.rounds)
+        boxes = detect_text_regions(frame)
+        crops = [crop(frame, b) for b in boxes] if boxes else [frame]
+        px_full, px_crop = w * h, sum(c.width * c.height for c in crops)
+        full_ms = _median_ms(frame.to_bgra_bytes, args.rounds)
+        crop_ms = _median_ms(lambda: [c.to_bgra_bytes() for c in crops], args.rounds)
+        missed = sum(not _covered(b, boxes) for b in gt) if boxes else 0
+        label = f"{len(boxes)}" if boxes else "전체"
+        print(f"{name:<11} {f'{w}x{h}':>10} {det_ms:6.2f}ms {label:>4} {px_full:>10} {px_crop:>10} "
+              f"{px_crop / px_full:5.0%} {full_ms:8.3f}ms {crop_ms:8.3f}ms  {missed}/{len(gt)}")
+
+        if args.save:
+            shown = img.copy()
+            draw = ImageDraw.Draw(shown)
+            for x, y, bw, bh in boxes or []:
+                draw.rectangle((x, y, x + bw, y + bh), outline=(255, 0, 0), width=2)
+            shown.save(os.path.join(args.save, f"{name}.png"))
+        if args.ocr:
+            t_full = _median_ms(lambda: windows_ocr(frame, "en-US"), args.rounds)
+            t_crop = _median_ms(lambda: windows_ocr_many(crops, "en-US"), args.rounds)
+            full_text = windows_ocr(frame, "en-US")
+            crop_text = "\n\n".join(t for t in windows_ocr_many(crops, "en-US") if t)
+            print(f"{'':<11} OCR 전체 {t_full:7.1f}ms ({len(full_text)}자)  "
+                  f"상자 {t_crop:7.1f}ms ({len(crop_text)}자)")
+
+
+if __name__ == "__main__":
+    main()
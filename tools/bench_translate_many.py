@@ -0,0 +1,105 @@
+"""
+translate_many() 와 문장별 translate() 호출의 처리량 비교.
+
+    python tools/bench_translate_many.py                      # 지연 모델(가짜 Gemini)
+    python tools/bench_translate_many.py --api-key KEY        # 실제 Gemini 호출
+
+가짜 모델의 지연 = 왕복 시간(rtt) + 입력 글자 수 * in_cost + 출력 글자 수 * out_cost
+(system_instruction 도 입력에 포함되므로 요청마다 다시 비용을 낸다)
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from llm_api import LLMClient          # noqa: E402
+from settings import AppSettings       # noqa: E402
+
+SAMPLES = [
+    "Extraction point is closed. Find another way out.",
+    "Armor durability: 45/60",
+    "Deliver 3 Military Batteries to the Quartermaster.",
+    "The bridge is covered by snipers. Move fast and stay low.",
+    "Ammo type: 7.62x39mm PS. Penetration: 32",
+    "Weight limit exceeded. Movement speed reduced.",
+    "Hey, you made it. I wasn't sure you'd come back alive.",
+    "Sell price: 12,400 Koen",
+]
+
+
+class FakeModel:
+    def __init__(self, system_prompt: str, rtt: float, in_cost: float, out_cost: float):
+        self.system_prompt = system_prompt
+        self.rtt, self.in_cost, self.out_cost = rtt, in_cost, out_cost
+        self.calls = 0
+        self.chars_in = 0
+
+    def generate_content(self, payload, generation_config=None, safety_settings=None, stream=False):
+        self.calls += 1
+        n_in = len(self.system_prompt) + len(payload)
+        self.chars_in += n_in
+        if (generation_config or {}).get("response_mime_type") == "application/json":
+            segs = json.loads(payload.split("Text to Translate:\n", 1)[1])["segments"]
+            text = json.dumps({"translations": [{"id": s["id"], "text": f"번역({s['text']})"} for s in segs]},
+                              ensure_ascii=False)
+        else:
+            text = f"번역({payload.split('Text to Translate:', 1)[1].strip()})"
+        time.sleep(self.rtt + n_in * self.in_cost + len(text) * self.out_cost)
+        return SimpleNamespace(text=text)
+
+
+def _run(label, fn, rounds):
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    med = statistics.median(times)
+    print(f"{label:<28} median {med * 1000:8.1f} ms")
+    return med
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--segments", type=int, default=len(SAMPLES))
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--rtt", type=float, default=0.35, help="가짜 모델 왕복 시간(s)")
+    ap.add_argument("--in-cost", type=float, default=0.00002, help="입력 글자당 시간(s)")
+    ap.add_argument("--out-cost", type=float, default=0.0004, help="출력 글자당 시간(s)")
+    ap.add_argument("--api-key", default="", help="지정하면 실제 Gemini 를 호출")
+    ap.add_argument("--model", default=AppSettings.gemini_model)
+    args = ap.parse_args()
+
+    defaults = AppSettings()
+    settings = SimpleNamespace(gemini_api_key=args.api_key, gemini_model=args.model,
+                               system_prompt=defaults.system_prompt)
+    client = LLMClient(settings)
+    fake = None
+    if not args.api_key:
+        fake = FakeModel(defaults.system_prompt, args.rtt, args.in_cost, args.out_cost)
+        client._model = fake
+
+    texts = [SAMPLES[i % len(SAMPLES)] for i in range(args.segments)]
+    segments = {f"s{i + 1}": t for i, t in enumerate(texts)}
+
+    print(f"segments={len(texts)} rounds={args.rounds} backend={'gemini' if args.api_key else 'fake'}")
+    t_single = _run("translate() x N", lambda: [client.translate(t) for t in texts], args.rounds)
+    if fake:
+        single_calls, single_chars = fake.calls, fake.chars_in
+        fake.calls = fake.chars_in = 0
+    t_many = _run("translate_many()", lambda: client.translate_many(segments), args.rounds)
+
+    print(f"speedup                      x{t_single / t_many:.2f}")
+    print(f"segments/s                   {len(texts) / t_single:.1f} → {len(texts) / t_many:.1f}")
+    if fake:
+        print(f"requests/round               {single_calls // args.rounds} → {fake.calls // args.rounds}")
+        print(f"input chars/round            {single_chars // args.rounds} → {fake.chars_in // args.rounds}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+LLM 첫 바이트까지의 시간(TTFB): 새 연결 vs 유지된 연결 vs 미리 맺은 연결.
+
+로컬 TLS 스텁 서버(gemini_stub.py)에 REST transport 로 translate_stream() 을 보내고
+첫 조각을 받을 때까지의 시간을 잰다.
+
+    python tools/bench_ttfb.py --rounds 10 --connect-delay 0.12
+
+- cold    : 요청마다 genai 를 다시 설정하고 LLMClient 를 새로 만듦 (캡처마다 클라이언트를 만들던 방식)
+- warm    : 하나의 LLMClient 를 계속 사용 (연결 풀 재사용)
+- prewarm : 새 연결이지만 요청 전에 warm_up() 으로 미리 연결 (캡처 보드가 열릴 때)
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import llm_api                         # noqa: E402
+from llm_api import LLMClient          # noqa: E402
+from settings import AppSettings       # noqa: E402
+from gemini_stub import GeminiStub     # noqa: E402
+
+TEXT = "Deliver 3 Military Batteries to the Quartermaster."
+
+
+def _ttfb(client: LLMClient) -> float:
+    t0 = time.perf_counter()
+    stream = client.translate_stream(TEXT)
+    next(stream)
+    dt = time.perf_counter() - t0
+    for _ in stream:
+        pass
+    return dt
+
+
+def _report(label: str, times: list[float], connections: int):
+    times = sorted(times)
+    p90 = times[min(len(times) - 1, int(len(times) * 0.9))]
+    print(f"{label:<8} median {statistics.median(times) * 1000:7.1f} ms  p90 {p90 * 1000:7.1f} ms  "
+          f"min {times[0] * 1000:7.1f} ms  새 연결 {connections}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=10)
+    ap.add_argument("--latency", type=float, default=0.05, help="스텁 서버 처리 시간(s)")
+    ap.add_argument("--connect-delay", type=float, default=0.12,
+                    help="새 연결마다 더할 시간(s). DNS/TCP/TLS 왕복을 흉내냄")
+    args = ap.parse_args()
+
+    stub = GeminiStub(latency=args.latency, connect_delay=args.connect_delay).start()
+    stub.trust()
+    settings = SimpleNamespace(gemini_api_key="stub-key", gemini_model=AppSettings.gemini_model,
+                               system_prompt=AppSettings().system_prompt)
+
+    def new_client() -> LLMClient:
+        llm_api.reset_connections()
+        return LLMClient(settings, transport="rest", api_endpoint=stub.endpoint, max_retries=1)
+
+    print(f"stub https://{stub.endpoint}  rounds={args.rounds}  latency={args.latency}s  "
+          f"connect_delay={args.connect_delay}s")
+
+    _ttfb(new_client())   # import / 첫 호출 비용 제외
+
+    stub.reset_stats()
+    cold = [_ttfb(new_client()) for _ in range(args.rounds)]
+    _report("cold", cold, stub.stats().get("connections", 0))
+
+    client = new_client()
+    _ttfb(client)
+    stub.reset_stats()
+    warm = [_ttfb(client) for _ in range(args.rounds)]
+    _report("warm", warm, stub.stats().get("connections", 0))
+
+    stub.reset_stats()
+    prewarm = []
+    for _ in range(args.rounds):
+        c = new_client()
+        c.warm_up(wait=True)
+        prewarm.append(_ttfb(c))
+    _report("prewarm", prewarm, stub.stats().get("connections", 0))
+
+    print(f"\ncold → warm: {statistics.median(cold) / statistics.median(warm):.2f}x 빠름")
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+작업 프로세스(worker_proc)의 지연 비용: 이 프로세스에서 실행 vs 작업 프로세스에 맡김.
+
+    python tools/bench_worker.py --rounds 50
+
+- frame  : 프레임 전달 비용. 공유 메모리 쓰기 + Pipe 왕복 + 작업 프로세스에서 읽기
+           vs 이 프로세스에서 to_bgra_bytes() (OCR 엔진에 넘기기 전 하는 일)
+- llm    : 로컬 TLS 스텁(gemini_stub.py)에 translate() — 이 프로세스의 LLMClient vs 작업 프로세스
+- ocr    : windows_ocr() — 이 프로세스 vs 작업 프로세스 (winsdk 가 있을 때만)
+- jitter : 번역 요청을 동시에 보내는 동안 메인 스레드의 5ms 타이머가 늦어진 정도 (GUI 끊김 대용 지표)
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from capture import Frame                          # noqa: E402
+from llm_api import LLMClient                      # noqa: E402
+from settings import AppSettings                   # noqa: E402
+from worker_proc import WorkerProcess, llm_settings  # noqa: E402
+from gemini_stub import GeminiStub                 # noqa: E402
+
+SIZES = [(480, 160), (1280, 720), (2560, 1440)]
+TEXT = "Deliver 3 Military Batteries to the Quartermaster."
+
+
+def _ms(v: float) -> str:
+    return f"{v * 1000:7.2f} ms"
+
+
+def _p90(times: list[float]) -> float:
+    times = sorted(times)
+    return times[min(len(times) - 1, int(len(times) * 0.9))]
+
+
+def _timed(fn, rounds: int) -> list[float]:
+    fn()   # 첫 호출(임포트/연결) 제외
+    out = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+def _compare(label: str, local: list[float], remote: list[float]):
+    lm, rm = statistics.median(local), statistics.median(remote)
+    print(f"{label:<14} 프로세스 안 median {_ms(lm)} p90 {_ms(_p90(local))}   "
+          f"작업 프로세스 median {_ms(rm)} p90 {_ms(_p90(remote))}   추가 {_ms(rm - lm)}")
+
+
+def _jitter(work, seconds: float) -> tuple[float, float]:
+    """work() 를 다른 스레드에서 반복하는 동안 5ms 슬립이 늦어진 정도 (p99, max)."""
+    stop = threading.Event()
+
+    def loop():
+        while not stop.is_set():
+            work()
+    threads = [threading.Thread(target=loop, daemon=True) for _ in range(4)]
+    for t in threads:
+        t.start()
+    late = []
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        t0 = time.perf_counter()
+        time.sleep(0.005)
+        late.append(time.perf_counter() - t0 - 0.005)
+    stop.set()
+    for t in threads:
+        t.join()
+    late.sort()
+    return late[int(len(late) * 0.99)], late[-1]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=50)
+    ap.add_argument("--latency", type=float, default=0.02, help="스텁 서버 처리 시간(s)")
+    ap.add_argument("--jitter-seconds", type=float, default=3.0)
+    args = ap.parse_args()
+
+    stub = GeminiStub(latency=args.latency).start()
+    stub.trust()   # REQUESTS_CA_BUNDLE → 작업 프로세스에도 상속됨
+    settings = AppSettings(gemini_api_key="stub-key")
+    llm_kwargs = {"transport": "rest", "api_endpoint": stub.endpoint, "max_retries": 1}
+    llm_fields = dict(llm_settings(settings), gemini_rpm=0, gemini_tpm=0)
+
+    t0 = time.perf_counter()
+    worker = WorkerProcess(llm_fields, llm_kwargs=llm_kwargs).start()
+    if not worker.wait_ready(30):
+        sys.exit("작업 프로세스가 준비되지 않았습니다.")
+    print(f"작업 프로세스 시작: {_ms(time.perf_counter() - t0)}  (rounds={args.rounds})\n")
+
+    # 1) 프레임 전달
+    for w, h in SIZES:
+        frame = Frame(bytearray(os.urandom(w * h * 4)), 0, 0, w, h, w * 4)
+        local = _timed(frame.to_bgra_bytes, args.rounds)
+        remote = _timed(lambda: worker.probe([frame]), args.rounds)
+        _compare(f"frame {w}x{h}", local, remote)
+
+    # 2) 번역 (같은 스텁, 둘 다 연결 유지)
+    client = LLMClient(SimpleNamespace(**llm_fields), **llm_kwargs)
+    local = _timed(lambda: client.translate(TEXT), args.rounds)
+    remote = _timed(lambda: worker.translate(TEXT), args.rounds)
+    _compare("llm translate", local, remote)
+
+    # 3) OCR (Windows)
+    try:
+        from PIL import Image, ImageDraw
+        from ocr_win import windows_ocr, is_ocr_language_supported
+        if not is_ocr_language_supported("en-US"):
+            raise ImportError("en-US 언어팩 없음")
+    except ImportError as e:
+        print(f"ocr            건너뜀 ({e})")
+    else:
+        img = Image.new("RGB", (640, 120), "white")
+        ImageDraw.Draw(img).text((10, 40), TEXT, fill="black")
+        local = _timed(lambda: windows_ocr(img, "en-US"), args.rounds)
+        remote = _timed(lambda: worker.windows_ocr(img, "en-US"), args.rounds)
+        _compare("ocr en-US", local, remote)
+
+    # 4) 메인 스레드 지연
+    print()
+    for label, work in (("프로세스 안", lambda: client.translate(TEXT)),
+                        ("작업 프로세스", lambda: worker.translate(TEXT))):
+        p99, peak = _jitter(work, args.jitter_seconds)
+        print(f"jitter {label:<8} 5ms 타이머 지연 p99 {_ms(p99)}  max {_ms(peak)}")
+
+    print(f"\n{worker.report()}")
+    worker.stop()
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+"""
+로컬 TLS Gemini REST 스텁 서버 (측정/부하 테스트용).
+
+google-generativeai 의 REST transport 가 보내는 요청
+(`/v1beta/models/{model}:generateContent`, `:streamGenerateContent?alt=sse`, `:countTokens`)에
+가짜 번역으로 응답한다. 컨텍스트 캐시 API(`/v1beta/cachedContents` 만들기/조회/TTL 변경/삭제)도 흉내내며,
+요청이 cachedContent 를 참조하면 캐시된 토큰을 usageMetadata.cachedContentTokenCount 로 돌려준다. 자체 서명 인증서는 openssl 로 만들고, 클라이언트는 REQUESTS_CA_BUNDLE 로 신뢰한다.
+
+    python tools/gemini_stub.py --port 8443 --latency 0.2
+    python tools/gemini_stub.py --latency 0.4 --latency-sigma 0.6 --error-429 0.05 --error-5xx 0.02 --rpm-limit 60
+
+코드에서 사용:
+    stub = GeminiStub(latency=0.2, connect_delay=0.1).start()
+    stub.trust()    # REQUESTS_CA_BUNDLE 설정
+    LLMClient(settings, transport="rest", api_endpoint=stub.endpoint)
+
+지연 모델
+- connect_delay: 새 연결마다 한 번 (DNS/TCP/TLS 왕복을 흉내냄. 로컬 핸드셰이크 자체는 너무 빠르므로)
+- latency      : 요청마다 첫 바이트까지의 서버 처리 시간
+- chunk_delay  : 스트리밍 조각 사이 간격
+- latency_sigma: 0 보다 크면 latency 를 중앙값으로 하는 로그정규 분포에서 뽑는다 (긴 꼬리)
+- prefill_per_token: 캐시되지 않은 입력 토큰마다 더할 처리 시간 (컨텍스트 캐시의 지연 이득을 보기 위함)
+
+컨텍스트 캐시
+- min_cache_tokens: 이보다 작은 캐시는 400 INVALID_ARGUMENT ("Cached content is too small", 실제 API 처럼)
+- 만료되거나 지운 캐시를 참조하면 403 PERMISSION_DENIED
+
+오류 주입 (generateContent / streamGenerateContent 만, seed 로 재현 가능)
+- error_429: 이 확률로 바로 429 RESOURCE_EXHAUSTED ("Please retry in {retry_after}s.")
+- error_5xx: 이 확률로 처리 시간 뒤 500 INTERNAL / 503 UNAVAILABLE
+- rpm_limit: 최근 60초 동안 받은 요청이 이만큼이면 429 (서버 쪽 분당 한도, 남은 시간을 retry 로 알려줌)
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+_PATH_RE = re.compile(r"^/v1beta/models/([^:/]+):(\w+)$")
+_CACHE_RE = re.compile(r"^/v1beta/cachedContents(?:/([^:/]+))?$")
+
+
+def make_self_signed_cert(directory: str) -> tuple[str, str]:
+    """localhost / 127.0.0.1 용 자체 서명 인증서 생성. (cert 경로, key 경로)"""
+    if shutil.which("openssl") is None:
+        raise RuntimeError("openssl 을 찾을 수 없습니다.")
+    cert, key = os.path.join(directory, "stub-cert.pem"), os.path.join(directory, "stub-key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-keyout", key, "-out", cert, "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1"],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return cert, key
+
+
+def _source_text(body: dict) -> str:
+    """마지막 user 메시지의 텍스트 ("Text to Translate:" 뒤)."""
+    texts = [p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", [])]
+    text = texts[-1] if texts else ""
+    return text.split("Text to Translate:", 1)[-1].strip()
+
+
+def fake_translation(body: dict) -> str:
+    src = _source_text(body)
+    gen = body.get("generationConfig") or {}
+    if gen.get("responseMimeType") == "application/json":
+        try:
+            segs = json.loads(src)["segments"]
+            return json.dumps({"translations": [{"id": s["id"], "text": f"번역({s['text']})"} for s in segs]},
+                              ensure_ascii=False)
+        except (ValueError, KeyError, TypeError):
+            pass
+    return f"번역({src})"
+
+
+def _prompt_chars(body: dict) -> int:
+    """입력 글자 수 (실제 API 처럼 system_instruction 포함, 참조한 캐시 제외)."""
+    parts = [p for c in body.get("contents", []) for p in c.get("parts", [])]
+    parts += (body.get("systemInstruction") or {}).get("parts", [])
+    return sum(len(p.get("text", "")) for p in parts)
+
+
+def _response(text: str, body: dict, finish: bool = True, cached: int = 0) -> dict:
+    n_in = _prompt_chars(body) // 4 + cached
+    n_out = len(text) // 4
+    cand = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+    if finish:
+        cand["finishReason"] = "STOP"
+    meta = {"promptTokenCount": n_in, "candidatesTokenCount": n_out, "totalTokenCount": n_in + n_out}
+    if cached:
+        meta["cachedContentTokenCount"] = cached
+    return {"candidates": [cand], "usageMetadata": meta}
+
+
+def _timestamp(t: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(t)) + f".{int(t % 1 * 1e6):06d}Z"
+
+
+def _ttl_seconds(body: dict, default: float = 3600.0) -> float:
+    ttl = body.get("ttl")
+    return float(ttl.rstrip("s")) if isinstance(ttl, str) and ttl else default
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+    server: "_StubHTTPServer"
+
+    def setup(self):
+        super().setup()
+        self.server.stub._count("connections")
+        if self.server.stub.connect_delay:
+            time.sleep(self.server.stub.connect_delay)
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send_json(self, status: int, data: dict):
+        raw = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _error(self, status: int, message: str, name: str):
+        return self._send_json(status, {"error": {"code": status, "message": message, "status": name}})
+
+    def _read_body(self) -> dict | None:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return None
+
+    def _cached_content(self, cid: str | None):
+        """cachedContents/{cid} 조회/변경/삭제. 없거나 만료됐으면 403 (실제 API 와 같은 응답)."""
+        stub = self.server.stub
+        entry = stub._cache_get(f"cachedContents/{cid}") if cid else None
+        if entry is None:
+            return self._error(403, "CachedContent not found (or permission denied)", "PERMISSION_DENIED")
+        if self.command == "DELETE":
+            stub._cache_delete(entry["name"])
+            stub._count("cachedContents.delete")
+            return self._send_json(200, {})
+        if self.command == "PATCH":
+            body = self._read_body() or {}
+            stub._cache_extend(entry, _ttl_seconds(body))
+            stub._count("cachedContents.update")
+        return self._send_json(200, stub._cache_view(entry))
+
+    def _cache_request(self):
+        self.server.stub._count("requests")
+        m = _CACHE_RE.match(urlsplit(self.path).path)
+        if not m:
+            return self._error(404, "not found", "NOT_FOUND")
+        return self._cached_content(m.group(1))
+
+    do_DELETE = do_PATCH = _cache_request
+
+    def do_GET(self):
+        self.server.stub._count("requests")
+        m = _CACHE_RE.match(urlsplit(self.path).path)
+        if m:
+            return self._cached_content(m.group(1))
+        m = re.match(r"^/v1beta/models/([^:/]+)$", urlsplit(self.path).path)
+        if not m:
+            return self._send_json(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+        self._send_json(200, {"name": f"models/{m.group(1)}", "displayName": m.group(1),
+                              "inputTokenLimit": 1048576, "outputTokenLimit": 8192,
+                              "supportedGenerationMethods": ["generateContent", "countTokens"]})
+
+    def do_POST(self):
+        stub = self.server.stub
+        stub._count("requests")
+        url = urlsplit(self.path)
+        body = self._read_body()
+        if body is None:
+            return self._error(400, "bad json", "INVALID_ARGUMENT")
+        if url.path == "/v1beta/cachedContents":
+            stub._count("cachedContents.create")
+            tokens = _prompt_chars(body) // 4
+            if tokens < stub.min_cache_tokens:
+                return self._error(400, f"Cached content is too small. total_token_count={tokens}, "
+                                        f"min_total_token_count={stub.min_cache_tokens}", "INVALID_ARGUMENT")
+            return self._send_json(200, stub._cache_view(stub._cache_create(body, tokens)))
+        m = _PATH_RE.match(url.path)
+        if not m:
+            return self._send_json(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+        method = m.group(2)
+        stub._count(method)
+
+        request = body.get("generateContentRequest") or body
+        cached = 0
+        if request.get("cachedContent"):
+            entry = stub._cache_get(request["cachedContent"])
+            if entry is None:
+                return self._error(403, "CachedContent not found (or permission denied)", "PERMISSION_DENIED")
+            if entry["model"] != f"models/{m.group(1)}":
+                return self._error(400, "Model used by GenerateContent request and CachedContent must be the same.",
+                                   "INVALID_ARGUMENT")
+            cached = entry["tokens"]
+            stub._count("cached_tokens", cached)
+
+        if method == "countTokens":
+            n = _prompt_chars(request) // 4 + cached
+            return self._send_json(200, {"totalTokens": max(1, n), "cachedContentTokenCount": cached})
+
+        fault = stub._fault()
+        if fault is not None:
+            status, message = fault
+            if status >= 500:
+                time.sleep(stub._latency())
+            names = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+            return self._send_json(status, {"error": {"code": status, "message": message, "status": names[status]}})
+        time.sleep(stub._latency() + stub.prefill_per_token * (_prompt_chars(body) // 4))
+        text = fake_translation(body)
+        if method == "generateContent":
+            return self._send_json(200, _response(text, body, cached=cached))
+        if method != "streamGenerateContent":
+            return self._send_json(404, {"error": {"code": 404, "message": method, "status": "NOT_FOUND"}})
+
+        sse = parse_qs(url.query).get("alt", [""])[0] == "sse"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream" if sse else "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        pieces = [text[i:i + stub.chunk_chars] for i in range(0, len(text), stub.chunk_chars)] or [""]
+        if not sse:
+            self._write_chunk(b"[")
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(stub.chunk_delay)
+            event = json.dumps(_response(piece, body, finish=i == len(pieces) - 1, cached=cached), ensure_ascii=False)
+            if sse:
+                self._write_chunk(f"data: {event}\r\n\r\n".encode("utf-8"))
+            else:
+                self._write_chunk(((", " if i else "") + event).encode("utf-8"))
+        if not sse:
+            self._write_chunk(b"]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    stub: "GeminiStub"
+
+
+class GeminiStub:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, *, latency: float = 0.05,
+                 chunk_delay: float = 0.01, chunk_chars: int = 16, connect_delay: float = 0.0,
+                 latency_sigma: float = 0.0, error_429: float = 0.0, error_5xx: float = 0.0,
+                 rpm_limit: int = 0, retry_after: float = 1.0, seed: int | None = None,
+                 prefill_per_token: float = 0.0, min_cache_tokens: int = 0, cert_dir: str | None = None):
+        self.host = host
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.error_429 = error_429
+        self.error_5xx = error_5xx
+        self.rpm_limit = rpm_limit
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._recent: deque[float] = deque()   # rpm_limit: 최근 60초 동안 받은 요청 시각
+        self.prefill_per_token = prefill_per_token
+        self.min_cache_tokens = min_cache_tokens
+        self._caches: dict[str, dict] = {}      # cachedContents/{id} → 등록한 내용과 만료 시각(time.time)
+        self._cache_seq = 0
+        self.chunk_delay = chunk_delay
+        self.chunk_chars = max(1, chunk_chars)
+        self.connect_delay = connect_delay
+        self._cert_dir = cert_dir or tempfile.mkdtemp(prefix="gemini-stub-")
+        self.cert_file, self.key_file = make_self_signed_cert(self._cert_dir)
+        self._stats_lock = threading.Lock()
+        self._stats: dict[str, int] = {}
+
+        self._httpd = _StubHTTPServer((host, port), _Handler)
+        self._httpd.stub = self
+        ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        ctx.load_cert_chain(self.cert_file, self.key_file)
+        # 핸드셰이크는 연결별 처리 스레드의 첫 읽기에서 (accept 루프를 막지 않도록)
+        self._httpd.socket = ctx.wrap_socket(self._httpd.socket, server_side=True,
+                                             do_handshake_on_connect=False)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    @property
+    def endpoint(self) -> str:
+        """genai client_options 의 api_endpoint 값."""
+        return f"{self.host}:{self.port}"
+
+    def trust(self):
+        """이 프로세스의 requests(REST transport)가 스텁 인증서를 신뢰하게 한다."""
+        os.environ["REQUESTS_CA_BUNDLE"] = self.cert_file
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self._stats[key] = self._stats.get(key, 0) + n
+
+    def _latency(self) -> float:
+        if self.latency_sigma <= 0 or self.latency <= 0:
+            return self.latency
+        with self._stats_lock:
+            return self._rng.lognormvariate(math.log(self.latency), self.latency_sigma)
+
+    def _fault(self) -> tuple[int, str] | None:
+        """이번 요청에 주입할 오류 (상태 코드, 메시지). 없으면 None."""
+        now = time.monotonic()
+        with self._stats_lock:
+            if self.rpm_limit > 0:
+                while self._recent and now - self._recent[0] >= 60:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rpm_limit:
+                    wait = 60 - (now - self._recent[0])
+                    self._stats["429"] = self._stats.get("429", 0) + 1
+                    return 429, f"Quota exceeded for requests per minute. Please retry in {wait:.1f}s."
+                self._recent.append(now)
+            r = self._rng.random()
+            if r < self.error_429:
+                self._stats["429"] = self._stats.get("429", 0) + 1
+                return 429, f"Resource has been exhausted (e.g. check quota). Please retry in {self.retry_after:g}s."
+            if r < self.error_429 + self.error_5xx:
+                self._stats["5xx"] = self._stats.get("5xx", 0) + 1
+                if self._rng.random() < 0.5:
+                    return 500, "An internal error has occurred."
+                return 503, "The model is overloaded. Please try again later."
+        return None
+
+    def _cache_create(self, body: dict, tokens: int) -> dict:
+        now = time.time()
+        with self._stats_lock:
+            self._cache_seq += 1
+            name = f"cachedContents/stub{self._cache_seq}"
+            entry = {"name": name, "model": body.get("model", ""), "displayName": body.get("displayName", ""),
+                     "tokens": tokens, "created": now, "updated": now, "expires": now + _ttl_seconds(body)}
+            self._caches[name] = entry
+        return entry
+
+    def _cache_get(self, name: str) -> dict | None:
+        with self._stats_lock:
+            entry = self._caches.get(name)
+            if entry is not None and entry["expires"] <= time.time():
+                del self._caches[name]
+                entry = None
+        return entry
+
+    def _cache_extend(self, entry: dict, ttl: float):
+        with self._stats_lock:
+            entry["updated"] = time.time()
+            entry["expires"] = entry["updated"] + ttl
+
+    def _cache_delete(self, name: str):
+        with self._stats_lock:
+            self._caches.pop(name, None)
+
+    def expire_caches(self):
+        """등록된 컨텍스트 캐시를 모두 만료시킨다 (서버 쪽 만료를 흉내낼 때)."""
+        with self._stats_lock:
+            self._caches.clear()
+
+    @staticmethod
+    def _cache_view(entry: dict) -> dict:
+        return {"name": entry["name"], "model": entry["model"], "displayName": entry["displayName"],
+                "createTime": _timestamp(entry["created"]), "updateTime": _timestamp(entry["updated"]),
+                "expireTime": _timestamp(entry["expires"]), "usageMetadata": {"totalTokenCount": entry["tokens"]}}
+
+    def stats(self) -> dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        """집계와 rpm_limit 의 최근 요청 기록을 비운다."""
+        with self._stats_lock:
+            self._stats.clear()
+            self._recent.clear()
+
+    def start(self) -> "GeminiStub":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="gemini-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8443)
+    ap.add_argument("--latency", type=float, default=0.05)
+    ap.add_argument("--chunk-delay", type=float, default=0.01)
+    ap.add_argument("--connect-delay", type=float, default=0.0)
+    ap.add_argument("--latency-sigma", type=float, default=0.0)
+    ap.add_argument("--error-429", type=float, default=0.0)
+    ap.add_argument("--error-5xx", type=float, default=0.0)
+    ap.add_argument("--rpm-limit", type=int, default=0)
+    ap.add_argument("--retry-after", type=float, default=1.0)
+    args = ap.parse_args()
+
+    stub = GeminiStub(args.host, args.port, latency=args.latency, chunk_delay=args.chunk_delay,
+                      connect_delay=args.connect_delay, latency_sigma=args.latency_sigma,
+                      error_429=args.error_429, error_5xx=args.error_5xx, rpm_limit=args.rpm_limit,
+                      retry_after=args.retry_after).start()
+    print(f"api_endpoint : {stub.endpoint}")
+    print(f"CA 인증서    : {stub.cert_file}  (REQUESTS_CA_BUNDLE 로 지정)")
+    try:
+        while True:
+            time.sleep(5)
+            print(stub.stats(), flush=True)
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
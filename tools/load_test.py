@@ -0,0 +1,166 @@
+"""
+LLM 계층 부하 테스트: 동시 사용자 수를 늘려 가며 LLMClient 를 로컬 스텁(gemini_stub)에 두드린다.
+
+    python tools/load_test.py --levels 1,2,4,8,16 --per-user 10
+    python tools/load_test.py --latency 0.4 --latency-sigma 0.6 --error-429 0.05 --error-5xx 0.03
+    python tools/load_test.py --op many --rpm 60 --rpm-limit 60     # 클라이언트 한도 vs 서버 분당 한도
+    python tools/load_test.py --op stream --deadline 4              # 캡처처럼 마감 시간을 걸고
+
+감시/일괄 모드, 저장된 영역 여러 개처럼 번역 요청이 동시에 몰릴 때를 흉내낸다.
+단계마다 사용자 수만큼 스레드가 하나의 LLMClient(앱처럼 공유, 새 스케줄러)로 per-user 번씩 차례로 요청하고
+(--think: 요청 사이 평균 대기, 지수 분포), 다음을 출력한다.
+- 처리량     : 성공 요청 / 단계 시간
+- 지연       : 요청 하나의 전체 시간 (스케줄러 대기 + 재시도 포함) p50 / p90 / p99 / 최대
+- 재시도 증폭: 스텁이 받은 생성 요청 수 / 보낸 요청 수 (SDK 안의 재시도까지 포함),
+               LLMClient 재시도 수 (usage 의 retries)
+- 오류율     : 최종 실패 비율 (종류별), 스텁이 돌려준 429 / 5xx 수, 스케줄러 대기 p90
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from deadline import Deadline, DeadlineExceeded    # noqa: E402
+from llm_api import LLMClient, LLMError, LLMSupersededError  # noqa: E402
+from metrics import metrics, percentile            # noqa: E402
+from scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, RequestScheduler  # noqa: E402
+from settings import AppSettings                   # noqa: E402
+from usage import usage                            # noqa: E402
+from gemini_stub import GeminiStub                 # noqa: E402
+
+TEXTS = [
+    "Deliver 3 Military Batteries to the Quartermaster.",
+    "Reward: 12,000 Roubles, Reputation +0.02",
+    "The bridge to the north is destroyed; use the river path.",
+    "Weight 1.2 kg    Durability 45/45",
+    "I told you not to come back here without the documents.",
+]
+
+
+def _request(llm: LLMClient, op: str, user: int, i: int, priority: int, deadline_s: float):
+    dl = Deadline(deadline_s) if deadline_s > 0 else None
+    text = TEXTS[(user + i) % len(TEXTS)]
+    key = f"load{user}"   # 사용자마다 차례로 보내므로 같은 key 끼리 대체되지 않는다
+    if op == "translate":
+        llm.translate(text, priority=priority, key=key, deadline=dl)
+    elif op == "stream":
+        for _ in llm.translate_stream(text, priority=priority, key=key, deadline=dl):
+            pass
+    else:
+        segments = {f"r{k + 1}": TEXTS[(user + i + k) % len(TEXTS)] for k in range(3)}
+        llm.translate_many(segments, priority=priority, key=key, deadline=dl)
+
+
+def _outcome(e: Exception) -> str:
+    if isinstance(e, LLMSupersededError):
+        return "superseded"
+    if isinstance(e, DeadlineExceeded):
+        return "deadline"
+    if isinstance(e, LLMError):
+        return "llm"
+    return type(e).__name__
+
+
+def run_level(llm: LLMClient, users: int, args) -> dict:
+    """users 명이 동시에 per_user 번씩 요청. (지연 목록, 결과 종류별 수, 걸린 시간)"""
+    latencies: list[float] = []
+    outcomes: Counter = Counter()
+    lock = threading.Lock()
+    priority = PRIORITY_BATCH if args.batch else PRIORITY_INTERACTIVE
+
+    def user(u: int):
+        rng = random.Random(args.seed * 1000 + u)
+        for i in range(args.per_user):
+            if args.think > 0:
+                time.sleep(rng.expovariate(1 / args.think))
+            t0 = time.perf_counter()
+            try:
+                _request(llm, args.op, u, i, priority, args.deadline)
+                result = "ok"
+            except Exception as e:
+                result = _outcome(e)
+            dt = time.perf_counter() - t0
+            with lock:
+                outcomes[result] += 1
+                if result == "ok":
+                    latencies.append(dt)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(u,), name=f"load-{u}") for u in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {"latencies": sorted(latencies), "outcomes": outcomes, "elapsed": time.perf_counter() - t0}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--levels", default="1,2,4,8,16", help="동시 사용자 수들 (쉼표 구분)")
+    ap.add_argument("--per-user", type=int, default=10, help="사용자마다 보낼 요청 수")
+    ap.add_argument("--op", choices=("translate", "stream", "many"), default="translate")
+    ap.add_argument("--think", type=float, default=0.0, help="요청 사이 평균 대기(s), 0 = 바로 이어서")
+    ap.add_argument("--deadline", type=float, default=0.0, help="요청마다 마감(s), 0 = 없음")
+    ap.add_argument("--batch", action="store_true", help="배치 우선순위로 보냄 (기본: 대화형)")
+    ap.add_argument("--retries", type=int, default=3, help="LLMClient max_retries")
+    ap.add_argument("--retry-base", type=float, default=0.8, help="LLMClient retry_base_delay(s)")
+    ap.add_argument("--rpm", type=int, default=0, help="클라이언트 분당 요청 한도 (0 = 제한 없음)")
+    ap.add_argument("--tpm", type=int, default=0, help="클라이언트 분당 토큰 한도 (0 = 제한 없음)")
+    ap.add_argument("--latency", type=float, default=0.3, help="스텁 처리 시간 중앙값(s)")
+    ap.add_argument("--latency-sigma", type=float, default=0.5, help="로그정규 sigma (0 = 고정)")
+    ap.add_argument("--error-429", type=float, default=0.0, help="스텁 429 확률")
+    ap.add_argument("--error-5xx", type=float, default=0.0, help="스텁 500/503 확률")
+    ap.add_argument("--rpm-limit", type=int, default=0, help="스텁 분당 한도 (0 = 없음)")
+    ap.add_argument("--retry-after", type=float, default=1.0, help="스텁 429 가 알려줄 대기 시간(s)")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    levels = [int(x) for x in args.levels.split(",") if x.strip()]
+
+    stub = GeminiStub(latency=args.latency, latency_sigma=args.latency_sigma, error_429=args.error_429,
+                      error_5xx=args.error_5xx, rpm_limit=args.rpm_limit, retry_after=args.retry_after,
+                      seed=args.seed).start()
+    stub.trust()
+    settings = SimpleNamespace(gemini_api_key="stub-key", gemini_model=AppSettings.gemini_model,
+                               system_prompt=AppSettings().system_prompt, gemini_rpm=args.rpm, gemini_tpm=args.tpm)
+    print(f"stub https://{stub.endpoint}  op={args.op}  latency={args.latency}s (sigma {args.latency_sigma})  "
+          f"429={args.error_429:.0%}  5xx={args.error_5xx:.0%}  서버 rpm={args.rpm_limit or '-'}  "
+          f"클라이언트 rpm={args.rpm or '-'} tpm={args.tpm or '-'}  재시도 {args.retries}회")
+
+    # import / 첫 연결 비용 제외
+    LLMClient(settings, transport="rest", api_endpoint=stub.endpoint, max_retries=1,
+              scheduler=RequestScheduler()).warm_up(wait=True)
+
+    print(f"\n{'사용자':>6} {'요청':>5} {'성공':>5} {'처리량':>8} {'p50':>7} {'p90':>7} {'p99':>7} {'최대':>7} "
+          f"{'증폭':>5} {'재시도':>6} {'429':>4} {'5xx':>4} {'대기p90':>7}  실패")
+    for users in levels:
+        stub.reset_stats()
+        metrics.reset()
+        usage.reset()
+        llm = LLMClient(settings, transport="rest", api_endpoint=stub.endpoint, max_retries=args.retries,
+                        retry_base_delay=args.retry_base, scheduler=RequestScheduler())
+        r = run_level(llm, users, args)
+        lat, outcomes = r["latencies"], r["outcomes"]
+        sent = sum(outcomes.values())
+        ok = outcomes.pop("ok", 0)
+        st = stub.stats()
+        attempts = st.get("generateContent", 0) + st.get("streamGenerateContent", 0)
+        wait = metrics.snapshot()["timings"].get("llm.queue_wait", {}).get("p90", 0.0)
+        fails = ", ".join(f"{k} {v / sent:.0%}" for k, v in outcomes.most_common()) or "-"
+
+        def ms(q: float) -> str:
+            return f"{percentile(lat, q) * 1000:5.0f}ms" if lat else "      -"
+        print(f"{users:>6} {sent:>5} {ok:>5} {ok / r['elapsed']:6.2f}/s {ms(0.5)} {ms(0.9)} {ms(0.99)} {ms(1.0)} "
+              f"{attempts / max(1, sent):5.2f} {usage.snapshot()['total']['retries']:>6} {st.get('429', 0):>4} "
+              f"{st.get('5xx', 0):>4} {wait * 1000:5.0f}ms  {fails}")
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+캡처 세션 기록(session_trace) 재현: 실제로 캡처했던 순서/간격/이미지로 캡처 파이프라인을 다시 돌린다.
+
+    python tools/replay_trace.py                                   # 가장 최근 세션, 가짜 LLM, 기록된 간격대로
+    python tools/replay_trace.py session.trace --speed 0           # 기다리지 않고 연달아
+    python tools/replay_trace.py session.trace --llm stub          # 로컬 TLS 스텁 서버(gemini_stub)로 실제 LLMClient 사용
+    python tools/replay_trace.py session.trace --set use_translation_cache=false --set chunk_chars=400
+
+실제 MainWindow / CaptureController / TranslationPipeline 을 Qt offscreen 에서 띄우고
+- 캡처: 기록된 이미지
+- OCR : 기록된 OCR 결과 (--ocr windows: 기록된 이미지로 실제 Windows OCR)
+- LLM : fake = 그 캡처에서 기록된 LLM 시간만큼 기다린 뒤 가짜 번역 / stub = gemini_stub
+로 바꿔 run_pipeline 을 호출한다. 번역 캐시, 스크롤 병합, 청크 나누기, 스케줄러 등은 실제 코드이므로
+변경 전/후(또는 --set 으로 바꾼 설정)를 같은 트래픽으로 비교할 수 있다.
+재현 결과도 같은 형식으로 기록해(--out) 기록/재현의 첫 번역 시간, 전체 시간, 캐시 적중, 보낸 글자 수를 나란히 출력한다.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+_REAL_APPDATA = os.environ.get("APPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Roaming")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="ocr-translate-replay-")  # 실제 설정/기록을 건드리지 않음
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from PIL import Image                              # noqa: E402
+from PyQt5 import QtCore, QtWidgets                # noqa: E402
+
+import ui_app                                      # noqa: E402
+from controller import CaptureController          # noqa: E402
+from metrics import metrics                        # noqa: E402
+from pipeline import TranslationPipeline           # noqa: E402
+from session_trace import SessionRecorder, decode_frame, latest_trace, read_trace  # noqa: E402
+from settings import APP_NAME, SettingsManager     # noqa: E402
+
+DEFAULT_LLM_S = 0.5   # 기록에 LLM 시간이 없을 때(캐시 적중, 오류) 가짜 LLM 이 기다릴 시간
+
+
+def load(path: str) -> tuple[dict, list[dict], dict[int, bytes]]:
+    """(session 레코드, capture 레코드들, frame id → PNG)"""
+    header, events, frames = {}, [], {}
+    for meta, blob in read_trace(path):
+        kind = meta.get("type")
+        if kind == "session":
+            header = meta
+        elif kind == "frame":
+            frames[meta["id"]] = blob
+        elif kind == "capture":
+            events.append(meta)
+    return header, events, frames
+
+
+class FakeLLM:
+    """기록된 LLM 시간만큼 기다렸다가 가짜 번역을 돌려준다 (호출 수/보낸 글자 수 집계)."""
+    def __init__(self):
+        self.latency = DEFAULT_LLM_S
+        self.calls = 0
+        self.chars = 0
+        self._lock = threading.Lock()
+
+    def _count(self, text: str):
+        with self._lock:
+            self.calls += 1
+            self.chars += len(text)
+
+    def translate(self, text, **kw):
+        self._count(text)
+        time.sleep(self.latency)
+        return "번역: " + text
+
+    def translate_many(self, segments, **kw):
+        self._count("".join(segments.values()))
+        time.sleep(self.latency)
+        return {k: "번역: " + v for k, v in segments.items()}
+
+    def warm_up(self, *a, **kw):
+        pass
+
+    def reload(self):
+        return False
+
+
+class ReplayPipeline(TranslationPipeline):
+    """OCR 은 기록된 결과(또는 실제 Windows OCR), LLM 은 use_llm() 으로 주입한 것으로 바꾼 파이프라인."""
+    _replay_llm = None   # 주입 전(기본 LLMClient)에는 미리 연결하지 않음
+
+    def __init__(self, mgr, real_ocr: bool):
+        super().__init__(mgr)
+        self._real_ocr = real_ocr
+        self.event: dict = {}
+
+    def use_llm(self, llm):
+        self._llm = self._replay_llm = llm
+
+    def ocr_detect(self, img, lang_tag, remembered=None, key=None, deadline=None):
+        if self._real_ocr:
+            return super().ocr_detect(img, lang_tag, remembered, key, deadline)
+        if "ocr_text" not in self.event:
+            raise RuntimeError(self.event.get("error") or "기록된 OCR 결과 없음")
+        return self.event["ocr_text"], self.event.get("ocr_lang") or lang_tag
+
+    def ocr_detect_cached(self, img, rect, lang_tag, remembered=None, key=None, deadline=None, bypass_cache=False):
+        if self._real_ocr:
+            return super().ocr_detect_cached(img, rect, lang_tag, remembered, key, deadline, bypass_cache)
+        # 기록된 결과는 이미지가 같아도(프레임 없음 → 빈 이미지) 캡처마다 다르므로 OCR 캐시를 거치지 않는다
+        return self.ocr_detect(img, lang_tag, remembered, key, deadline)
+
+    def warm_up(self):
+        if self._replay_llm is not None:
+            self._replay_llm.warm_up()
+
+
+def _parse_value(v: str):
+    if v.lower() in ("true", "false"):
+        return v.lower() == "true"
+    for conv in (int, float):
+        try:
+            return conv(v)
+        except ValueError:
+            pass
+    return v
+
+
+def _apply_overrides(mgr: SettingsManager, pairs: list[str]):
+    for pair in pairs:
+        name, _, value = pair.partition("=")
+        setter = getattr(mgr, f"set_{name}", None)
+        if setter is None:
+            raise SystemExit(f"알 수 없는 설정: {name}")
+        setter(_parse_value(value))
+
+
+def _first_s(ev: dict) -> float:
+    """선택을 마친 뒤 번역이 처음 보일 때까지 (translate 단계는 첫 조각에서 끝남)."""
+    return sum(ev.get("stages", {}).values())
+
+
+def _dist(values: list[float]) -> str:
+    if not values:
+        return "-"
+    values = sorted(values)
+    p90 = values[min(len(values) - 1, int(len(values) * 0.9))]
+    return f"{statistics.median(values) * 1000:6.0f} / {p90 * 1000:6.0f} ms"
+
+
+def summarize(events: list[dict]) -> dict[str, str]:
+    ok = [e for e in events if not e.get("error")]
+    return {
+        "캡처": str(len(events)),
+        "오류": str(len(events) - len(ok)),
+        "캐시 적중": str(sum(bool(e.get("from_cache")) for e in ok)),
+        "번역할 글자": str(sum(e.get("sent_chars", 0) for e in ok)),
+        "첫 번역 p50/p90": _dist([_first_s(e) for e in ok]),
+        "전체 p50/p90": _dist([e["total_s"] for e in ok if "total_s" in e]),
+        "LLM p50/p90": _dist([e["llm_s"] for e in ok if "llm_s" in e and not e.get("from_cache")]),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("trace", nargs="?", help="세션 기록 파일 (기본: AppData 의 가장 최근 세션)")
+    ap.add_argument("--llm", choices=("fake", "stub"), default="fake")
+    ap.add_argument("--ocr", choices=("recorded", "windows"), default="recorded")
+    ap.add_argument("--speed", type=float, default=1.0, help="기록된 간격의 배속 (0 = 기다리지 않음)")
+    ap.add_argument("--limit", type=int, default=0, help="앞에서부터 이 개수만 재현 (0 = 전부)")
+    ap.add_argument("--settings", help="settings.json 경로 (기본: 기본 설정)")
+    ap.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                    help="설정 덮어쓰기 (SettingsManager.set_NAME), 여러 번 지정 가능")
+    ap.add_argument("--stub-latency", type=float, default=0.3)
+    ap.add_argument("--out", help="재현 결과 기록 폴더 (기본: 임시 폴더)")
+    args = ap.parse_args()
+
+    path = args.trace or latest_trace(os.path.join(_REAL_APPDATA, APP_NAME, "traces"))
+    if not path:
+        raise SystemExit("세션 기록이 없습니다. 설정에서 '캡처 세션 기록' 을 켜고 사용한 뒤 다시 실행하세요.")
+    header, events, frames = load(path)
+    if args.limit:
+        events = events[:args.limit]
+    span = events[-1]["t"] - events[0]["t"] if events else 0.0
+    print(f"{path}\n  캡처 {len(events)}개, 이미지 {len(frames)}개 (중복 제외), {span:.0f}s, "
+          f"{os.path.getsize(path) / 2**20:.1f} MiB, 버전 {header.get('version')}")
+    if not events:
+        return
+
+    app = QtWidgets.QApplication(sys.argv)
+    mgr = SettingsManager(args.settings) if args.settings else SettingsManager()
+    mgr.set_use_worker_process(False)   # 주입한 OCR/LLM 을 이 프로세스에서 쓰도록
+
+    _apply_overrides(mgr, args.set)
+    pipeline = ReplayPipeline(mgr, real_ocr=args.ocr == "windows")
+    stub = None
+    if args.llm == "stub":
+        # 파이프라인의 기본 LLMClient 를 만든 뒤에 설정해야 genai 전역 설정이 스텁을 가리킨다
+        from gemini_stub import GeminiStub
+        from llm_api import LLMClient
+        stub = GeminiStub(latency=args.stub_latency).start()
+        stub.trust()
+        mgr.set_gemini(mgr.gemini_model, "stub-key")
+        mgr.set_gemini_limits(0, 0)   # 분당 한도 대기는 재현 대상이 아님
+        llm = LLMClient(mgr, transport="rest", api_endpoint=stub.endpoint, max_retries=1)
+    else:
+        llm = FakeLLM()
+    pipeline.use_llm(llm)
+
+    cache: dict[int, Image.Image] = {}
+
+    def capture(rect):
+        fid = pipeline.event.get("frame")
+        if fid is None or fid not in frames:
+            return Image.new("RGB", (max(1, rect.width()), max(1, rect.height())), (30, 30, 30))
+        if fid not in cache:
+            cache[fid] = decode_frame(frames[fid])
+        return cache[fid]
+
+    w = ui_app.MainWindow(mgr)
+    w.show()
+    controller = CaptureController(w, mgr, pipeline, capture=capture)
+    out_dir = args.out or tempfile.mkdtemp(prefix="ocr-translate-replay-trace-")
+    controller.trace = SessionRecorder(out_dir)
+    metrics.reset()
+
+    t_start, t_first = time.monotonic(), events[0]["t"]
+    for ev in events:
+        if args.speed > 0:
+            due = t_start + (ev["t"] - t_first) / args.speed
+            while time.monotonic() < due:
+                app.processEvents()
+                time.sleep(min(0.01, max(0.0, due - time.monotonic())))
+        pipeline.event = ev
+        if isinstance(llm, FakeLLM):
+            llm.latency = ev.get("llm_s") if ev.get("llm_s") and not ev.get("from_cache") else DEFAULT_LLM_S
+        x, y, rw, rh = ev["rect"]
+        if ev.get("lang") and ev["lang"] != w.get_lang_tag():
+            w.lang.setCurrentText(ev["lang"])   # 기록 당시 고른 OCR 언어
+        controller.run_pipeline(QtCore.QRect(x, y, rw, rh), None, ev.get("bypass_cache", False))
+        app.processEvents()
+    elapsed = time.monotonic() - t_start
+    w.close_overlays(True)
+    controller.trace.close()
+
+    _, replayed, _ = load(controller.trace.path)
+    rec, rep = summarize(events), summarize(replayed)
+    print(f"\n재현: LLM={args.llm}, OCR={args.ocr}, speed={args.speed}, {elapsed:.1f}s"
+          + (f", 설정 {' '.join(args.set)}" if args.set else ""))
+    print(f"{'':<16} {'기록':>20} {'재현':>20}")
+    for k in rec:
+        print(f"{k:<16} {rec[k]:>20} {rep[k]:>20}")
+    if isinstance(llm, FakeLLM):
+        print(f"LLM 호출 {llm.calls}회, 보낸 글자 {llm.chars}")
+    if stub is not None:
+        print(f"스텁 서버: {stub.stats()}")
+        stub.stop()
+    print(f"재현 기록: {controller.trace.path}\n")
+    print(metrics.report())
+    pipeline.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+장시간 사용 메모리 soak 테스트.
+
+실제 MainWindow / CaptureController / TranslationPipeline 을 Qt offscreen 플랫폼에서 띄우고,
+화면 캡처·OCR·LLM 만 가짜로 바꿔 캡처 파이프라인을 수천 번 반복한다.
+RSS, tracemalloc, 살아 있는 QObject/위젯 수를 주기적으로 기록하고,
+후반부에서도 계속 증가하면(누수) 종료 코드 1로 실패한다.
+
+    python tools/soak.py --iterations 5000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="ocr-translate-soak-")  # 실제 설정 파일을 건드리지 않음
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from PyQt5 import QtCore, QtWidgets                # noqa: E402
+
+import ui_app                                      # noqa: E402
+from capture import Frame                          # noqa: E402
+from controller import CaptureController          # noqa: E402
+from diagnostics import MemoryProbe, dump_top_allocators  # noqa: E402
+from history import HistoryStore                   # noqa: E402
+from pipeline import TranslationPipeline           # noqa: E402
+from settings import SettingsManager               # noqa: E402
+
+WORDS = ("armor ammo quest extraction bridge sniper weight price durability "
+         "mission deliver battery quartermaster reward level damage").split()
+
+
+class FakeLLM:
+    """LLMClient 대신 쓰는 가짜 번역기 (네트워크 없음)."""
+    def translate(self, text, **kw):
+        return "번역 결과입니다: " + text[::-1]
+
+    def translate_many(self, segments, **kw):
+        return {k: self.translate(v) for k, v in segments.items()}
+
+
+class FakePipeline(TranslationPipeline):
+    """OCR / LLM 호출만 가짜로 바꾼 파이프라인 (스크롤 병합, 청크, 번역 캐시 등 나머지는 실제 코드)."""
+    def __init__(self, mgr, rng: random.Random):
+        super().__init__(mgr)
+        self._rng = rng
+        self._llm = FakeLLM()
+
+    def _text(self) -> str:
+        return " ".join(self._rng.choice(WORDS) for _ in range(self._rng.randint(5, 60)))
+
+    def ocr_detect(self, img, lang_tag, remembered=None, key=None, deadline=None):
+        img.to_pil() if isinstance(img, Frame) else img.tobytes()  # 변환 비용/할당은 실제처럼
+        return self._text(), "en-US"
+
+    def ocr_many_detect(self, images, lang_tag, remembered=None, key=None, deadline=None):
+        return [self.ocr_detect(img, lang_tag) for img in images]
+
+    def ocr_detect_cached(self, img, rect, lang_tag, remembered=None, key=None, deadline=None, bypass_cache=False):
+        # 가짜 화면은 매번 같은 빈 프레임이므로, 해시/저장은 실제처럼 하되 OCR 은 항상 실행
+        return super().ocr_detect_cached(img, rect, lang_tag, remembered, key, deadline, bypass_cache=True)
+
+    def warm_up(self):
+        pass
+
+
+def fake_grab_frame(rect) -> Frame:
+    w, h = rect.width(), rect.height()
+    return Frame(bytearray(w * h * 4), rect.x(), rect.y(), w, h, w * 4)
+
+
+def fake_grab_regions(rects):
+    return [fake_grab_frame(r) for r in rects]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--iterations", type=int, default=3000)
+    ap.add_argument("--sample-every", type=int, default=100)
+    ap.add_argument("--max-rss-kib-per-iter", type=float, default=2.0)
+    ap.add_argument("--max-traced-kib-per-iter", type=float, default=0.5)
+    ap.add_argument("--max-qobjects-per-1k", type=float, default=5.0)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv)
+    ui_app.grab_frame = fake_grab_frame  # freeze-frame 캡처도 가짜 화면
+
+    rng = random.Random(args.seed)
+    mgr = SettingsManager()
+    mgr.add_saved_region(0, "quest", (10, 10, 300, 80))
+    mgr.add_saved_region(0, "tooltip", (400, 200, 260, 160))
+    history = HistoryStore()   # 임시 APPDATA 아래
+    w = ui_app.MainWindow(mgr, history)
+    w.show()
+    pipeline = FakePipeline(mgr, rng)
+    CaptureController(w, mgr, pipeline, capture=fake_grab_frame, grab=fake_grab_regions, history=history)
+
+    probe = MemoryProbe()
+    geo = w.current_screen_geo()
+    for n in range(1, args.iterations + 1):
+        rect = QtCore.QRect(geo.x() + rng.randint(0, 400), geo.y() + rng.randint(0, 300),
+                            rng.randint(80, 600), rng.randint(40, 300))
+        kind = n % 4
+        if kind == 0:
+            # 캡처 보드 열기 → 드래그 → 놓기
+            w.start_capture()
+            w.sel_overlay.selected.emit(rect)
+            w.sel_overlay.close()
+        elif kind == 1:
+            w.start_capture()
+            w.sel_overlay.cancelled.emit()
+            w.sel_overlay.close()
+        elif kind == 2:
+            w.run_last_rect()
+        else:
+            w.run_saved_regions()
+        if n % 50 == 0:
+            # 기록 창 열기 → 검색 → 닫기
+            w._open_history()
+            w.history_dialog.edt_query.setText(rng.choice(WORDS)[::-1])
+            w.history_dialog.refresh()
+            w.history_dialog.hide()
+        app.processEvents()
+
+        if n % args.sample_every == 0:
+            s = probe.sample(n)
+            print(f"[{n:>6}] rss {s['rss'] / 2**20:7.1f} MiB  traced {s['traced'] / 2**20:6.2f} MiB  "
+                  f"qobjects {s['qobjects']:>5}  widgets {s['widgets']:>5}", flush=True)
+
+    w.close_overlays(True)
+    probe.sample(args.iterations)
+
+    rss = probe.slope("rss") / 1024
+    traced = probe.slope("traced") / 1024
+    qobj = probe.slope("qobjects") * 1000
+    widgets = probe.slope("widgets") * 1000
+    print(f"\n후반부 증가율: rss {rss:.2f} KiB/iter, traced {traced:.3f} KiB/iter, "
+          f"qobjects {qobj:.2f}/1k iter, widgets {widgets:.2f}/1k iter")
+
+    failures = []
+    if rss > args.max_rss_kib_per_iter: failures.append("rss")
+    if traced > args.max_traced_kib_per_iter: failures.append("traced")
+    if qobj > args.max_qobjects_per_1k or widgets > args.max_qobjects_per_1k: failures.append("qobjects")
+    if failures:
+        print(f"FAIL: 계속 증가함 → {', '.join(failures)}\n")
+        print(dump_top_allocators(limit=25))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()